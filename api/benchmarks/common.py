@@ -0,0 +1,133 @@
+import argparse
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator, Optional
+from uuid import uuid4
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from smartparking.config import ApplicationSettings
+from smartparking.model.schema import create_schema
+from smartparking.bootstrap import create_resources
+from smartparking.resources import Resources
+import smartparking.model.db as m
+
+
+def arguments(description: str, dsn: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Creates the argument parser with the options shared by the benchmarks.
+
+    Args:
+        description (str): The description of the benchmark.
+        dsn (Optional[str]): The default DSN. The option is required when omitted.
+    """
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--dsn', required=dsn is None, default=dsn,
+        help="DSN of the database used by the benchmark, e.g. sqlite+aiosqlite:////tmp/benchmark.db to run without PostgreSQL.",
+    )
+    parser.add_argument('--accounts', type=int, default=1000, help="Number of accounts to create.")
+    parser.add_argument('--iterations', type=int, default=1000, help="Number of measured calls.")
+    return parser
+
+
+def settings(dsn: str, **db: Any) -> ApplicationSettings:
+    """
+    Creates settings with a local storage and a Firebase project not reachable from the benchmark.
+    """
+    return ApplicationSettings(
+        name='benchmark',
+        version='0',
+        db=ApplicationSettings.DB(dsn=dsn, **db),
+        docs=ApplicationSettings.DocumentAuth(enabled=False, username='', password='', url_prefix=''),
+        storage={'url': 'file:///tmp/smartparking-benchmark'},
+        firebase={'kind': 'auth', 'project_id': 'smartparking-benchmark'},
+    )
+
+
+def open_resources(dsn: str, **db: Any) -> Resources:
+    return create_resources(settings(dsn, **db), logging.getLogger('benchmark'))
+
+
+async def create_accounts(engine: AsyncEngine, count: int) -> list[str]:
+    """
+    Recreates the schema and inserts accounts.
+
+    Returns:
+        list[str]: The login IDs of the accounts.
+    """
+    now = datetime.now()
+    rows = [
+        dict(
+            id=str(uuid4()),
+            login_id=f"bench-{i}",
+            name=f"Benchmark {i}",
+            email=f"bench-{i}@example.com",
+            created_at=now,
+            modified_at=now,
+            last_login=now,
+        ) for i in range(count)
+    ]
+
+    await create_schema(engine, drop=True)
+    if rows:
+        async with engine.begin() as conn:
+            await conn.execute(insert(m.Account), rows)
+
+    return [row['login_id'] for row in rows]
+
+
+class RoundTrips:
+    """
+    Counts statements sent to the database by an engine.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args: Any, **kwargs: Any) -> None:
+        self.count += 1
+
+    @contextmanager
+    def counting(self) -> Iterator['RoundTrips']:
+        self.count = 0
+        event.listen(self.engine.sync_engine, 'before_cursor_execute', self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine.sync_engine, 'before_cursor_execute', self._on_execute)
+
+
+class Timer:
+    """
+    Collects elapsed seconds of measured blocks.
+    """
+
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.append(time.perf_counter() - start)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+    def summary(self, name: str, **extra: Any) -> str:
+        mean = statistics.fmean(self.samples) if self.samples else 0.0
+        columns = [
+            f"{name:24}",
+            f"n={len(self.samples):<7}",
+            f"mean={mean * 1e3:8.3f}ms",
+            f"p50={self.percentile(0.5) * 1e3:8.3f}ms",
+            f"p99={self.percentile(0.99) * 1e3:8.3f}ms",
+        ] + [f"{k}={v}" for k, v in extra.items()]
+        return '  '.join(columns)
@@ -0,0 +1,93 @@
+"""
+Compares the resource session middleware with the former `@app.middleware('http')` implementation.
+
+The measured handlers do not query the database, so the results show the per-request overhead of the middleware.
+
+    python -m benchmarks.middleware --iterations 20000 --concurrency 50
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from smartparking.bootstrap import create_resources
+from smartparking.resources import ContextualResources, ResourceSession, ResourceSessionMiddleware
+from .common import Timer, arguments, settings
+
+CHUNKS = 64
+CHUNK = b'x' * 16384
+
+
+def build(install: Callable[[FastAPI], None]) -> FastAPI:
+    app = FastAPI()
+    install(app)
+
+    @app.get('/json')
+    async def json():
+        return {'status': 'ok'}
+
+    @app.get('/stream')
+    async def stream():
+        async def body():
+            for _ in range(CHUNKS):
+                yield CHUNK
+        return StreamingResponse(body(), media_type='application/octet-stream')
+
+    return app
+
+
+async def measure(name: str, app: FastAPI, path: str, iterations: int, concurrency: int) -> None:
+    timer = Timer()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://benchmark') as client:
+        async def request() -> None:
+            async with semaphore:
+                with timer.measure():
+                    response = await client.get(path)
+                    response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*[request() for _ in range(iterations)])
+        elapsed = time.perf_counter() - started
+
+    print(timer.summary(f"{name} {path}", rps=f"{iterations / elapsed:.1f}"))
+
+
+async def main(dsn: str, iterations: int, concurrency: int) -> None:
+    resources = create_resources(settings(dsn), logging.getLogger('benchmark'))
+
+    async def call_session(next: Callable[[ResourceSession], Awaitable[Any]]) -> Any:
+        # The session wrapper which `create_app()` installed with `@app.middleware('http')`.
+        async with ContextualResources.of(resources) as session:
+            try:
+                return await next(session)
+            except:
+                session.fail()
+                raise
+
+    def legacy(app: FastAPI) -> None:
+        @app.middleware('http')
+        async def call(req: Request, call_next):
+            async def next(session):
+                return await call_next(req)
+            return await call_session(next)
+
+    def asgi(app: FastAPI) -> None:
+        app.add_middleware(ResourceSessionMiddleware, resources=resources)
+
+    try:
+        for path in ('/json', '/stream'):
+            await measure('http middleware', build(legacy), path, iterations, concurrency)
+            await measure('ASGI middleware', build(asgi), path, iterations, concurrency)
+    finally:
+        await resources.close()
+
+
+if __name__ == '__main__':
+    parser = arguments(__doc__, dsn='sqlite+aiosqlite://')
+    parser.add_argument('--concurrency', type=int, default=50, help="Number of requests in flight.")
+    args = parser.parse_args()
+    asyncio.run(main(args.dsn, args.iterations, args.concurrency))
@@ -0,0 +1,113 @@
+"""
+Measures uploads of large objects to S3 by a single `PutObject` against concurrent multipart uploads.
+
+Run against an S3-compatible server, such as MinIO, given by `--endpoint`:
+
+    python -m benchmarks.s3_upload --endpoint http://127.0.0.1:9000 --access-key minio --secret minio123 --size 64
+
+Without `--endpoint`, an in-process moto server is started if moto is installed. A local server has neither
+the latency nor the limited throughput per connection of S3, which concurrent parts make up for, so
+`--latency` and `--bandwidth` delay each request to approximate them:
+
+    python -m benchmarks.s3_upload --size 64 --latency 20 --bandwidth 40
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Any, Optional
+from urllib.parse import urlencode
+import boto3
+from smartparking.ext.storage.s3 import S3Storage
+from .common import Timer
+
+MB = 1024 * 1024
+
+
+def storage(endpoint: str, bucket: str, access_key: str, secret: str, **options: int) -> S3Storage:
+    query = urlencode(dict(endpoint=endpoint, access_key=access_key, secret=secret, **options))
+    return S3Storage.of(f"s3://us-east-1/{bucket}?{query}")  # type: ignore
+
+
+def throttle(s: S3Storage, latency: float, bandwidth: float) -> None:
+    """
+    Delays each request of the storage by `latency` seconds plus the time to send its body at `bandwidth` bytes/s.
+    """
+    def before_send(request: Any, **kwargs: Any) -> None:
+        size = int(request.headers.get('Content-Length') or 0)
+        time.sleep(latency + (size / bandwidth if bandwidth else 0.0))
+
+    s.client.meta.events.register('before-send.s3', before_send)
+
+
+def start_moto() -> tuple[str, Optional[object]]:
+    from moto.server import ThreadedMotoServer
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    return f"http://{host}:{port}", server
+
+
+def main(args: argparse.Namespace) -> None:
+    server = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        endpoint, server = start_moto()
+
+    try:
+        client = boto3.client(
+            's3', endpoint_url=endpoint, region_name='us-east-1',
+            aws_access_key_id=args.access_key, aws_secret_access_key=args.secret,
+        )
+        try:
+            client.create_bucket(Bucket=args.bucket)
+        except client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+        data = os.urandom(args.size * MB)
+        single = storage(endpoint, args.bucket, args.access_key, args.secret, multipart_threshold=len(data) + 1)
+        multipart = storage(
+            endpoint, args.bucket, args.access_key, args.secret,
+            multipart_threshold=args.part_size * MB, part_size=args.part_size * MB, concurrency=args.concurrency,
+        )
+
+        if args.latency or args.bandwidth:
+            for s in (single, multipart):
+                throttle(s, args.latency / 1000, args.bandwidth * MB)
+
+        for name, s in [('single put', single), (f"multipart x{args.concurrency}", multipart)]:
+            timer = Timer()
+            for i in range(args.iterations):
+                with timer.measure():
+                    s.write(f"benchmark/{i}.bin", data)
+            mean = sum(timer.samples) / len(timer.samples)
+            print(timer.summary(name, size=f"{args.size}MB", throughput=f"{args.size / mean:.1f}MB/s"))
+
+        parts = (args.size + args.part_size - 1) // args.part_size
+        timer = Timer()
+        for i in range(args.iterations):
+            with timer.measure():
+                multipart.write_stream(f"benchmark/{i}.bin", (data[j:j + MB] for j in range(0, len(data), MB)))
+        print(timer.summary('multipart stream', parts=parts))
+
+        for s in (single, multipart):
+            s.close()
+    finally:
+        if server is not None:
+            server.stop()  # type: ignore
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', default=None, help="URL of the S3-compatible server. Starts moto if omitted.")
+    parser.add_argument('--bucket', default='smartparking-benchmark', help="Bucket, created if missing.")
+    parser.add_argument('--access-key', default='benchmark', help="Access key.")
+    parser.add_argument('--secret', default='benchmark', help="Secret key.")
+    parser.add_argument('--size', type=int, default=64, help="Size of an object in MB.")
+    parser.add_argument('--part-size', type=int, default=8, help="Size of a part in MB.")
+    parser.add_argument('--concurrency', type=int, default=4, help="Number of parts uploaded at once.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Milliseconds added to each request.")
+    parser.add_argument('--bandwidth', type=float, default=0.0, help="MB/s of each connection. 0 is unlimited.")
+    parser.add_argument('--iterations', type=int, default=5, help="Number of uploads of each kind.")
+    main(parser.parse_args())
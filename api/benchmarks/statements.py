@@ -0,0 +1,87 @@
+"""
+Measures per-call overhead of the login, signup and withdraw statements built on each call,
+as before, against the statements prebuilt in `smartparking.service.statements`.
+
+An in-memory SQLite database keeps the time spent in the database small, so that the difference shows
+the Python overhead of building statements and computing their cache keys.
+
+    python -m benchmarks.statements --iterations 5000
+"""
+import asyncio
+from datetime import datetime
+import timeit
+from uuid import uuid4
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as upsert
+from smartparking.resources import ContextualResources, context as r
+import smartparking.model.db as m
+import smartparking.model.composite as c
+import smartparking.service.statements as st
+from .common import Timer, arguments, create_accounts, open_resources
+
+
+def build_login(login_id: str, now: datetime):
+    return update(c.Me).where(m.Account.login_id == login_id).values(last_login=now).returning(c.Me)
+
+
+def build_signup(login_id: str, now: datetime):
+    return upsert(c.Me) \
+        .values(id=str(uuid4()), login_id=login_id, name='', email='', created_at=now, modified_at=now, last_login=now) \
+        .on_conflict_do_update(index_elements=[m.Account.login_id], set_=dict(last_login=now)) \
+        .returning(c.Me)
+
+
+def build_withdraw(id: str, now: datetime):
+    return update(m.Account) \
+        .where(m.Account.id == id, m.Account.deleted_at.is_(None)) \
+        .values(deleted_at=now, modified_at=now)
+
+
+async def run(name: str, iterations: int, call) -> None:
+    timer = Timer()
+    for i in range(iterations):
+        with timer.measure():
+            await call(i)
+    print(timer.summary(name))
+
+
+async def main(dsn: str, accounts: int, iterations: int) -> None:
+    resources = open_resources(dsn, last_login_interval=0)
+    try:
+        login_ids = await create_accounts(resources.db, accounts)
+        now = datetime.now()
+
+        for name, build in (
+            ('login', lambda: build_login(login_ids[0], now)),
+            ('signup', lambda: build_signup(login_ids[0], now)),
+            ('withdraw', lambda: build_withdraw('missing', now)),
+        ):
+            seconds = timeit.timeit(build, number=iterations) / iterations
+            print(f"{name + ' (build only)':24}  {seconds * 1e6:8.2f}us per statement")
+
+        async with ContextualResources.of(resources):
+            def login_id(i: int) -> str:
+                return login_ids[i % len(login_ids)]
+
+            await run('login (built)', iterations, lambda i: r.tx.scalar(
+                build_login(login_id(i), now), execution_options={'populate_existing': True}))
+            await run('login (prebuilt)', iterations, lambda i: r.tx.scalar(
+                st.login_me, dict(b_login_id=login_id(i), b_now=now), execution_options={'populate_existing': True}))
+
+            await run('signup (built)', iterations, lambda i: r.tx.scalar(
+                build_signup(login_id(i), now), execution_options={'populate_existing': True}))
+            await run('signup (prebuilt)', iterations, lambda i: r.tx.scalar(
+                st.signup_me, dict(b_id=str(uuid4()), b_login_id=login_id(i), b_name='', b_email='', b_now=now),
+                execution_options={'populate_existing': True}))
+
+            await run('withdraw (built)', iterations, lambda i: r.tx.execute(build_withdraw(f"missing-{i}", now)))
+            await run('withdraw (prebuilt)', iterations, lambda i: r.tx.execute(st.withdraw_account, dict(b_id=f"missing-{i}", b_now=now)))
+
+            r.fail()
+    finally:
+        await resources.close()
+
+
+if __name__ == '__main__':
+    args = arguments(__doc__, dsn='sqlite+aiosqlite://').parse_args()
+    asyncio.run(main(args.dsn, args.accounts, args.iterations))
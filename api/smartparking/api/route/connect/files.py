@@ -0,0 +1,92 @@
+import mimetypes
+import posixpath
+from typing import Optional
+from fastapi.responses import Response, StreamingResponse
+from smartparking.model.db import storage_prefix
+import smartparking.service.files as fs
+from smartparking.api.commons import (
+    APIRouter,
+    Authorized,
+    Depends,
+    Errors,
+    Header,
+    Path,
+    abort,
+    abort_with,
+    errorModel,
+    with_user,
+)
+from smartparking.api.shared.ranges import RangeNotSatisfiable, parse_range
+
+router = APIRouter()
+
+notFoundError = errorModel(Errors.DATA_NOT_FOUND)
+
+
+def owned(auth: Authorized, path: str) -> str:
+    """
+    Resolve a path given by the user to the storage path under the files of the account.
+
+    Args:
+        auth (Authorized): The authorized user.
+        path (str): The path relative to the files of the account.
+
+    Returns:
+        str: The storage path.
+    """
+    normalized = posixpath.normpath(path)
+    if normalized in ('', '.') or normalized.startswith(('/', '../')) or normalized == '..':
+        abort(404, Errors.DATA_NOT_FOUND)
+    return storage_prefix(auth.me.id) + normalized
+
+
+@router.get(
+    "/{path:path}",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/octet-stream": {}}, "description": "The whole file."},
+        206: {"content": {"application/octet-stream": {}}, "description": "The range of the file given by `Range`."},
+        404: {"model": notFoundError, "description": "The file does not exist."},
+        416: {"description": "The range starts beyond the file."},
+    },
+)
+async def download(
+    path: str = Path(description="Path of the file relative to the files of the account."),
+    range: Optional[str] = Header(default=None, description="Single range of bytes, such as `bytes=0-1023`."),
+    auth: Authorized = Depends(with_user),
+):
+    """
+    Download a file of the account.
+
+    The file is streamed from the storage as it is sent, so that memory does not grow with its size.
+    A single range in `Range` is answered by 206 with the bytes of the range only.
+
+    Args:
+        path (str): Path of the file relative to the files of the account.
+        range (Optional[str]): The `Range` header.
+        auth (Authorized): Authorized user information obtained from the user dependency.
+
+    Returns:
+        StreamingResponse: The content of the file.
+    """
+    key = owned(auth, path)
+    size = (await fs.size(key)).or_else(abort_with(404))
+
+    try:
+        byte_range = parse_range(range, size)
+    except RangeNotSatisfiable as e:
+        return Response(status_code=416, headers={"Content-Range": e.content_range, "Accept-Ranges": "bytes"})
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes"}
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        chunks = (await fs.stream(key)).get()
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(byte_range.length)
+    headers["Content-Range"] = byte_range.content_range(size)
+    chunks = (await fs.stream(key, byte_range.start, byte_range.end)).get()
+    return StreamingResponse(chunks, status_code=206, media_type=media_type, headers=headers)
+
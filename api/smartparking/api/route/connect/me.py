@@ -4,6 +4,7 @@ from smartparking.api.commons import (
     Authorized,
     Depends,
     Query,
+    abort_with,
     vr,
     with_token,
     with_user,
@@ -35,7 +36,7 @@ async def signup(
     name = auth.claims.get("name", "")
     email = auth.claims.get("email", "")
 
-    account, point = (await as_.signup(login_id, name, email)).get()
+    account = (await as_.signup(login_id, name, email)).or_else(abort_with(401))
     return vr.Me.of(account)
 
 
@@ -57,10 +58,7 @@ async def login(
     Returns:
         vr.Me: User information including account details and points.
     """
-    login_id = auth.claims.get("sub", "")
-    account, point = (await as_.login(login_id)).get()
-
-    return vr.Me.of(account)
+    return vr.Me.of(auth.me)
 
 
 @router.delete(
@@ -76,7 +74,7 @@ async def withdraw(
     """
     Withdraw from the service.
 
-    Deletes all existing data and files along with the account information.
+    The account is no longer available once this returns. Its data and files are deleted in the background.
 
     Args:
         auth (Authorized): Authorized user information obtained from the user dependency.
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Request
+from smartparking.api.shared.auth import claims_cache
+from smartparking.pool import engine_stats
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/pool",
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": "State of the DB connection pools.",
+        },
+    },
+    include_in_schema=False
+)
+async def pool(request: Request):
+    """
+    Return the state of the DB connection pools of the primary and the replicas: checked out and overflow
+    connections, timeouts and the histogram of checkout wait time.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        dict: The pool statistics.
+    """
+    resources = request.app.state.resources
+    return engine_stats(resources.db, resources.replicas)
+
+
+@router.get(
+    "/withdrawals",
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": "Progress of the purge of withdrawn accounts.",
+        },
+    },
+    include_in_schema=False
+)
+async def withdrawals(request: Request):
+    """
+    Return the number of withdrawals in each stage and the counters of the worker of this process.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        dict: The withdrawal statistics.
+    """
+    resources = request.app.state.resources
+    return await resources.withdrawals.stats()
+
+
+@router.get(
+    "/outbox",
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": "Queue of side effects waiting for the outbox worker.",
+        },
+    },
+    include_in_schema=False
+)
+async def outbox(request: Request):
+    """
+    Return the number of pending outbox messages by topic, the age of the oldest one, the number of failed ones
+    and the counters of the worker of this process.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        dict: The outbox statistics.
+    """
+    resources = request.app.state.resources
+    return await resources.outbox.stats()
+
+
+@router.get(
+    "/auth",
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": "Hit ratios of the caches used by authorization.",
+        },
+    },
+    include_in_schema=False
+)
+async def auth(request: Request):
+    """
+    Return the counters of the cache of verified token claims and of the cache of account snapshots
+    of this process.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        dict: The cache statistics.
+    """
+    resources = request.app.state.resources
+    return {
+        'claims': claims_cache.stats(),
+        'identities': resources.identities.stats(),
+    }
@@ -7,8 +7,9 @@ from smartparking.model.errors import Errors
 from fastapi import APIRouter, Depends, FastAPI, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
-from .route.connect import data, me
-from .route.internal import docs
+from .route.connect import data, files, me
+from .route.internal import docs, stats
+from .shared.dependencies import Deadline
 from .shared.errors import ValidationErrorResponse, errorModel, setup_handlers
 
 # Initialize HTTP Basic security scheme
@@ -17,6 +18,9 @@ security = HTTPBasic()
 # Define an error model for authentication errors
 authError = errorModel(Errors.UNAUTHORIZED, Errors.NOT_SIGNED_UP)
 
+# Define an error model for requests exceeding their deadlines
+deadlineError = errorModel(Errors.DEADLINE_EXCEEDED)
+
 router = APIRouter()
 
 def setup_api(app: FastAPI, env: Environment, logger: logging.Logger):
@@ -34,14 +38,21 @@ def setup_api(app: FastAPI, env: Environment, logger: logging.Logger):
             422: {
                 "model": ValidationErrorResponse,
                 "description": "Validation error.",
-            }
+            },
+            504: {
+                "model": deadlineError,
+                "description": "Time limit exceeded.",
+            },
         },
     )
 
+    # Each group of routes is given a deadline bounding how long a request may hold a DB connection
+    # and wait for storage or Firebase.
     router.include_router(
         prefix="/me",
         router=me.router,
         tags=["Me"],
+        dependencies=[Depends(Deadline(5.0))],
         responses={
             401: {"model": authError, "description": "Authentication failed."},
         },
@@ -51,24 +62,44 @@ def setup_api(app: FastAPI, env: Environment, logger: logging.Logger):
         prefix="/data",
         router=data.router,
         tags=["Data"],
+        dependencies=[Depends(Deadline(30.0))],
         responses={
             401: {"model": authError, "description": "Authentication failed."},
         },
     )
 
-    # Conditionally include documentation routes if enabled in the environment settings
-    if env.settings.docs.enabled:
-        doc_dependencies = []
+    # Downloads are not bounded by the deadline, which only limits finding the file.
+    router.include_router(
+        prefix="/files",
+        router=files.router,
+        tags=["Files"],
+        dependencies=[Depends(Deadline(30.0))],
+        responses={
+            401: {"model": authError, "description": "Authentication failed."},
+        },
+    )
 
-        if env.settings.docs.username:
-            doc_dependencies.append(Depends(DocumentAuth(env.settings.docs)))
+    doc_dependencies = []
 
+    if env.settings.docs.username:
+        doc_dependencies.append(Depends(DocumentAuth(env.settings.docs)))
+
+    # Conditionally include documentation routes if enabled in the environment settings
+    if env.settings.docs.enabled:
         router.include_router(
             prefix="/docs",
             router=docs.router,
             dependencies=doc_dependencies,
         )
 
+    # Runtime statistics share the credentials of the documentation
+    if env.settings.stats.enabled:
+        router.include_router(
+            prefix="/stats",
+            router=stats.router,
+            dependencies=doc_dependencies,
+        )
+
     # Include the configured router into the FastAPI application
     app.include_router(router)
 
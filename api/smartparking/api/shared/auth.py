@@ -1,12 +1,15 @@
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Optional, Generic, TypeVar, Dict
+import hashlib
+import time
+from typing import Any, Callable, Optional, Generic, TypeVar, Dict
 from fastapi import Header, Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
-from smartparking.model.errors import Errors, Errorneous
-from smartparking.resources import context as r
+from smartparking.model.errors import Errors
+from smartparking.resources import DeadlineExceeded, context as r
 import smartparking.model.composite as c
-from .errors import abort, abort_with
+from .errors import abort
 
 Me = TypeVar('Me')
 
@@ -17,11 +20,189 @@ class Authorized(Generic[Me]):
     claims: Dict[str, Any]
 
 
+class ClaimsCache:
+    """
+    Bounded LRU cache of verified claims keyed by the digest of the token.
+
+    Each entry expires at the `exp` claim of its token, so a cached token is never accepted longer than
+    the verification itself would accept it.
+    """
+
+    def __init__(self, maxsize: int = 4096, clock: Callable[[], float] = time.time) -> None:
+        #: Maximum number of entries. Caching is disabled when 0.
+        self.maxsize = maxsize
+        #: Number of lookups answered from the cache.
+        self.hits = 0
+        #: Number of lookups that required verification.
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, Dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves the claims of a token verified before.
+
+        Args:
+            token (str): The bearer token.
+
+        Returns:
+            Optional[Dict[str, Any]]: A copy of the claims, or None if not cached or expired.
+        """
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._clock() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        Stores the claims of a verified token until its `exp`.
+
+        Args:
+            token (str): The bearer token.
+            claims (Dict[str, Any]): The verified claims.
+        """
+        exp = claims.get('exp')
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)) or exp <= self._clock():
+            return
+
+        key = self.digest(token)
+        self._entries[key] = (float(exp), dict(claims))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters of the cache.
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+#: Verified claims shared by all authorization dependencies.
+claims_cache = ClaimsCache()
+
+
+class IdentityCache:
+    """
+    Process-local LRU cache of account snapshots keyed by login ID, used to authorize requests without a query.
+
+    Entries live for `ttl` seconds at most. Services changing or deleting an account must call `invalidate()`
+    once the change is committed, so that the change is visible to the following requests of this process.
+    A snapshot loaded before an invalidation is not stored by `put()` when given the `since` of the lookup.
+
+    Other processes are not notified, so they keep authorizing a changed or withdrawn account with its cached
+    snapshot for up to `ttl` seconds after the change. Keep `ttl` as short as that staleness is acceptable.
+    """
+
+    def __init__(self, size: int = 10000, ttl: float = 10.0, clock: Callable[[], float] = time.monotonic) -> None:
+        #: Maximum number of entries. Caching is disabled when 0.
+        self.size = size
+        #: Seconds an entry is valid for.
+        self.ttl = ttl
+        #: Number of lookups answered from the cache.
+        self.hits = 0
+        #: Number of lookups that required a query.
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, c.MeSnapshot]] = OrderedDict()
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and self.ttl > 0
+
+    def get(self, login_id: str) -> Optional[c.MeSnapshot]:
+        """
+        Retrieves the cached snapshot of the account.
+
+        Args:
+            login_id (str): The login ID.
+
+        Returns:
+            Optional[c.MeSnapshot]: The snapshot, or None if not cached or expired.
+        """
+        entry = self._entries.get(login_id)
+        if entry is not None:
+            if self._clock() < entry[0]:
+                self._entries.move_to_end(login_id)
+                self.hits += 1
+                return entry[1]
+            del self._entries[login_id]
+        self.misses += 1
+        return None
+
+    @property
+    def version(self) -> int:
+        """
+        Number of invalidations so far, to be given to `put()` as `since` before loading a snapshot.
+        """
+        return self._invalidations
+
+    def put(self, me: c.MeSnapshot, since: Optional[int] = None) -> c.MeSnapshot:
+        """
+        Stores the snapshot of an account.
+
+        Args:
+            me (c.MeSnapshot): The snapshot.
+            since (Optional[int]): `version` before the snapshot was loaded. The snapshot is not stored
+                if an account was invalidated meanwhile, since it may predate the change.
+
+        Returns:
+            c.MeSnapshot: The snapshot.
+        """
+        if self.enabled and (since is None or since == self._invalidations):
+            self._entries[me.login_id] = (self._clock() + self.ttl, me)
+            self._entries.move_to_end(me.login_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return me
+
+    def invalidate(self, login_id: str) -> None:
+        self._invalidations += 1
+        self._entries.pop(login_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
 class Authorization(Generic[Me]):
     """
     A dependency object type that performs Bearer authentication.
     """
 
+    #: Cache of verified claims.
+    claims: ClaimsCache = claims_cache
+
     async def __call__(
             self,
             authorization: Optional[str] = Header(default=None),
@@ -44,10 +225,15 @@ class Authorization(Generic[Me]):
             abort(401, code=Errors.UNAUTHORIZED.name, message="Invalid authorization header")
 
         token = authorization[7:]
-        try:
-            claims = r.auth.verify(token)
-        except Exception as e:
-            abort(401, code=Errors.UNAUTHORIZED.name, message="Token verification failed")
+        claims = self.claims.get(token)
+        if claims is None:
+            try:
+                claims = await r.bounded(r.auth.averify(token))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                abort(401, code=Errors.UNAUTHORIZED.name, message="Token verification failed")
+            self.claims.put(token, claims)
 
         me = await self.authorize(claims)
 
@@ -99,12 +285,37 @@ class WithToken(Authorization[None]):
         return None
 
 
-class WithUser(Authorization[c.Me]):
+async def identify(login_id: str) -> Optional[c.MeSnapshot]:
+    """
+    Resolve the login ID to the snapshot of the account, consulting the identity cache first.
+
+    Args:
+        login_id (str): The `sub` claim of the token.
+
+    Returns:
+        Optional[c.MeSnapshot]: The snapshot of the account, or None if not signed up.
+    """
+    from smartparking.service.account import login, touch
+
+    me = r.identities.get(login_id)
+    if me is not None:
+        await touch(login_id)
+        return me
+
+    since = r.identities.version
+    result = await login(login_id)
+    if not result:
+        result.resolve()
+        return None
+    return r.identities.put(c.MeSnapshot.of(result.get()), since)
+
+
+class WithUser(Authorization[c.MeSnapshot]):
     """
     Authorization class that requires a valid Bearer token and associates it with a user.
     """
 
-    async def authorize(self, claims: Dict[str, Any]) -> c.Me:
+    async def authorize(self, claims: Dict[str, Any]) -> c.MeSnapshot:
         """
         Authorize the user by retrieving user information based on the token claims.
 
@@ -112,34 +323,32 @@ class WithUser(Authorization[c.Me]):
             claims (Dict[str, Any]): The claims extracted from the token.
 
         Returns:
-            c.Me: The authenticated user object.
+            c.MeSnapshot: The authenticated user object.
 
         Raises:
             HTTPException: If the user is not signed up.
         """
-        from smartparking.service.account import login
-
-        result = await login(claims['sub'])
-        if isinstance(result, Errorneous):
-            abort_with(401, Errors.NOT_SIGNED_UP.name, "Not signed up yet")
-        return result.value  # Assuming `Maybe` has a `value` attribute for successful results
+        me = await identify(claims['sub'])
+        if me is None:
+            abort(401, code=Errors.NOT_SIGNED_UP.name, message="Not signed up yet")
+        return me
 
 
-class MaybeUser(Authorization[Optional[c.Me]]):
+class MaybeUser(Authorization[Optional[c.MeSnapshot]]):
     """
     Authorization class that may or may not associate the Bearer token with a user.
     """
 
-    def no_auth(self, *args) -> Optional[c.Me]:
+    def no_auth(self, *args) -> Optional[c.MeSnapshot]:
         """
         Handle cases where no authentication is provided by returning None.
 
         Returns:
-            Optional[c.Me]: None, indicating no user is authenticated.
+            Optional[c.MeSnapshot]: None, indicating no user is authenticated.
         """
         return None
 
-    async def authorize(self, claims: Dict[str, Any]) -> Optional[c.Me]:
+    async def authorize(self, claims: Dict[str, Any]) -> Optional[c.MeSnapshot]:
         """
         Attempt to authorize the user, returning None if the user is not signed up.
 
@@ -147,14 +356,12 @@ class MaybeUser(Authorization[Optional[c.Me]]):
             claims (Dict[str, Any]): The claims extracted from the token.
 
         Returns:
-            Optional[c.Me]: The authenticated user object or None.
+            Optional[c.MeSnapshot]: The authenticated user object or None.
         """
-        from smartparking.service.account import login
-
-        result = await login(claims['sub'])
-        if isinstance(result, Errorneous):
+        me = await identify(claims['sub'])
+        if me is None:
             return self.no_auth()
-        return result.value  # Assuming `Maybe` has a `value` attribute for successful results
+        return me
 
 
 # ----------------------------------------------------------------
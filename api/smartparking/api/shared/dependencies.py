@@ -1,6 +1,24 @@
 from typing import Any
 from fastapi import Request, Header
 from smartparking.ext.storage.local import LocalStorage
+from smartparking.resources import context as r
+
+
+class Deadline:
+    """
+    Dependency limiting the time of the request.
+
+    The limit is applied to the resource session, which gives the remaining time to DB transactions as
+    `statement_timeout` and cancels storage and Firebase calls awaited through `r.bounded()` when it passes.
+    Requests exceeding it are answered by 504 with `deadline_exceeded`.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        #: Time budget in seconds.
+        self.seconds = seconds
+
+    async def __call__(self) -> None:
+        r.limit(self.seconds)
 
 
 class URLFor:
@@ -22,7 +40,6 @@ class URLFor:
         return f'{scheme}://{netloc}/{script}/{path}'
 
     def storage(self, path: str) -> str:
-        from smartparking.resources import context as r
         from smartparking.config import environment
 
         static = environment().settings.static
@@ -14,7 +14,9 @@ from starlette.exceptions import HTTPException
 from pydantic import ValidationError, Field
 from pydantic.dataclasses import dataclass
 from pydantic_core import ErrorDetails
-from smartparking.model.errors import Errorneous
+from sqlalchemy.exc import DBAPIError
+from smartparking.model.errors import Errorneous, Errors
+from smartparking.resources import DeadlineExceeded
 from .i18n import I18N
 
 
@@ -258,6 +260,28 @@ def setup_handlers(
         err = ErrorResponse(code="unexpected", message="Internal server error.")
         return JSONResponse(status_code=500, content=jsonable_encoder(err.localize(formatter(req))))
 
+    # Time limit of the request, including statements cancelled by `statement_timeout`.
+    def deadline_exceeded(req: Request, exc: Exception) -> JSONResponse:
+        logger.warning(f"Deadline exceeded: {req.method} {req.url.path}: {exc}")
+        err = ErrorResponse(
+            code=Errors.DEADLINE_EXCEEDED.name.lower(),
+            message=Errors.DEADLINE_EXCEEDED.doc,
+        )
+        return JSONResponse(status_code=504, content=jsonable_encoder(err.localize(formatter(req))))
+
+    @app.exception_handler(DeadlineExceeded)
+    async def deadline_handler(req: Request, exc: DeadlineExceeded):
+        return deadline_exceeded(req, exc)
+
+    @app.exception_handler(DBAPIError)
+    async def db_error_handler(req: Request, exc: DBAPIError):
+        # 57014 is query_canceled of PostgreSQL.
+        if getattr(exc.orig, 'sqlstate', None) == '57014':
+            return deadline_exceeded(req, exc)
+        logger.error("Unexpected DB error was thrown.", exc_info=exc)
+        err = ErrorResponse(code="unexpected", message="Internal server error.")
+        return JSONResponse(status_code=500, content=jsonable_encoder(err.localize(formatter(req))))
+
     # Application error.
     @app.exception_handler(HTTPApplicationError)
     async def application_error_handler(req: Request, exc: HTTPApplicationError):
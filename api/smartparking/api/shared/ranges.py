@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    Raised when no byte of the requested range exists in the representation.
+    """
+
+    def __init__(self, size: int) -> None:
+        super().__init__(f"Range is not satisfiable in {size} bytes.")
+        #: Size of the representation.
+        self.size = size
+
+    @property
+    def content_range(self) -> str:
+        """
+        Value of the `Content-Range` header of the 416 response.
+        """
+        return f"bytes */{self.size}"
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    """
+    Range of bytes from `start` to `end` exclusive.
+    """
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+    def content_range(self, size: int) -> str:
+        """
+        Value of the `Content-Range` header of the 206 response.
+        """
+        return f"bytes {self.start}-{self.end - 1}/{size}"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[ByteRange]:
+    """
+    Parses the `Range` header of a request for a representation of `size` bytes.
+
+    Only a single range of bytes is served partially. Multiple ranges, other units and malformed values are ignored,
+    so that the whole representation is served, as RFC 9110 allows.
+
+    Args:
+        header (Optional[str]): The header value.
+        size (int): Size of the representation.
+
+    Returns:
+        Optional[ByteRange]: The range clipped to the size, or None to serve the whole representation.
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the representation.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+            if last and end <= start:
+                return None
+        else:
+            # A suffix range selects the last bytes.
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(size)
+            start, end = max(size - suffix, 0), size
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    return ByteRange(start, min(end, size))
@@ -43,6 +43,6 @@ class Me:
     modified_at: datetime = Field(description="Last modification date and time.")
 
     @classmethod
-    def of(cls, me: c.Me) -> Self:
+    def of(cls, me: c.Me | c.MeSnapshot) -> Self:
 
         return cls(id=me.id, created_at = me.created_at,modified_at=me.modified_at)
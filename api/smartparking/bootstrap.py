@@ -0,0 +1,106 @@
+"""
+Assembly of the resources of the application with the components of the service and API layers.
+
+Resources hold the workers and caches built here without depending on the layers which define them.
+"""
+import logging
+from sqlalchemy.ext.asyncio import create_async_engine
+from smartparking.api.shared.auth import IdentityCache
+from smartparking.config import ApplicationSettings
+from smartparking.ext.firebase.base import FirebaseAuth, FirebaseAdmin, FirebaseAuthSettings
+from smartparking.ext.storage.base import Storage
+from smartparking.pool import configure_sqlite, engine_options
+from smartparking.resources import Resources
+from smartparking.service.outbox import OutboxWorker, handlers
+from smartparking.service.withdrawal import WithdrawalWorker
+from smartparking.service.writebehind import LastLoginBuffer
+
+
+def create_resources(settings: ApplicationSettings, logger: logging.Logger) -> Resources:
+    """
+    Create the application resources, including the database engine, storage, and Firebase services.
+
+    Nothing is connected here. `Resources.start()` prepares the resources on the event loop serving them.
+
+    Args:
+        settings (ApplicationSettings): The application settings.
+        logger (logging.Logger): The logger instance.
+
+    Returns:
+        Resources: The resources.
+    """
+    # Create the asynchronous database engine
+    engine = create_async_engine(
+        settings.db.dsn,
+        echo_pool=settings.db.echo_pool and "debug",
+        **engine_options(settings.db),
+    )
+    if settings.db.echo:
+        engine.echo = True
+
+    replicas = [
+        create_async_engine(
+            dsn,
+            echo=settings.db.echo,
+            echo_pool=settings.db.echo_pool and "debug",
+            **engine_options(settings.db, dsn),
+        ) for dsn in settings.db.replicas
+    ]
+
+    for e in [engine, *replicas]:
+        if e.dialect.name == 'sqlite':
+            configure_sqlite(e)
+
+    # Initialize storage based on the provided URL
+    import smartparking.ext.storage.local
+    import smartparking.ext.storage.s3
+    storage = Storage.of(settings.storage.url)
+    if storage is None:
+        raise ValueError(f"Invalid URL for storage: {settings.storage.url}")
+
+    # Initialize Firebase services
+    firebase = FirebaseAuth(settings.firebase) if isinstance(settings.firebase,
+                                                             FirebaseAuthSettings) else FirebaseAdmin(settings.firebase)
+
+    return Resources(
+        db=engine,
+        storage=storage,
+        firebase=firebase,
+        logger=logger,
+        last_login=LastLoginBuffer(
+            engine,
+            interval=settings.db.last_login_interval,
+            threshold=settings.db.last_login_threshold,
+            logger=logger,
+        ),
+        identities=IdentityCache(
+            size=settings.identity_cache.size,
+            ttl=settings.identity_cache.ttl,
+        ),
+        withdrawals=WithdrawalWorker(
+            engine,
+            storage,
+            interval=settings.withdrawal.interval,
+            chunk_size=settings.withdrawal.chunk_size,
+            storage_batch=settings.withdrawal.storage_batch,
+            lease=settings.withdrawal.lease,
+            max_attempts=settings.withdrawal.max_attempts,
+            logger=logger,
+        ),
+        outbox=OutboxWorker(
+            engine,
+            handlers(storage, firebase, logger),
+            interval=settings.outbox.interval,
+            batch_size=settings.outbox.batch_size,
+            concurrency=settings.outbox.concurrency,
+            lease=settings.outbox.lease,
+            max_attempts=settings.outbox.max_attempts,
+            backoff=settings.outbox.backoff,
+            max_backoff=settings.outbox.max_backoff,
+            logger=logger,
+        ),
+        replicas=replicas,
+        warmup=settings.db.warmup,
+        create_schema=settings.db.create_schema,
+    )
+
@@ -0,0 +1,316 @@
+"""
+Imports accounts from a CSV or NDJSON file into the `account` table.
+
+Records are streamed in batches into a temporary staging table with `COPY` and merged into `account`
+with `INSERT ... ON CONFLICT (login_id)`, so memory use depends on the batch size, not on the file size.
+Each batch is committed separately and an interrupted import can be run again.
+Records whose `id` belongs to another account, in the table or in the same batch, are skipped and counted as conflicts.
+
+Fields of records are `login_id` (required), `name`, `email`, `id` and `created_at` (ISO 8601).
+Missing IDs are generated and missing timestamps are the time of the import.
+
+    python -m smartparking.command.import_accounts accounts.csv
+    python -m smartparking.command.import_accounts accounts.ndjson --batch-size 10000 --skip-existing
+"""
+import argparse
+import asyncio
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+from typing import Any, Iterable, Iterator, Optional, TextIO
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from smartparking.config import ApplicationSettings, environment
+from smartparking.pool import engine_options
+import smartparking.model.db as m
+
+
+#: Columns of `account` written by the import.
+COLUMNS = ('id', 'login_id', 'name', 'email', 'created_at', 'modified_at', 'last_login')
+
+#: Name of the staging table, which is temporary and private to the connection.
+STAGING = 'account_import'
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+@dataclass
+class ImportReport:
+    """
+    Counters of an import.
+    """
+    #: Number of records read from the file.
+    read: int = 0
+    #: Number of accounts inserted.
+    inserted: int = 0
+    #: Number of existing accounts updated.
+    updated: int = 0
+    #: Number of records rejected by validation.
+    rejected: int = 0
+    #: Number of records skipped since their ID belongs to another account.
+    conflicted: int = 0
+    #: Number of committed batches.
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """
+        Records read per second.
+        """
+        elapsed = self.elapsed
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f"read={self.read} inserted={self.inserted} updated={self.updated} rejected={self.rejected} " \
+               f"conflicted={self.conflicted} batches={self.batches} elapsed={self.elapsed:.1f}s rate={self.rate:.0f} records/s"
+
+
+def read_records(source: TextIO, format: str) -> Iterator[dict[str, Any]]:
+    """
+    Reads records one by one from a CSV file with a header line or from an NDJSON file.
+
+    Args:
+        source (TextIO): The opened file.
+        format (str): `csv` or `ndjson`.
+
+    Returns:
+        Iterator[dict[str, Any]]: The records.
+    """
+    if format == 'csv':
+        yield from csv.DictReader(source)
+    elif format == 'ndjson':
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+
+
+def to_row(record: dict[str, Any], now: datetime) -> tuple:
+    """
+    Converts a record into values of `COLUMNS`.
+
+    Raises:
+        InvalidRecord: If the record has no `login_id` or an invalid timestamp.
+    """
+    login_id = str(record.get('login_id') or '').strip()
+    if not login_id:
+        raise InvalidRecord("login_id is required.")
+
+    created_at = record.get('created_at') or None
+    if created_at is None:
+        created_at = now
+    else:
+        try:
+            created_at = datetime.fromisoformat(str(created_at))
+        except ValueError:
+            raise InvalidRecord(f"Invalid created_at: {created_at}")
+
+    return (
+        str(record.get('id') or uuid4()),
+        login_id,
+        str(record.get('name') or ''),
+        str(record.get('email') or ''),
+        created_at,
+        now,
+        created_at,
+    )
+
+
+class AccountImporter:
+    """
+    Writes batches of rows into `account` through the staging table on an asyncpg connection.
+    """
+
+    def __init__(
+        self,
+        connection: Any,
+        batch_size: int = 5000,
+        skip_existing: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        #: asyncpg connection.
+        self.connection = connection
+        #: Maximum number of rows held in memory and committed at once.
+        self.batch_size = batch_size
+        #: Whether to leave existing accounts untouched instead of updating their name and email.
+        self.skip_existing = skip_existing
+        self.logger = logger or logging.getLogger(__name__)
+
+    @property
+    def merge_statement(self) -> str:
+        columns = ', '.join(COLUMNS)
+        table = m.Account.__tablename__
+        action = "NOTHING" if self.skip_existing else \
+            "UPDATE SET name = EXCLUDED.name, email = EXCLUDED.email, modified_at = EXCLUDED.modified_at"
+        # DISTINCT ON keeps the last record of a login_id in the batch, which ON CONFLICT requires to be unique.
+        # ON CONFLICT covers only login_id, so records whose id is taken by another login_id are left out
+        # instead of failing the batch on the primary key.
+        # xmax is 0 only for inserted rows.
+        return f"""
+            WITH latest AS (
+                SELECT DISTINCT ON (login_id) {columns} FROM {STAGING} ORDER BY login_id, seq DESC
+            ), accepted AS (
+                SELECT {columns} FROM latest l
+                WHERE NOT EXISTS (SELECT 1 FROM {table} a WHERE a.id = l.id AND a.login_id <> l.login_id)
+                AND NOT EXISTS (SELECT 1 FROM latest o WHERE o.id = l.id AND o.login_id <> l.login_id)
+            ), merged AS (
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM accepted
+                ON CONFLICT (login_id) DO {action}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                (SELECT count(*) FROM merged WHERE inserted),
+                (SELECT count(*) FROM merged WHERE NOT inserted),
+                (SELECT count(*) FROM latest) - (SELECT count(*) FROM accepted)
+        """
+
+    async def prepare(self) -> None:
+        """
+        Creates the staging table for the connection.
+        """
+        await self.connection.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING} (LIKE {m.Account.__tablename__} INCLUDING DEFAULTS, seq bigint)"
+        )
+
+    async def write(self, rows: list[tuple]) -> tuple[int, int, int]:
+        """
+        Copies rows into the staging table and merges them into `account` in a transaction.
+
+        Args:
+            rows (list[tuple]): Values of `COLUMNS`.
+
+        Returns:
+            tuple[int, int, int]: Numbers of inserted and updated accounts and of records skipped by ID conflicts.
+        """
+        async with self.connection.transaction():
+            await self.connection.copy_records_to_table(
+                STAGING,
+                records=(row + (i,) for i, row in enumerate(rows)),
+                columns=[*COLUMNS, 'seq'],
+            )
+            inserted, updated, conflicted = await self.connection.fetchrow(self.merge_statement)
+            await self.connection.execute(f"TRUNCATE {STAGING}")
+        return inserted, updated, conflicted
+
+    async def run(self, records: Iterable[dict[str, Any]], progress: int = 10) -> ImportReport:
+        """
+        Imports records.
+
+        Args:
+            records (Iterable[dict[str, Any]]): The records, which are consumed lazily.
+            progress (int): Number of batches between progress logs.
+
+        Returns:
+            ImportReport: The counters.
+        """
+        report = ImportReport()
+        now = datetime.now()
+        batch: list[tuple] = []
+
+        async def flush() -> None:
+            inserted, updated, conflicted = await self.write(batch)
+            report.inserted += inserted
+            report.updated += updated
+            report.conflicted += conflicted
+            if conflicted:
+                self.logger.warning(f"Skipped {conflicted} records of batch {report.batches + 1} whose ID belongs to another account.")
+            report.batches += 1
+            batch.clear()
+            if report.batches % progress == 0:
+                self.logger.info(f"Importing accounts: {report}")
+
+        await self.prepare()
+        for record in records:
+            report.read += 1
+            try:
+                batch.append(to_row(record, now))
+            except InvalidRecord as e:
+                report.rejected += 1
+                self.logger.warning(f"Rejected record {report.read}: {e}")
+                continue
+            if len(batch) >= self.batch_size:
+                await flush()
+        if batch:
+            await flush()
+
+        return report
+
+
+async def import_accounts(
+    engine: AsyncEngine,
+    source: TextIO,
+    format: str,
+    batch_size: int = 5000,
+    skip_existing: bool = False,
+    logger: Optional[logging.Logger] = None,
+) -> ImportReport:
+    """
+    Imports accounts from a file with a connection of the engine.
+
+    Args:
+        engine (AsyncEngine): The engine, which must use asyncpg.
+        source (TextIO): The opened file.
+        format (str): `csv` or `ndjson`.
+        batch_size (int): Number of records committed at once.
+        skip_existing (bool): Whether to leave existing accounts untouched.
+        logger (Optional[logging.Logger]): The logger reporting progress.
+
+    Returns:
+        ImportReport: The counters.
+    """
+    if engine.url.get_driver_name() != 'asyncpg':
+        raise ValueError(f"Bulk import requires asyncpg, but the DSN uses {engine.url.drivername}.")
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        importer = AccountImporter(raw.driver_connection, batch_size, skip_existing, logger)
+        return await importer.run(read_records(source, format))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help="CSV or NDJSON file of accounts. '-' reads the standard input.")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help="Format of the file, guessed by its suffix if omitted.")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Number of records committed at once.")
+    parser.add_argument('--skip-existing', action='store_true', help="Leave existing accounts untouched.")
+    parser.add_argument('--dsn', help="DSN of the database, which defaults to the one of the environment.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    logger = logging.getLogger('import_accounts')
+
+    format = args.format or ('csv' if Path(args.file).suffix.lower() == '.csv' else 'ndjson')
+    # The environment is loaded only without a DSN, so that the import does not require the settings of the API.
+    db = ApplicationSettings.DB(dsn=args.dsn) if args.dsn else environment().settings.db
+    dsn = db.dsn
+
+    async def run() -> ImportReport:
+        engine = create_async_engine(dsn, **engine_options(db, dsn))
+        try:
+            if args.file == '-':
+                return await import_accounts(engine, sys.stdin, format, args.batch_size, args.skip_existing, logger)
+            with open(args.file, newline='', encoding='utf-8-sig') as source:
+                return await import_accounts(engine, source, format, args.batch_size, args.skip_existing, logger)
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(run())
+    logger.info(f"Imported accounts: {report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,9 +18,50 @@ class ApplicationSettings(BaseSettings):
         DB Connection.
         """
         dsn: str = Field(description="Destination DSN.")
+        replicas: list[str] = Field(default_factory=list, description="DSNs of read replicas serving read-only requests.")
         pool_size: int = Field(default=20, description="Maximum number of connection pool.")
+        max_overflow: int = Field(default=10, description="Number of connections allowed beyond the pool size.")
+        pool_timeout: float = Field(default=30.0, description="Seconds to wait for a pooled connection before failing.")
+        pool_recycle: int = Field(default=1800, description="Seconds after which a connection is replaced. -1 disables recycling.")
+        pool_pre_ping: bool = Field(default=False, description="Whether to test connections on checkout.")
+        warmup: int = Field(default=0, description="Number of connections opened at startup.")
+        create_schema: bool = Field(default=False, description="Whether to create missing tables at startup, e.g. for SQLite in tests and benchmarks.")
+        query_cache_size: int = Field(default=500, description="Number of compiled statements cached by SQLAlchemy.")
+        prepared_statement_cache_size: int = Field(default=100, description="Number of statements prepared by SQLAlchemy per asyncpg connection. 0 disables, e.g. behind pgbouncer.")
+        statement_cache_size: int = Field(default=100, description="Number of statements cached by asyncpg itself per connection. 0 disables.")
         echo: bool = Field(default=False, description="Whether to output query logs.")
         echo_pool: bool = Field(default=False, description="Whether to output connection pool related logs.")
+        last_login_interval: float = Field(default=5.0, description="Seconds between bulk writes of last login times. 0 writes them on every request.")
+        last_login_threshold: int = Field(default=1000, description="Number of buffered last login times which triggers an early write.")
+
+    class IdentityCache(BaseModel):
+        """
+        Cache of authenticated accounts.
+        """
+        size: int = Field(default=10000, description="Maximum number of cached accounts. 0 disables the cache.")
+        ttl: float = Field(default=10.0, description="Seconds an account is cached for, which bounds how long other processes authorize an account after it is withdrawn.")
+
+    class Withdrawal(BaseModel):
+        """
+        Background purge of withdrawn accounts.
+        """
+        interval: float = Field(default=0.0, description="Seconds between polls for pending withdrawals, e.g. 5. The worker runs only in processes where this is set, and is disabled when 0.")
+        chunk_size: int = Field(default=1000, description="Maximum number of rows deleted by a statement.")
+        storage_batch: int = Field(default=1000, description="Maximum number of storage files deleted per progress update.")
+        lease: float = Field(default=60.0, description="Seconds a withdrawal stays reserved for a worker without progress.")
+        max_attempts: int = Field(default=10, description="Number of attempts after which a withdrawal is kept as failed.")
+
+    class Outbox(BaseModel):
+        """
+        Background execution of side effects recorded with changes.
+        """
+        interval: float = Field(default=0.0, description="Seconds between polls for messages, e.g. 1. The worker runs only in processes where this is set, and is disabled when 0.")
+        batch_size: int = Field(default=100, description="Maximum number of messages claimed at once.")
+        concurrency: int = Field(default=10, description="Maximum number of messages executed at once, each holding a DB connection to record its result. Keep it below the pool size.")
+        lease: float = Field(default=60.0, description="Seconds claimed messages stay reserved for a worker.")
+        max_attempts: int = Field(default=10, description="Number of attempts after which a message is kept as failed.")
+        backoff: float = Field(default=1.0, description="Seconds before the first retry, doubled at each failure.")
+        max_backoff: float = Field(default=600.0, description="Maximum seconds between retries.")
 
     class Static(BaseModel):
         """
@@ -33,6 +74,12 @@ class ApplicationSettings(BaseSettings):
         url: str = Field()
         sid: str = Field()
 
+    class Stats(BaseModel):
+        """
+        Runtime statistics API, protected by the credentials of the document API.
+        """
+        enabled: bool = Field(default=False, description="Whether to serve the statistics.")
+
     class DocumentAuth(BaseModel):
         enabled: bool = Field(description="Whether to perform document delivery.")
         username: str = Field(description="Username.")
@@ -43,9 +90,14 @@ class ApplicationSettings(BaseSettings):
     version: str = Field(description="Application version.")
     errors: Optional[str] = Field(default=None, description="Error message configuration file path.")
     launch_screen: bool = Field(default=False, description="Flag to display launch screen.")
+    shutdown_timeout: float = Field(default=30.0, description="Seconds to wait for in-flight sessions on shutdown.")
     static: Optional[Static] = Field(default=None)
     db: DB
+    identity_cache: IdentityCache = Field(default_factory=IdentityCache)
+    withdrawal: Withdrawal = Field(default_factory=Withdrawal)
+    outbox: Outbox = Field(default_factory=Outbox)
     docs: DocumentAuth
+    stats: Stats = Field(default_factory=Stats)
     storage: StorageSettings
     firebase: Union[FirebaseAuthSettings, FirebaseAdminSettings]
 
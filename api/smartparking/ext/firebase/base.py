@@ -1,18 +1,28 @@
+import asyncio
 import json
+import logging
+import re
+import threading
+import time
 from typing import Any, Optional, Literal, Union, Callable
 from functools import cached_property
+import httpx
 import jwt
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import requests
-from cachecontrol import CacheControl
 from cryptography.x509 import load_pem_x509_certificate
 from cryptography.hazmat.backends import default_backend
 import firebase_admin
 import firebase_admin.auth
 
 
+#: Certificate document of the keys signing Firebase ID tokens.
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+
+
 class FirebaseSettings(BaseModel):
     project_id: str
+    certs_url: str = Field(default=GOOGLE_CERTS_URL, description="URL of the certificates of the keys signing ID tokens.")
 
 
 class FirebaseAuthSettings(FirebaseSettings):
@@ -26,14 +36,244 @@ class FirebaseAdminSettings(FirebaseSettings):
     credential: str
 
 
+def max_age(cache_control: Optional[str], default: float = 0.0) -> float:
+    """
+    Extracts the `max-age` directive from a Cache-Control header value.
+
+    Args:
+        cache_control (Optional[str]): The header value.
+        default (float): Seconds returned when the directive is absent.
+
+    Returns:
+        float: The lifetime of the response in seconds.
+    """
+    matched = re.search(r'max-age\s*=\s*(\d+)', cache_control or '')
+    return float(matched.group(1)) if matched else default
+
+
+class KeyStore:
+    """
+    Public keys parsed from a certificate document and indexed by `kid`.
+
+    Keys whose PEM did not change are carried over on rotation, so each certificate is parsed only once.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._pems: dict[str, str] = {}
+        self._keys: dict[str, Any] = {}
+        #: Time after which the keys must be refetched.
+        self.expires_at = 0.0
+        #: Time at which the keys were last updated.
+        self.updated_at: Optional[float] = None
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def remaining(self) -> float:
+        """
+        Returns seconds until the keys expire, which is negative once they have.
+        """
+        return self.expires_at - self._clock()
+
+    def age(self) -> float:
+        """
+        Returns seconds elapsed since the last update, or infinity when never updated.
+        """
+        return float('inf') if self.updated_at is None else self._clock() - self.updated_at
+
+    def get(self, kid: str) -> Optional[Any]:
+        return self._keys.get(kid)
+
+    def update(self, pems: dict[str, str], max_age: float) -> None:
+        """
+        Replaces the keys with the ones in the certificate document.
+
+        Args:
+            pems (dict[str, str]): A dictionary mapping `kid` to certificate PEM strings.
+            max_age (float): Seconds the document stays valid.
+        """
+        keys = {}
+        for kid, pem in pems.items():
+            key = self._keys.get(kid) if self._pems.get(kid) == pem else None
+            keys[kid] = key or load_pem_x509_certificate(pem.encode(), default_backend()).public_key()
+
+        now = self._clock()
+        self._pems, self._keys = dict(pems), keys
+        self.updated_at = now
+        self.expires_at = now + max_age
+
+
+class AsyncKeyProvider:
+    """
+    Keeps a `KeyStore` up to date from a background task running on the event loop.
+
+    Keys are served from memory. The task refreshes them `margin` seconds before the `max-age` of the
+    previous response runs out, so request handling only awaits a fetch for the very first request
+    or for an unknown `kid`, and never blocks the loop while doing so.
+
+    While refreshes fail, expired keys are still served for `grace` seconds. After that, lookups fetch
+    the keys themselves and fail with the fetch, so that a retired key is not trusted indefinitely.
+    """
+
+    def __init__(
+        self,
+        store: KeyStore,
+        url: str = GOOGLE_CERTS_URL,
+        margin: float = 60.0,
+        retry: float = 5.0,
+        refetch_interval: float = 30.0,
+        grace: float = 300.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        #: Keys shared with the synchronous verification.
+        self.store = store
+        #: URL of the certificate document.
+        self.url = url
+        #: Seconds before expiry at which the keys are refreshed.
+        self.margin = margin
+        #: Seconds to wait before retrying a failed refresh.
+        self.retry = retry
+        #: Minimum seconds between refetches caused by an unknown `kid`.
+        self.refetch_interval = refetch_interval
+        #: Seconds expired keys are served while refreshes fail.
+        self.grace = grace
+        self.logger = logger or logging.getLogger(__name__)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._fetching: Optional[asyncio.Future] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts the background refresh on the running event loop unless already started.
+        """
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background refresh and closes the HTTP client.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def get(self, kid: str) -> Optional[Any]:
+        """
+        Retrieves the parsed public key for the `kid`.
+
+        Args:
+            kid (str): The key ID in the token header.
+
+        Returns:
+            Optional[Any]: The public key, or None if the `kid` is not published.
+
+        Raises:
+            httpx.HTTPError: If the keys expired more than `grace` seconds ago and cannot be fetched.
+        """
+        self.start()
+        if self.store.remaining() <= -self.grace:
+            await self.refresh()
+        key = self.store.get(kid)
+        if key is None and self.store.age() >= self.refetch_interval:
+            await self.refresh()
+            key = self.store.get(kid)
+        return key
+
+    async def refresh(self) -> None:
+        """
+        Fetches the certificate document and updates the keys.
+
+        Concurrent callers share a single fetch.
+        """
+        if self._fetching is None:
+            self._fetching = asyncio.ensure_future(self._fetch())
+            self._fetching.add_done_callback(self._fetched)
+        await asyncio.shield(self._fetching)
+
+    def _fetched(self, future: asyncio.Future) -> None:
+        self._fetching = None
+        if not future.cancelled():
+            # Retrieve the exception so that an unawaited failure is not reported by the loop.
+            future.exception()
+
+    async def _fetch(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=10)
+        response = await self._client.get(self.url)
+        response.raise_for_status()
+        self.store.update(response.json(), max_age(response.headers.get('Cache-Control')))
+
+    async def _run(self) -> None:
+        while True:
+            delay = self.store.remaining() - self.margin
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Failed to refresh Firebase public keys.", exc_info=e)
+                await asyncio.sleep(self.retry)
+            else:
+                if self.store.remaining() <= self.margin:
+                    # The response does not allow caching longer than the margin.
+                    await asyncio.sleep(self.retry)
+
+
 class FirebaseAuth:
     """
     Class defining Firebase's JWT authentication functionality.
     """
 
+    #: Minimum seconds between refetches caused by an unknown `kid`.
+    refetch_interval: float = 30.0
+
     def __init__(self, settings: FirebaseSettings) -> None:
         #: Configuration items necessary for authentication.
         self.settings = settings
+        #: Parsed public keys.
+        self.store = KeyStore()
+        #: Asynchronous refresh of the public keys.
+        self.provider = AsyncKeyProvider(self.store, settings.certs_url, refetch_interval=self.refetch_interval)
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+
+    async def averify(self, token: str) -> dict[str, Any]:
+        """
+        Verifies the token with keys served by the asynchronous provider.
+
+        Args:
+            token (str): The JWT token.
+
+        Returns:
+            dict[str, Any]: The claims extracted from the token.
+
+        Raises:
+            ValueError: If the token's `kid` is invalid or missing.
+            jwt.PyJWTError: If token verification fails.
+        """
+        kid = jwt.get_unverified_header(token).get('kid', '')
+        key = kid and await self.provider.get(kid)
+        if not key:
+            raise ValueError(f"Invalid Firebase kid: {kid}")
+
+        return self.decode(token, key)
 
     def verify(self, token: str) -> dict[str, Any]:
         """
@@ -50,33 +290,69 @@ class FirebaseAuth:
             jwt.PyJWTError: If token verification fails.
         """
         kid = jwt.get_unverified_header(token).get('kid', '')
-        key = kid and self.keys().get(kid, None)
+        key = kid and self.public_key(kid)
         if not key:
             raise ValueError(f"Invalid Firebase kid: {kid}")
 
-        cert = load_pem_x509_certificate(key.encode(), default_backend())
+        return self.decode(token, key)
 
+    def decode(self, token: str, key: Any) -> dict[str, Any]:
+        """
+        Verifies the signature and the registered claims of the token with the public key.
+
+        Args:
+            token (str): The JWT token.
+            key (Any): The public key matching the `kid` of the token.
+
+        Returns:
+            dict[str, Any]: The claims extracted from the token.
+
+        Raises:
+            jwt.PyJWTError: If token verification fails.
+        """
         return jwt.decode(
             token,
-            cert.public_key(),  # type: ignore
+            key,
             algorithms=['RS256'],
             audience=self.settings.project_id,
             issuer=f"https://securetoken.google.com/{self.settings.project_id}",
         )
 
-    def keys(self, cache: CacheControl = CacheControl(requests.session())) -> dict[str, str]:
+    def public_key(self, kid: str) -> Optional[Any]:
         """
-        Retrieves the public keys from Firebase, utilizing caching to optimize performance.
+        Retrieves the parsed public key for the `kid`.
+
+        The keys are refetched when the `max-age` of the previous response has passed,
+        and at most once when the `kid` is unknown.
 
         Args:
-            cache (CacheControl): A CacheControl-wrapped requests session for caching responses.
+            kid (str): The key ID in the token header.
+
+        Returns:
+            Optional[Any]: The public key, or None if the `kid` is not published.
+        """
+        store = self.store
+        key = None if store.expired else store.get(kid)
+        if key is not None:
+            return key
+
+        with self._lock:
+            # Another thread may have refreshed the keys while waiting for the lock.
+            if store.expired or (store.get(kid) is None and store.age() >= self.refetch_interval):
+                store.update(*self.keys())
+            return store.get(kid)
+
+    def keys(self) -> tuple[dict[str, str], float]:
+        """
+        Retrieves the public keys from Firebase.
 
         Returns:
-            dict[str, str]: A dictionary mapping `kid` to public key PEM strings.
+            tuple[dict[str, str], float]: A dictionary mapping `kid` to public key PEM strings,
+                and seconds the keys may be cached for.
         """
-        response = cache.get('https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com')
+        response = self._session.get(self.settings.certs_url, timeout=10)
         response.raise_for_status()
-        return response.json()
+        return response.json(), max_age(response.headers.get('Cache-Control'))
 
 
 class FirebaseAdmin:
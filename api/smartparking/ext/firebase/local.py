@@ -0,0 +1,168 @@
+import json
+from datetime import datetime, timedelta, timezone
+import time
+from typing import Any
+from urllib.parse import parse_qs
+from uuid import uuid4
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+
+class LocalCertificates:
+    """
+    Stand-in for the Google certificate endpoint, serving self-signed certificates of local RSA keys.
+
+    Instances are ASGI applications returning the certificate document on any path,
+    so they can be served by Uvicorn or mounted into `httpx` with `httpx.ASGITransport` for offline use.
+    """
+
+    def __init__(self, keys: int = 1, max_age: int = 3600) -> None:
+        #: Value of `max-age` in the Cache-Control header.
+        self.max_age = max_age
+        #: Private keys indexed by `kid`.
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        #: Certificate PEM strings indexed by `kid`.
+        self.pems: dict[str, str] = {}
+        #: Number of served requests.
+        self.requests = 0
+        for _ in range(keys):
+            self.rotate()
+
+    def rotate(self, retain: bool = True) -> str:
+        """
+        Generates a new key pair and publishes its certificate.
+
+        Args:
+            retain (bool): Whether to keep publishing the existing certificates.
+
+        Returns:
+            str: The `kid` of the new key.
+        """
+        kid = uuid4().hex
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.system.gserviceaccount.com')])
+        now = datetime.now(timezone.utc)
+        cert = x509.CertificateBuilder() \
+            .subject_name(name) \
+            .issuer_name(name) \
+            .public_key(key.public_key()) \
+            .serial_number(x509.random_serial_number()) \
+            .not_valid_before(now - timedelta(minutes=5)) \
+            .not_valid_after(now + timedelta(days=1)) \
+            .sign(key, hashes.SHA256())
+
+        if not retain:
+            self.keys.clear()
+            self.pems.clear()
+
+        self.keys[kid] = key
+        self.pems[kid] = cert.public_bytes(serialization.Encoding.PEM).decode()
+        return kid
+
+    @property
+    def kid(self) -> str:
+        """
+        The `kid` of the latest key.
+        """
+        return next(reversed(self.keys))
+
+    def document(self) -> dict[str, str]:
+        return dict(self.pems)
+
+    async def __call__(self, scope: dict[str, Any], receive, send) -> None:
+        if scope['type'] != 'http':
+            return
+
+        self.requests += 1
+        body = json.dumps(self.document()).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'application/json; charset=UTF-8'),
+                (b'cache-control', f'public, max-age={self.max_age}, must-revalidate, no-transform'.encode()),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class LocalIssuer(LocalCertificates):
+    """
+    Stand-in for Firebase Authentication minting RS256 ID tokens which `FirebaseAuth` accepts
+    when `certs_url` of its settings points at this application.
+
+    Besides the certificate document, `GET /token?sub=...` returns a token in the shape of the response of
+    `accounts:signInWithCustomToken`.
+    """
+
+    def __init__(self, project_id: str, keys: int = 1, max_age: int = 3600, lifetime: int = 3600) -> None:
+        super().__init__(keys, max_age)
+        #: Firebase project ID used as the audience.
+        self.project_id = project_id
+        #: Seconds until minted tokens expire.
+        self.lifetime = lifetime
+
+    def mint(self, sub: str, **claims: Any) -> str:
+        """
+        Mints an ID token signed by the latest key.
+
+        Args:
+            sub (str): The `sub` claim, which is the Firebase UID.
+            claims (Any): Additional claims.
+
+        Returns:
+            str: The ID token.
+        """
+        now = int(time.time())
+        payload = {
+            'iss': f"https://securetoken.google.com/{self.project_id}",
+            'aud': self.project_id,
+            'auth_time': now,
+            'user_id': sub,
+            'sub': sub,
+            'iat': now,
+            'exp': now + self.lifetime,
+            'firebase': {'identities': {}, 'sign_in_provider': 'custom'},
+            **claims,
+        }
+        kid = self.kid
+        return jwt.encode(payload, self.keys[kid], algorithm='RS256', headers={'kid': kid})
+
+    async def __call__(self, scope: dict[str, Any], receive, send) -> None:
+        if scope['type'] != 'http' or scope['path'] != '/token':
+            return await super().__call__(scope, receive, send)
+
+        query = parse_qs(scope.get('query_string', b'').decode())
+        sub = query.get('sub', [''])[0]
+        if not sub:
+            body, status = b'{"error": "sub is required"}', 400
+        else:
+            body, status = json.dumps({'idToken': self.mint(sub), 'expiresIn': str(self.lifetime)}).encode(), 200
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json; charset=UTF-8'),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+if __name__ == '__main__':
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serves a local stand-in of Firebase ID token issuer and its certificates.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9099)
+    parser.add_argument('--max-age', type=int, default=3600)
+    parser.add_argument('--project-id', default='smartparking-local')
+    args = parser.parse_args()
+
+    uvicorn.run(LocalIssuer(args.project_id, max_age=args.max_age), host=args.host, port=args.port)
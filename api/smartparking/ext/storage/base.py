@@ -1,8 +1,15 @@
-from typing import Type, Optional
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Type, Optional, TypeVar
 from urllib.parse import urlparse, ParseResult
 from pydantic import BaseModel, Field
 
 
+R = TypeVar('R')
+
+#: Default number of bytes read at once by the streaming methods.
+CHUNK_SIZE = 64 * 1024
+
+
 class StorageSettings(BaseModel):
     url: str = Field(description="URL containing access information for the storage.")
 
@@ -10,6 +17,12 @@ class StorageSettings(BaseModel):
 class Storage:
     """
     Abstract base class for file storage.
+
+    Methods prefixed by `a` are the asynchronous counterparts to be awaited on event loops. By default they run
+    the synchronous methods in a thread, and subclasses with native asynchronous I/O override them.
+
+    `stream()` and `write_stream()` move files in chunks, so that memory does not grow with their sizes.
+    Byte ranges are given as `start` inclusive and `end` exclusive, like slices.
     """
     _children: set[Type] = set()
 
@@ -53,6 +66,160 @@ class Storage:
         """
         pass
 
+    def prepare(self) -> None:
+        """
+        Prepares clients and destinations before the first access.
+
+        Subclasses holding connections override this so that the first request does not pay for them.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Releases clients held by the storage.
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """
+        Releases clients held by the storage, including those of the asynchronous API.
+        """
+        await self._call(self.close)
+
+    async def _call(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """
+        Runs a blocking function off the event loop.
+        """
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def aexists(self, path: str) -> bool:
+        """
+        Asynchronously checks if a file exists at the specified path.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            bool: True if the file exists, False otherwise.
+        """
+        return await self._call(self.exists, path)
+
+    async def aread(self, path: str) -> bytes:
+        """
+        Asynchronously reads the content of the specified file.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            bytes: File data.
+        """
+        return await self._call(self.read, path)
+
+    async def awrite(self, path: str, data: bytes, public: bool = False) -> int:
+        """
+        Asynchronously writes data to the specified file.
+
+        Args:
+            path (str): File path.
+            data (bytes): File data.
+            public (bool): Whether the file is publicly readable, on storages supporting it.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        return await self._call(self.write, path, data, public)
+
+    async def adelete(self, path: str) -> None:
+        """
+        Asynchronously deletes the specified file.
+
+        Args:
+            path (str): File path.
+        """
+        await self._call(self.delete, path)
+
+    async def adelete_many(self, paths: Iterable[str]) -> dict[str, str]:
+        """
+        Asynchronously deletes the specified files, as many at once as the storage allows.
+
+        Args:
+            paths (Iterable[str]): File paths.
+
+        Returns:
+            dict[str, str]: Error messages by the paths of the files which could not be deleted.
+        """
+        return await self._call(self.delete_many, list(paths))
+
+    async def asize(self, path: str) -> int:
+        """
+        Asynchronously retrieves the size of the specified file.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            int: The number of bytes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        return await self._call(self.size, path)
+
+    async def astream(
+        self,
+        path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Asynchronously reads the specified file, or a range of it, in chunks.
+
+        Args:
+            path (str): File path.
+            start (int): Offset of the first byte.
+            end (Optional[int]): Offset after the last byte. The end of the file if None.
+            chunk_size (int): Maximum number of bytes of a chunk.
+
+        Returns:
+            AsyncIterator[bytes]: The chunks, read lazily.
+        """
+        chunks = self.stream(path, start, end, chunk_size)
+        try:
+            while (chunk := await self._call(next, chunks, None)) is not None:
+                yield chunk
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                await self._call(close)
+
+    async def awrite_stream(self, path: str, chunks: AsyncIterable[bytes], public: bool = False) -> int:
+        """
+        Asynchronously writes data given in chunks to the specified file.
+
+        By default, `write_stream()` runs in a thread and pulls each chunk from the event loop.
+
+        Args:
+            path (str): File path.
+            chunks (AsyncIterable[bytes]): File data, consumed once.
+            public (bool): Whether the file is publicly readable, on storages supporting it.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        loop = asyncio.get_running_loop()
+        iterator = aiter(chunks)
+
+        def pull() -> Iterator[bytes]:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(anext(iterator), loop).result()
+                except StopAsyncIteration:
+                    return
+
+        return await self._call(self.write_stream, path, pull(), public)
+
     def exists(self, path: str) -> bool:
         """
         Checks if a file exists at the specified path.
@@ -77,13 +244,14 @@ class Storage:
         """
         raise NotImplementedError("Subclasses must implement the read method.")
 
-    def write(self, path: str, data: bytes):
+    def write(self, path: str, data: bytes, public: bool = False):
         """
         Writes data to the specified file.
 
         Args:
             path (str): File path.
             data (bytes): File data.
+            public (bool): Whether the file is publicly readable, on storages supporting it.
         """
         raise NotImplementedError("Subclasses must implement the write method.")
 
@@ -96,6 +264,84 @@ class Storage:
         """
         raise NotImplementedError("Subclasses must implement the delete method.")
 
+    def delete_many(self, paths: Iterable[str]) -> dict[str, str]:
+        """
+        Deletes the specified files, as many at once as the storage allows.
+
+        Files which do not exist are regarded as deleted.
+
+        Args:
+            paths (Iterable[str]): File paths.
+
+        Returns:
+            dict[str, str]: Error messages by the paths of the files which could not be deleted.
+        """
+        errors = {}
+        for path in paths:
+            try:
+                self.delete(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                errors[path] = str(e)
+        return errors
+
+    def size(self, path: str) -> int:
+        """
+        Retrieves the size of the specified file.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            int: The number of bytes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        raise NotImplementedError("Subclasses must implement the size method.")
+
+    def stream(self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Reads the specified file, or a range of it, in chunks.
+
+        Args:
+            path (str): File path.
+            start (int): Offset of the first byte.
+            end (Optional[int]): Offset after the last byte. The end of the file if None.
+            chunk_size (int): Maximum number of bytes of a chunk.
+
+        Returns:
+            Iterator[bytes]: The chunks, read lazily. Close the iterator when it is not exhausted.
+        """
+        raise NotImplementedError("Subclasses must implement the stream method.")
+
+    def write_stream(self, path: str, chunks: Iterable[bytes], public: bool = False) -> int:
+        """
+        Writes data given in chunks to the specified file.
+
+        Args:
+            path (str): File path.
+            chunks (Iterable[bytes]): File data, consumed once.
+            public (bool): Whether the file is publicly readable, on storages supporting it.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        raise NotImplementedError("Subclasses must implement the write_stream method.")
+
+    def paths(self, prefix: str) -> Iterator[str]:
+        """
+        Lists paths of the files whose paths start with the prefix.
+
+        Args:
+            prefix (str): Path prefix, typically a directory ending with `/`.
+
+        Returns:
+            Iterator[str]: The paths, fetched lazily.
+        """
+        raise NotImplementedError("Subclasses must implement the paths method.")
+
     def urlize(self, path: str, **kwargs) -> str:
         """
         Generates a URL accessible to the specified file.
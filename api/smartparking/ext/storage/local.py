@@ -1,6 +1,15 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
-from urllib.parse import urljoin, ParseResult
-from .base import StorageSettings, Storage
+import tempfile
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+from urllib.parse import parse_qs, urljoin, ParseResult
+from .base import CHUNK_SIZE, StorageSettings, Storage
+
+
+R = TypeVar('R')
 
 
 class LocalStorage(Storage):
@@ -8,6 +17,9 @@ class LocalStorage(Storage):
     Storage class representing local files.
 
     Corresponds to URLs with an empty scheme or the `file` scheme.
+
+    The asynchronous API runs file operations in a thread pool of this storage, sized by the `workers` query
+    parameter, so that slow disks do not occupy the default executor shared with the rest of the application.
     """
 
     @classmethod
@@ -32,6 +44,11 @@ class LocalStorage(Storage):
         """
         super().__init__(url)
         self.root = url.path
+        workers = parse_qs(url.query).get('workers', [None])[0]
+        #: Maximum number of threads of the asynchronous API. The default of `ThreadPoolExecutor` is used if None.
+        self.workers = int(workers) if workers else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
 
     def _on(self, path: str) -> str:
         """
@@ -45,6 +62,44 @@ class LocalStorage(Storage):
         """
         return os.path.join(self.root, path)
 
+    def prepare(self) -> None:
+        """
+        Creates the root directory if it does not exist.
+        """
+        if self.root:
+            os.makedirs(self.root, exist_ok=True)
+
+    def close(self) -> None:
+        """
+        Shuts the thread pool down after the submitted operations finish.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def aclose(self) -> None:
+        # Waiting for the pool must not block the event loop, nor run on the pool itself.
+        await asyncio.to_thread(self.close)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='local-storage')
+            return self._executor
+
+    async def _call(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), partial(fn, *args, **kwargs))
+
+    def _unlink(self, path: str) -> Optional[str]:
+        try:
+            os.remove(self._on(path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            return str(e)
+        return None
+
     def exists(self, path: str) -> bool:
         """
         Checks if a file exists at the specified path.
@@ -71,13 +126,14 @@ class LocalStorage(Storage):
         with open(path, 'rb') as f:
             return f.read()
 
-    def write(self, path: str, data: bytes) -> int:
+    def write(self, path: str, data: bytes, public: bool = False) -> int:
         """
         Writes data to the specified file.
 
         Args:
             path (str): The file path.
             data (bytes): The data to write.
+            public (bool): Ignored, as local files have no access control.
 
         Returns:
             int: The number of bytes written.
@@ -96,6 +152,111 @@ class LocalStorage(Storage):
         """
         os.remove(self._on(path))
 
+    def delete_many(self, paths: Iterable[str]) -> dict[str, str]:
+        """
+        Deletes the specified files in parallel on the thread pool of the storage.
+
+        Do not call this from a thread of the pool, such as through `_call()`; use `adelete_many()` on event loops.
+
+        Args:
+            paths (Iterable[str]): The file paths.
+
+        Returns:
+            dict[str, str]: Error messages by the paths of the files which could not be deleted.
+        """
+        paths = list(paths)
+        results = self._pool().map(self._unlink, paths)
+        return {path: error for path, error in zip(paths, results) if error is not None}
+
+    async def adelete_many(self, paths: Iterable[str]) -> dict[str, str]:
+        paths = list(paths)
+        results = await asyncio.gather(*[self._call(self._unlink, path) for path in paths])
+        return {path: error for path, error in zip(paths, results) if error is not None}
+
+    def size(self, path: str) -> int:
+        """
+        Retrieves the size of the specified file.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return os.path.getsize(self._on(path))
+
+    def stream(self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Reads the specified file, or a range of it, in chunks.
+
+        Args:
+            path (str): The file path.
+            start (int): Offset of the first byte.
+            end (Optional[int]): Offset after the last byte. The end of the file if None.
+            chunk_size (int): Maximum number of bytes of a chunk.
+
+        Returns:
+            Iterator[bytes]: The chunks.
+        """
+        with open(self._on(path), 'rb') as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def write_stream(self, path: str, chunks: Iterable[bytes], public: bool = False) -> int:
+        """
+        Writes data given in chunks to the specified file.
+
+        Chunks are written to a temporary file in the same directory, which replaces the file at the end,
+        so that readers never see a partially written file.
+
+        Args:
+            path (str): The file path.
+            chunks (Iterable[bytes]): The data to write.
+            public (bool): Ignored, as local files have no access control.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        path = self._on(path)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+        try:
+            written = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    written += f.write(chunk)
+            os.replace(temporary, path)
+            return written
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def paths(self, prefix: str) -> Iterator[str]:
+        """
+        Lists paths of the files whose paths start with the prefix.
+
+        Args:
+            prefix (str): Path prefix, typically a directory ending with `/`.
+
+        Returns:
+            Iterator[str]: The paths relative to the root.
+        """
+        directory, _ = os.path.split(self._on(prefix))
+        base = self._on('')
+        for dirpath, _, filenames in os.walk(directory):
+            for name in filenames:
+                path = os.path.relpath(os.path.join(dirpath, name), base).replace(os.sep, '/')
+                if path.startswith(prefix):
+                    yield path
+
     def urlize(self, path: str, root: str, **kwargs) -> str:
         """
         Generates an accessible URL for the specified file.
@@ -1,7 +1,152 @@
-from io import BytesIO
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import time
 from urllib.parse import parse_qs, ParseResult
-from typing import Optional
-from .base import Storage
+from typing import Any, Callable, Iterable, Iterator, Optional
+from .base import CHUNK_SIZE, Storage
+
+
+#: Minimum size of parts of a multipart upload except the last one, imposed by S3.
+MIN_PART_SIZE = 5 * 1024 * 1024
+#: Default size from which data is uploaded in parts, and of the parts.
+MULTIPART_SIZE = 8 * 1024 * 1024
+
+
+def split(data: bytes, size: int) -> Iterator[bytes]:
+    """
+    Splits data into parts of `size` bytes, the last one being shorter.
+    """
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def regroup(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """
+    Regroups chunks of arbitrary sizes into parts of `size` bytes, the last one being shorter.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def byte_range(start: int = 0, end: Optional[int] = None) -> Optional[str]:
+    """
+    Formats the `Range` header of a request reading bytes from `start` to `end` exclusive.
+
+    Returns:
+        Optional[str]: The header value, or None to read the whole object.
+    """
+    if start == 0 and end is None:
+        return None
+    return f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+
+
+#: Maximum number of keys deleted by a `DeleteObjects` request.
+DELETE_BATCH_SIZE = 1000
+
+
+def batches(keys: list[str], size: int = DELETE_BATCH_SIZE) -> Iterator[list[str]]:
+    """
+    Splits keys into batches of up to `size` keys.
+    """
+    for i in range(0, len(keys), size):
+        yield keys[i:i + size]
+
+
+def delete_request(keys: list[str]) -> dict[str, Any]:
+    """
+    Builds the `Delete` parameter of `DeleteObjects` reporting only the keys which failed.
+    """
+    return {'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+
+
+def delete_errors(response: dict[str, Any]) -> dict[str, str]:
+    """
+    Extracts error messages by key from a response of `DeleteObjects`.
+    """
+    return {
+        error['Key']: f"{error.get('Code', 'Error')}: {error.get('Message', '')}".rstrip(': ')
+        for error in response.get('Errors', [])
+    }
+
+
+class PresignedUrlCache:
+    """
+    Presigned URLs by object and signing parameters, reused while more than `min_remaining` of their lifetime remains.
+
+    Reusing a URL saves signing it at each render and keeps it stable across page loads, so that browsers can cache
+    the object. The URLs of an object are evicted when it is overwritten or deleted, so that the content behind
+    a cached URL never changes. URLs of up to `size` objects are kept, the least recently used being evicted first.
+    """
+
+    def __init__(self, min_remaining: float = 0.5, size: int = 10000, clock: Callable[[], float] = time.time) -> None:
+        #: Fraction of the lifetime of a URL which must remain for it to be reused.
+        self.min_remaining = min(max(min_remaining, 0.0), 1.0)
+        #: Maximum number of objects whose URLs are kept. The cache is disabled when 0.
+        self.size = size
+        self.clock = clock
+        #: Number of URLs signed, and of URLs reused.
+        self.misses = 0
+        self.hits = 0
+        self._entries: OrderedDict[tuple[str, str], dict[str, tuple[str, float]]] = OrderedDict()
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, bucket: str, key: str, expiration: int, sign: Callable[[], str], **params: Any) -> str:
+        """
+        Retrieves a URL of the object valid for long enough, signing it with `sign()` if none is cached.
+
+        Args:
+            bucket (str): The bucket.
+            key (str): The key of the object.
+            expiration (int): Seconds a signed URL remains valid.
+            sign (Callable[[], str]): Function signing a URL valid for `expiration` seconds.
+            params: The other parameters of the URL, which are part of the cache key.
+
+        Returns:
+            str: The URL.
+        """
+        if self.size <= 0 or expiration <= 0:
+            return sign()
+
+        variant = repr((expiration, sorted(params.items())))
+        now = self.clock()
+        with self._lock:
+            urls = self._entries.get((bucket, key))
+            if urls is not None:
+                self._entries.move_to_end((bucket, key))
+                url, expires_at = urls.get(variant, ('', 0.0))
+                if expires_at - now > expiration * self.min_remaining:
+                    self.hits += 1
+                    return url
+            evictions = self._evictions
+
+        url = sign()
+        with self._lock:
+            self.misses += 1
+            # A URL signed while the object was being replaced could outlive the old content; it is not kept.
+            if evictions == self._evictions:
+                self._entries.setdefault((bucket, key), {})[variant] = (url, now + expiration)
+                self._entries.move_to_end((bucket, key))
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return url
+
+    def evict(self, bucket: str, *keys: str) -> None:
+        """
+        Forgets the URLs of the objects, which have been overwritten or deleted.
+        """
+        with self._lock:
+            self._evictions += 1
+            for key in keys:
+                self._entries.pop((bucket, key), None)
+
 
 try:
     import boto3
@@ -15,6 +160,16 @@ try:
         Storage class for Amazon S3.
 
         Corresponds to URLs with the `s3` scheme.
+
+        The asynchronous API runs the boto3 client in threads.
+
+        Data of `multipart_threshold` bytes or more is uploaded by a multipart upload, in parts of `part_size` bytes
+        of which up to `concurrency` are sent at once. Memory is bounded by the parts in flight whatever the size
+        of a stream, and a failed upload is aborted so that its parts are not left billed in the bucket.
+        These are given by the query parameters of the same names, along with `endpoint` for S3-compatible servers.
+
+        Presigned URLs are reused while more than `presign_min_remaining` of their lifetime remains, for up to
+        `presign_cache_size` objects, and are signed again once their object has been written or deleted.
         """
 
         @classmethod
@@ -43,25 +198,122 @@ try:
             access_key = query_params.get('access_key', [None])[0]
             secret_key = query_params.get('secret', [None])[0]
 
-            # Initialize S3 client with Signature Version 4
+            endpoint = query_params.get('endpoint', [None])[0]
+
+            #: Size in bytes from which data is uploaded in parts.
+            self.multipart_threshold = int(query_params.get('multipart_threshold', [MULTIPART_SIZE])[0])
+            #: Size in bytes of the parts of multipart uploads.
+            self.part_size = max(int(query_params.get('part_size', [MULTIPART_SIZE])[0]), MIN_PART_SIZE)
+            #: Maximum number of parts uploaded at once by an upload.
+            self.concurrency = max(int(query_params.get('concurrency', [4])[0]), 1)
+            #: Presigned URLs by object.
+            self.urls = PresignedUrlCache(
+                min_remaining=float(query_params.get('presign_min_remaining', [0.5])[0]),
+                size=int(query_params.get('presign_cache_size', [10000])[0]),
+            )
+
+            options: dict[str, Any] = dict(region_name=url.netloc)
             if access_key and secret_key:
-                self.client = boto3.client(
-                    's3',
-                    aws_access_key_id=access_key,
-                    aws_secret_access_key=secret_key,
-                    region_name=url.netloc,
-                    config=boto3.session.Config(signature_version='s3v4')
-                )
-            else:
-                self.client = boto3.client(
-                    's3',
-                    region_name=url.netloc,
-                    config=boto3.session.Config(signature_version='s3v4')
-                )
+                options.update(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+            if endpoint:
+                options.update(endpoint_url=endpoint)
+
+            # Signs with Signature Version 4.
+            self.client = boto3.client(
+                's3',
+                config=boto3.session.Config(signature_version='s3v4', max_pool_connections=max(10, self.concurrency)),
+                **options,
+            )
+            self._executor: Optional[ThreadPoolExecutor] = None
+            self._lock = threading.Lock()
 
             self.bucket = url.path.lstrip('/')
             logger.debug(f"Initialized S3Storage with bucket: {self.bucket}")
 
+        def prepare(self) -> None:
+            """
+            Resolves credentials and opens a connection to the bucket.
+
+            Raises:
+                IOError: If the bucket is not accessible.
+            """
+            try:
+                self.client.head_bucket(Bucket=self.bucket)
+                logger.debug(f"Connected to bucket: {self.bucket}")
+            except ClientError as e:
+                logger.error(f"Error accessing bucket {self.bucket}: {e}")
+                raise IOError(f"An error occurred while accessing the bucket {self.bucket}: {e}")
+
+        def close(self) -> None:
+            """
+            Closes the connections of the client and the threads uploading parts.
+            """
+            with self._lock:
+                executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=True)
+            self.client.close()
+
+        def _parts_executor(self) -> ThreadPoolExecutor:
+            with self._lock:
+                if self._executor is None:
+                    # Threads are shared by concurrent uploads, each of which bounds its own parts in flight.
+                    self._executor = ThreadPoolExecutor(self.concurrency * 2, thread_name_prefix='s3-parts')
+                return self._executor
+
+        def _multipart(self, path: str, parts: Iterator[bytes], extra_args: dict[str, Any]) -> int:
+            """
+            Uploads parts concurrently by a multipart upload, aborting it on failure.
+
+            A part is read from `parts` only when fewer than `concurrency` parts are in flight.
+
+            Returns:
+                int: The number of bytes written.
+            """
+            upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=path, **extra_args)['UploadId']
+            executor = self._parts_executor()
+            slots = threading.BoundedSemaphore(self.concurrency)
+            futures: list[Future] = []
+            failures: list[BaseException] = []
+
+            def done(future: Future) -> None:
+                slots.release()
+                # exception() raises CancelledError for parts cancelled after a failure.
+                if not future.cancelled() and future.exception() is not None:
+                    failures.append(future.exception())
+
+            def upload(number: int, part: bytes) -> dict[str, Any]:
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=path, UploadId=upload_id, PartNumber=number, Body=part,
+                )
+                return {'PartNumber': number, 'ETag': response['ETag']}
+
+            try:
+                written = 0
+                for number, part in enumerate(parts, 1):
+                    slots.acquire()
+                    if failures:
+                        slots.release()
+                        break
+                    written += len(part)
+                    future = executor.submit(upload, number, part)
+                    future.add_done_callback(done)
+                    futures.append(future)
+                uploaded = [f.result() for f in futures]
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=path, UploadId=upload_id, MultipartUpload={'Parts': uploaded},
+                )
+                logger.info(f"Wrote {written} bytes to {path} in {len(uploaded)} parts")
+                return written
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                try:
+                    self.client.abort_multipart_upload(Bucket=self.bucket, Key=path, UploadId=upload_id)
+                except ClientError as e:
+                    logger.error(f"Error aborting the upload of {path}: {e}")
+                raise
+
         def exists(self, path: str) -> bool:
             """
             Checks if a file exists at the specified path in the S3 bucket.
@@ -114,6 +366,8 @@ try:
             """
             Writes data to the specified file in the S3 bucket.
 
+            Data of `multipart_threshold` bytes or more is uploaded in parts concurrently.
+
             Args:
                 path (str): The file path.
                 data (bytes): The data to write.
@@ -130,6 +384,9 @@ try:
                 if public:
                     extra_args['ACL'] = 'public-read'
 
+                if len(data) >= self.multipart_threshold:
+                    return self._multipart(path, split(data, self.part_size), extra_args)
+
                 self.client.put_object(
                     Bucket=self.bucket,
                     Key=path,
@@ -142,6 +399,8 @@ try:
             except ClientError as e:
                 logger.error(f"Error writing to file {path}: {e}")
                 raise IOError(f"An error occurred while writing to the file {path}: {e}")
+            finally:
+                self.urls.evict(self.bucket, path)
 
         def delete(self, path: str) -> None:
             """
@@ -163,18 +422,177 @@ try:
             except ClientError as e:
                 logger.error(f"Error deleting file {path}: {e}")
                 raise IOError(f"An error occurred while deleting the file {path}: {e}")
+            finally:
+                self.urls.evict(self.bucket, path)
+
+        def delete_many(self, paths: Iterable[str]) -> dict[str, str]:
+            """
+            Deletes the specified files from the S3 bucket by `DeleteObjects` of up to 1000 keys each.
+
+            Missing keys are regarded as deleted, as S3 does.
+
+            Args:
+                paths (Iterable[str]): The file paths.
+
+            Returns:
+                dict[str, str]: Error messages by the paths of the files which could not be deleted.
+            """
+            keys = list(dict.fromkeys(paths))
+            errors: dict[str, str] = {}
+            for batch in batches(keys):
+                try:
+                    response = self.client.delete_objects(Bucket=self.bucket, Delete=delete_request(batch))
+                    errors.update(delete_errors(response))
+                except ClientError as e:
+                    logger.error(f"Error deleting {len(batch)} files from {batch[0]}: {e}")
+                    errors.update({key: str(e) for key in batch})
+                finally:
+                    self.urls.evict(self.bucket, *batch)
+            logger.info(f"Deleted {len(keys) - len(errors)} of {len(keys)} files")
+            return errors
+
+        def size(self, path: str) -> int:
+            """
+            Retrieves the size of the specified file in the S3 bucket.
+
+            Args:
+                path (str): The file path.
+
+            Returns:
+                int: The number of bytes.
+
+            Raises:
+                FileNotFoundError: If the file does not exist.
+                IOError: If an I/O error occurs.
+            """
+            try:
+                return self.client.head_object(Bucket=self.bucket, Key=path)['ContentLength']
+            except ClientError as e:
+                if e.response['Error']['Code'] == '404':
+                    raise FileNotFoundError(f"The file {path} does not exist in bucket {self.bucket}.")
+                logger.error(f"Error retrieving size of {path}: {e}")
+                raise IOError(f"An error occurred while retrieving the size of {path}: {e}")
+
+        def stream(
+            self,
+            path: str,
+            start: int = 0,
+            end: Optional[int] = None,
+            chunk_size: int = CHUNK_SIZE,
+        ) -> Iterator[bytes]:
+            """
+            Reads the specified file, or a range of it, from the S3 bucket in chunks.
+
+            Only the requested range is transferred, by the `Range` header of `GetObject`.
+
+            Args:
+                path (str): The file path.
+                start (int): Offset of the first byte.
+                end (Optional[int]): Offset after the last byte. The end of the file if None.
+                chunk_size (int): Maximum number of bytes of a chunk.
+
+            Returns:
+                Iterator[bytes]: The chunks.
+
+            Raises:
+                FileNotFoundError: If the file does not exist.
+                IOError: If an I/O error occurs.
+            """
+            options = {'Range': r} if (r := byte_range(start, end)) else {}
+            try:
+                body = self.client.get_object(Bucket=self.bucket, Key=path, **options)['Body']
+            except self.client.exceptions.NoSuchKey:
+                raise FileNotFoundError(f"The file {path} does not exist in bucket {self.bucket}.")
+            except ClientError as e:
+                logger.error(f"Error reading file {path}: {e}")
+                raise IOError(f"An error occurred while reading the file {path}: {e}")
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+
+        def write_stream(self, path: str, chunks: Iterable[bytes], public: bool = False) -> int:
+            """
+            Writes data given in chunks to the specified file in the S3 bucket.
+
+            Data shorter than both `multipart_threshold` and `part_size` is uploaded at once. Otherwise, it is
+            uploaded in parts concurrently as the chunks arrive, so that only the parts in flight are held in memory.
 
-        def urlize(self, path: str, public: bool = False, expiration: int = 3600, **kwargs) -> str:
+            Args:
+                path (str): The file path.
+                chunks (Iterable[bytes]): The data to write.
+                public (bool): Whether to make the file publicly accessible (default: False).
+
+            Returns:
+                int: The number of bytes written.
+
+            Raises:
+                IOError: If an I/O error occurs.
+            """
+            try:
+                extra_args = {'ACL': 'public-read'} if public else {}
+                parts = regroup(chunks, self.part_size)
+                first = next(parts, b'')
+                second = next(parts, None)
+                if second is None and len(first) < self.multipart_threshold:
+                    self.client.put_object(Bucket=self.bucket, Key=path, Body=first, **extra_args)
+                    logger.info(f"Wrote {len(first)} bytes to {path} with public={public}")
+                    return len(first)
+
+                def rest() -> Iterator[bytes]:
+                    yield first
+                    if second is not None:
+                        yield second
+                        yield from parts
+
+                return self._multipart(path, rest(), extra_args)
+            except ClientError as e:
+                logger.error(f"Error writing to file {path}: {e}")
+                raise IOError(f"An error occurred while writing to the file {path}: {e}")
+            finally:
+                self.urls.evict(self.bucket, path)
+
+        def paths(self, prefix: str) -> Iterator[str]:
+            """
+            Lists keys starting with the prefix in the S3 bucket, fetching 1000 keys per request.
+
+            Args:
+                prefix (str): Key prefix, typically ending with `/`.
+
+            Returns:
+                Iterator[str]: The keys.
+
+            Raises:
+                IOError: If an I/O error occurs.
+            """
+            try:
+                for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=prefix):
+                    for content in page.get('Contents', []):
+                        yield content['Key']
+            except ClientError as e:
+                logger.error(f"Error listing files under {prefix}: {e}")
+                raise IOError(f"An error occurred while listing files under {prefix}: {e}")
+
+        def urlize(
+            self,
+            path: str,
+            public: bool = False,
+            expiration: int = 3600,
+            root: Optional[str] = None,
+            **kwargs,
+        ) -> str:
             """
             Generates an accessible URL for the specified file.
 
             If the `public` parameter is True, returns the public URL.
-            Otherwise, returns a presigned URL with the specified expiration.
+            Otherwise, returns a presigned URL with the specified expiration, reusing the one signed before
+            while enough of its lifetime remains.
 
             Args:
                 path (str): The file path.
                 public (bool): Whether to return a public URL (default: False).
                 expiration (int): Time in seconds for the presigned URL to remain valid.
+                root (Optional[str]): Ignored. The root URL of files in local storages.
 
             Returns:
                 str: The accessible URL for the file.
@@ -185,11 +603,15 @@ try:
                     logger.debug(f"Generated public URL for {path}: {url}")
                     return url
                 else:
-                    url = self.client.generate_presigned_url(
-                        'get_object',
-                        Params={'Bucket': self.bucket, 'Key': path},
-                        ExpiresIn=expiration,
-                        **kwargs
+                    url = self.urls.get(
+                        self.bucket, path, expiration,
+                        lambda: self.client.generate_presigned_url(
+                            'get_object',
+                            Params={'Bucket': self.bucket, 'Key': path},
+                            ExpiresIn=expiration,
+                            **kwargs
+                        ),
+                        **kwargs,
                     )
                     logger.debug(f"Generated presigned URL for {path}: {url}")
                     return url
@@ -0,0 +1,155 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, Mapping, Optional, TypeVar
+from sqlalchemy import ARRAY, any_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+#: Function resolving keys to values with a DB session. Keys missing in the returned mapping resolve to None.
+Batch = Callable[[AsyncSession, list[K]], Awaitable[Mapping[K, V]]]
+
+
+class Loader(Generic[K, V]):
+    """
+    Batching loader collecting keys requested in the same iteration of the event loop and resolving them
+    with a single call of the batch function.
+
+    Results are memoised until `clear()`, so a key is resolved at most once while the loader lives.
+    Loaders are obtained with `ResourceSession.loader()`, which keeps one per batch function for each request.
+
+    Keys beyond `max_batch` are resolved by further calls one after another, never concurrently,
+    since the batch function typically runs on a DB session which does not allow concurrent operations.
+    """
+
+    def __init__(self, batch: Callable[[list[K]], Awaitable[Mapping[K, V]]], max_batch: int = 1000) -> None:
+        #: Function resolving a list of keys.
+        self.batch = batch
+        #: Maximum number of keys given to a single call of the batch function.
+        self.max_batch = max_batch
+        #: Number of calls of the batch function.
+        self.calls = 0
+        self._results: dict[K, asyncio.Future[Optional[V]]] = {}
+        self._queue: list[K] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """
+        Retrieves the value of the key.
+
+        Args:
+            key (K): The key.
+
+        Returns:
+            Optional[V]: The value, or None if the key does not exist.
+        """
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            if not self._queue:
+                # Runs after the tasks ready in this iteration have requested their keys.
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # A cancelled caller must not cancel the result shared with other callers.
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[Optional[V]]:
+        """
+        Retrieves the values of the keys in a single batch.
+
+        Args:
+            keys (Iterable[K]): The keys.
+
+        Returns:
+            list[Optional[V]]: The values in the order of the keys.
+        """
+        return list(await asyncio.gather(*[self.load(k) for k in keys]))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """
+        Memoises the value of the key unless it is already loaded or being loaded.
+        """
+        if key not in self._results:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._results[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """
+        Forgets the memoised value of the key, or of all keys if omitted, so that the next load queries again.
+        """
+        if key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.get_running_loop().create_task(self._resolve_all(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve_all(self, keys: list[K]) -> None:
+        for i in range(0, len(keys), self.max_batch):
+            try:
+                await self._resolve(keys[i:i + self.max_batch])
+            except BaseException:
+                # Keys of the chunks left are cancelled along with the task, and not memoised.
+                for k in keys[i + self.max_batch:]:
+                    f = self._results.pop(k, None)
+                    if f is not None and not f.done():
+                        f.cancel()
+                raise
+
+    async def _resolve(self, keys: list[K]) -> None:
+        futures = [(k, self._results.get(k)) for k in keys]
+        try:
+            self.calls += 1
+            values = await self.batch(keys)
+        except BaseException as e:
+            for k, f in futures:
+                # Failed keys are not memoised, so that a later load retries them.
+                if self._results.get(k) is f:
+                    del self._results[k]
+                if f is None or f.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    f.cancel()
+                else:
+                    f.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            for k, f in futures:
+                if f is not None and not f.done():
+                    f.set_result(values.get(k))
+
+
+def by_column(column: InstrumentedAttribute[Any], entity: Optional[Any] = None, *criteria: Any) -> Batch[Any, Any]:
+    """
+    Creates a batch function selecting entities whose column equals any of the keys.
+
+    On PostgreSQL, the keys are bound as one array to `column = ANY(:keys)`, so the statement is the same
+    for any number of keys and is prepared once per connection. Other dialects use an expanding `IN`.
+
+    Args:
+        column (InstrumentedAttribute[Any]): The mapped column of the key, which should be unique.
+        entity (Optional[Any]): The entity to select. The class of the column is used if omitted.
+        criteria (Any): Additional conditions of the entities.
+
+    Returns:
+        Batch[Any, Any]: The batch function returning entities by the value of the column.
+    """
+    target = entity if entity is not None else column.class_
+    by_any = select(target).where(column == any_(bindparam('b_keys', type_=ARRAY(column.type))), *criteria)
+    by_in = select(target).where(column.in_(bindparam('b_keys', expanding=True)), *criteria)
+
+    async def batch(session: AsyncSession, keys: list[Any]) -> Mapping[Any, Any]:
+        statement = by_any if session.get_bind().dialect.name == 'postgresql' else by_in
+        rows = await session.scalars(statement, dict(b_keys=keys))
+        return {getattr(row, column.key): row for row in rows}
+
+    return batch
@@ -1,23 +1,27 @@
-import asyncio
+from contextlib import asynccontextmanager
 import logging
 import logging.config
 import os
-from typing import Optional, Coroutine, Awaitable
-from fastapi import FastAPI, Request, Response
+from typing import AsyncIterator, Optional
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import yaml
 from PIL import JpegImagePlugin
 from pillow_heif import register_heif_opener
 from .config import root_package, app_env, environment
-from .resources import configure
+from .bootstrap import create_resources
+from .resources import ResourceSessionMiddleware
 
 
-async def create_app(
+def create_app(
     env_key: Optional[str] = None,
 ) -> FastAPI:
     """
     Initializes the FastAPI application.
+
+    Resources are created here and prepared by the lifespan of the application, which completes
+    warming up before the server accepts requests and releases them after in-flight requests finish.
     """
     JpegImagePlugin._getmp = lambda x: None
 
@@ -39,6 +43,17 @@ async def create_app(
     logger = logging.getLogger(root_package().lower())
 
     try:
+        # Resources
+        resources = create_resources(env.settings, logger)
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+            await resources.start()
+            try:
+                yield
+            finally:
+                await resources.close(env.settings.shutdown_timeout)
+
         # FastAPI
         app = FastAPI(
             title=env.settings.name,
@@ -46,6 +61,7 @@ async def create_app(
             openapi_url=None,
             docs_url=None,
             redoc_url=None,
+            lifespan=lifespan,
         )
 
         app.add_middleware(
@@ -60,16 +76,8 @@ async def create_app(
         if env.settings.static:
             app.mount(env.settings.static.path, StaticFiles(directory=env.settings.static.root))
 
-        # Resources
-        resources, call_session = await configure(env.settings, logger)
-
         app.state.resources = resources
-
-        @app.middleware('http')
-        async def call(req: Request, call_next) -> Awaitable[Response]:
-            async def next(session):
-                return await call_next(req)
-            return await call_session(next)
+        app.add_middleware(ResourceSessionMiddleware, resources=resources)
 
         # Routes
         from .api import routes
@@ -82,27 +90,8 @@ async def create_app(
     return app
 
 
-def app():
+def app() -> FastAPI:
     """
     Application factory executed by Uvicorn.
     """
-    loop = asyncio.get_running_loop()
-    if loop:
-        future = loop.create_future()
-
-        async def setup():
-            try:
-                future.set_result(await create_app())
-            except:
-                future.cancel()
-                raise
-
-        loop.create_task(setup())
-
-        async def app(scope, receive, send):
-            value = await future
-            return await value(scope, receive, send)
-    else:
-        app = asyncio.run(create_app())
-
-    return app
+    return create_app()
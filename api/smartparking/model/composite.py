@@ -1,3 +1,5 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
 from . import db
 
 
@@ -6,3 +8,21 @@ from . import db
 #----------------------------------------------------------------
 class Me(db.Account):
     pass
+
+
+@dataclass(frozen=True)
+class MeSnapshot:
+    """
+    Immutable copy of `Me` detached from DB sessions.
+    """
+    id: str
+    login_id: str
+    name: str
+    email: str
+    created_at: datetime
+    modified_at: datetime
+    last_login: datetime
+
+    @classmethod
+    def of(cls, me: db.Account) -> 'MeSnapshot':
+        return cls(**{f.name: getattr(me, f.name) for f in fields(cls)})
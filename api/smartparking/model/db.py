@@ -1,13 +1,20 @@
 import enum
 from datetime import datetime
 from typing import Any, Optional
-from sqlalchemy import Enum, ForeignKey
+from sqlalchemy import JSON, BigInteger, Enum, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
+#: JSON column type stored as JSONB on PostgreSQL and as JSON text on other databases such as SQLite.
+PortableJSON = JSON().with_variant(JSONB(), 'postgresql')
+
+
 class Base(DeclarativeBase):
-    pass
+    type_annotation_map = {
+        dict[str, Any]: PortableJSON,
+        list[Any]: PortableJSON,
+    }
 
 
 # ----------------------------------------------------------------
@@ -17,11 +24,74 @@ class Account(Base):
     __tablename__ = "account"
 
     id: Mapped[str] = mapped_column(primary_key=True)
-    login_id: Mapped[str]
+    login_id: Mapped[str] = mapped_column(unique=True, index=True)
     name: Mapped[str]
     email: Mapped[str]
     created_at: Mapped[datetime]
     modified_at: Mapped[datetime]
     last_login: Mapped[datetime]
+    #: Time of withdrawal. Withdrawn accounts are hidden and purged by the withdrawal worker.
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+
+
+def storage_prefix(account_id: str) -> str:
+    """
+    Prefix of the storage paths of the files owned by the account, which are deleted with the account.
+    """
+    return f"accounts/{account_id}/"
+
+
+class WithdrawalStage(enum.Enum):
+    """
+    Stages of the purge of a withdrawn account, processed in the order of definition.
+    """
+    ROWS = "rows"
+    STORAGE = "storage"
+    DONE = "done"
+
+
+class Withdrawal(Base):
+    """
+    Progress of the purge of a withdrawn account.
 
+    Withdrawals which exhausted their attempts are no longer claimed and remain with `failed_at` set.
+    """
+    __tablename__ = "withdrawal"
 
+    account_id: Mapped[str] = mapped_column(primary_key=True)
+    login_id: Mapped[str]
+    stage: Mapped[WithdrawalStage] = mapped_column(Enum(WithdrawalStage, native_enum=False, length=16), index=True)
+    rows_deleted: Mapped[int] = mapped_column(default=0)
+    objects_deleted: Mapped[int] = mapped_column(default=0)
+    attempts: Mapped[int] = mapped_column(default=0)
+    error: Mapped[Optional[str]] = mapped_column(default=None)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(default=None)
+    requested_at: Mapped[datetime]
+    updated_at: Mapped[datetime]
+    completed_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+    failed_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+
+
+# ----------------------------------------------------------------
+# Outbox
+# ----------------------------------------------------------------
+class OutboxMessage(Base):
+    """
+    Side effect recorded in the transaction of the change causing it and executed later by the outbox worker.
+
+    Messages are deleted once executed. Those which exhausted their attempts remain with `failed_at` set.
+    """
+    __tablename__ = "outbox"
+
+    # SQLite assigns keys automatically only to INTEGER PRIMARY KEY columns.
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer(), 'sqlite'), primary_key=True, autoincrement=True)
+    topic: Mapped[str] = mapped_column(index=True)
+    payload: Mapped[dict[str, Any]]
+    attempts: Mapped[int] = mapped_column(default=0)
+    #: Time from which the message may be claimed, pushed back after each failed attempt.
+    available_at: Mapped[datetime] = mapped_column(index=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(default=None)
+    error: Mapped[Optional[str]] = mapped_column(default=None)
+    created_at: Mapped[datetime]
+    #: Time at which the last attempt failed, when no attempt is left.
+    failed_at: Mapped[Optional[datetime]] = mapped_column(default=None)
@@ -261,3 +261,6 @@ class Errors(Errorneous, Enum):
     # Validations
     INVALID_CONTENT_TYPE = dauto("Invalid Content-Type.")
     INVALID_MULTIPART = dauto("Invalid multipart format.")
+
+    # Limits
+    DEADLINE_EXCEEDED = dauto("The time limit of the request was exceeded.")
@@ -0,0 +1,29 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .db import Base
+
+
+async def create_schema(engine: AsyncEngine, drop: bool = False) -> None:
+    """
+    Creates the tables of the models which do not exist yet, in the process rather than by a migration.
+
+    This is meant for databases of tests and benchmarks, such as SQLite files or memory.
+
+    Args:
+        engine (AsyncEngine): The engine of the database.
+        drop (bool): Whether to drop the existing tables first.
+    """
+    async with engine.begin() as conn:
+        if drop:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def drop_schema(engine: AsyncEngine) -> None:
+    """
+    Drops the tables of the models.
+
+    Args:
+        engine (AsyncEngine): The engine of the database.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
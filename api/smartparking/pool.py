@@ -0,0 +1,208 @@
+import asyncio
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Any, Iterator, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from smartparking.config import ApplicationSettings
+
+
+#: Whether the running code only reads, set by read-only services.
+_reading = ContextVar[bool]('_reading', default=False)
+
+
+@contextmanager
+def reading() -> Iterator[None]:
+    """
+    Declares that the code in the block does not write, so that `ResourceSession.read` may use a replica
+    even in requests with unsafe methods.
+    """
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+def is_reading() -> bool:
+    """
+    Whether the running code is declared not to write by `reading()`.
+    """
+    return _reading.get()
+
+
+class WaitHistogram:
+    """
+    Histogram of seconds spent waiting for a pooled connection.
+    """
+
+    #: Upper bounds of the buckets in seconds. The last bucket has no upper bound.
+    bounds: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        count = sum(self.counts)
+        labels = [f"le_{b * 1000:g}ms" for b in self.bounds] + ['inf']
+        return {
+            'count': count,
+            'mean_ms': self.total / count * 1000 if count else 0.0,
+            'max_ms': self.max * 1000,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool of asynchronous engines recording how long checkouts wait and how often they time out.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        #: Wait time of checkouts.
+        self.waits = WaitHistogram()
+        #: Number of checkouts which failed by `pool_timeout`.
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waits.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'max_overflow': self._max_overflow,
+            'timeouts': self.timeouts,
+            'wait': self.waits.snapshot(),
+        }
+
+
+def engine_options(db: ApplicationSettings.DB, dsn: Optional[str] = None) -> dict[str, Any]:
+    """
+    Builds keyword arguments of `create_async_engine` for the pool and the statement caches.
+
+    Sizing options are applied only to dialects pooling with a queue pool, since others such as in-memory SQLite
+    use pools which do not accept them. SQLite files are pooled with a queue pool as well, instead of opening
+    a connection for each session. Prepared statement caches are applied only to asyncpg.
+
+    Args:
+        db (ApplicationSettings.DB): The DB settings.
+        dsn (Optional[str]): The DSN of the engine, which defaults to the one in the settings.
+
+    Returns:
+        dict[str, Any]: The keyword arguments.
+    """
+    options: dict[str, Any] = {
+        'pool_pre_ping': db.pool_pre_ping,
+        'pool_recycle': db.pool_recycle,
+        'query_cache_size': db.query_cache_size,
+    }
+
+    url = make_url(dsn or db.dsn)
+    if url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'prepared_statement_cache_size': db.prepared_statement_cache_size,
+            'statement_cache_size': db.statement_cache_size,
+        }
+    if issubclass(url.get_dialect(_is_async=True).get_pool_class(url), QueuePool) or is_sqlite_file(url):
+        options.update(
+            poolclass=MonitoredQueuePool,
+            pool_size=db.pool_size,
+            max_overflow=db.max_overflow,
+            pool_timeout=db.pool_timeout,
+        )
+
+    return options
+
+
+def is_sqlite_file(url: URL) -> bool:
+    """
+    Whether the URL points at an SQLite database in a file, rather than in memory.
+    """
+    return url.get_backend_name() == 'sqlite' \
+        and url.database not in (None, '', ':memory:') \
+        and url.query.get('mode') != 'memory'
+
+
+def configure_sqlite(engine: AsyncEngine, busy_timeout: int = 5000) -> None:
+    """
+    Sets pragmas on each new SQLite connection of the engine.
+
+    Foreign keys are enforced as on PostgreSQL. Databases in files use write-ahead logging, so that readers
+    do not block the writer, and wait for locks up to `busy_timeout` milliseconds.
+    """
+    file = is_sqlite_file(engine.url)
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        if file:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+        cursor.close()
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Retrieves the current state of the connection pool.
+    """
+    pool = engine.pool
+    if isinstance(pool, MonitoredQueuePool):
+        return pool.stats()
+    return {'status': pool.status()}
+
+
+def engine_stats(primary: AsyncEngine, replicas: list[AsyncEngine]) -> dict[str, Any]:
+    """
+    Retrieves the state of the connection pools of the primary and the replicas.
+    """
+    return {
+        'primary': pool_stats(primary),
+        'replicas': {f"{e.url.host}:{e.url.port or ''}/{e.url.database}": pool_stats(e) for e in replicas},
+    }
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> float:
+    """
+    Opens connections concurrently and returns them to the pool, so that first requests do not pay for connecting.
+
+    Args:
+        engine (AsyncEngine): The engine.
+        connections (int): Number of connections to open.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    start = time.perf_counter()
+    if connections > 0:
+        conns = await asyncio.gather(*[engine.connect() for _ in range(connections)], return_exceptions=True)
+        for c in conns:
+            if not isinstance(c, BaseException):
+                await c.close()
+        errors = [c for c in conns if isinstance(c, BaseException)]
+        if errors:
+            raise errors[0]
+    return time.perf_counter() - start
@@ -1,18 +1,37 @@
 import asyncio
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from contextvars import ContextVar, Token
+from itertools import cycle
+import time
 from dataclasses import dataclass, field
+from functools import partial
+from datetime import datetime
 import json
 import logging
 import sys
+import threading
 from uuid import uuid4
 from types import ModuleType
-from typing import Any, Callable, Optional, Union, Awaitable, Generic, Protocol, TypeVar, TYPE_CHECKING, Dict
+from typing import Any, Callable, Coroutine, Mapping, Optional, Union, Awaitable, Generic, Protocol, TypeVar, TYPE_CHECKING, Dict
 from typing_extensions import Self
 import fitz  # PyMuPDF library for PDF processing
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
-from smartparking.ext.firebase.base import FirebaseAuth, FirebaseAdmin, FirebaseAuthSettings
+from sqlalchemy import bindparam, event, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from smartparking.ext.firebase.base import FirebaseAuth, FirebaseAdmin
 from smartparking.ext.storage.base import Storage
-from smartparking.config import ApplicationSettings
+from smartparking.loader import Batch, Loader
+import smartparking.model.db as m
+from smartparking.model.schema import create_schema
+from smartparking.pool import is_reading, warm_up
+
+if TYPE_CHECKING:
+    # Built by the upper layers and given by `smartparking.bootstrap`, which resources do not depend on.
+    from smartparking.api.shared.auth import IdentityCache
+    from smartparking.service.outbox import OutboxWorker
+    from smartparking.service.withdrawal import WithdrawalWorker
+    from smartparking.service.writebehind import LastLoginBuffer
 
 
 class Closeable(Protocol):
@@ -21,6 +40,18 @@ class Closeable(Protocol):
 
 
 T = TypeVar('T', bound=Closeable)
+R = TypeVar('R')
+K = TypeVar('K')
+V = TypeVar('V')
+
+#: HTTP methods whose requests are served by read replicas.
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the time budget of a resource session is exhausted.
+    """
 
 
 @dataclass
@@ -29,24 +60,201 @@ class Resources:
     storage: Storage
     firebase: Union[FirebaseAuth, FirebaseAdmin]
     logger: logging.Logger
+    last_login: 'LastLoginBuffer'
+    identities: 'IdentityCache'
+    withdrawals: 'WithdrawalWorker'
+    outbox: 'OutboxWorker'
+    replicas: list[AsyncEngine] = field(default_factory=list)
+    #: Number of connections opened to each engine by `start()`.
+    warmup: int = 0
+    #: Whether `start()` creates missing tables in the primary.
+    create_schema: bool = False
+    sessionmaker: async_sessionmaker[AsyncSession] = field(init=False)
+
+    def __post_init__(self):
+        self.sessionmaker = async_sessionmaker(self.db, expire_on_commit=False)
+        self._replica_makers = cycle([async_sessionmaker(e, expire_on_commit=False) for e in self.replicas]) \
+            if self.replicas else None
+        self._sessions: set[ResourceSession] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of sessions opened and not closed yet.
+        """
+        return len(self._sessions)
+
+    def open(self, read_only: bool = False) -> 'ResourceSession':
+        """
+        Open a resource session.
 
-    def open(self) -> 'ResourceSession':
-        return ResourceSession(
+        Args:
+            read_only (bool): Whether the session serves a request which is not expected to write,
+                so that reads can be routed to a replica.
+
+        Returns:
+            ResourceSession: The session.
+        """
+        session = ResourceSession(
             id=str(uuid4()),
-            db=async_sessionmaker(self.db, expire_on_commit=False)(),
+            sessionmaker=self.sessionmaker,
             storage=self.storage,
             firebase=self.firebase,
             logger=self.logger,
+            last_login=self.last_login,
+            identities=self.identities,
+            withdrawals=self.withdrawals,
+            outbox=self.outbox,
+            replica_sessionmaker=next(self._replica_makers) if self._replica_makers else None,
+            read_only=read_only,
+            released=self._sessions.discard,
         )
+        self._sessions.add(session)
+        return session
 
+    @property
+    def auth(self) -> FirebaseAuth:
+        return self.firebase if isinstance(self.firebase, FirebaseAuth) else self.firebase.auth
 
-@dataclass
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self.db, *self.replicas]
+
+    async def start(self) -> None:
+        """
+        Prepare the resources before serving requests, so that first requests do not pay for cold connections.
+
+        DB connections are opened, the Firebase public keys are fetched and storage clients are connected
+        concurrently. Failures of the key fetch are logged and left to the background refresh, while the others
+        are raised.
+        """
+        started = time.perf_counter()
+
+        async def timed(name: str, work: Awaitable[Any]) -> None:
+            start = time.perf_counter()
+            await work
+            self.logger.info(f"Warmed up {name} in {(time.perf_counter() - start) * 1000:.1f}ms.")
+
+        if self.create_schema:
+            await timed("DB schema", create_schema(self.db))
+
+        async def keys() -> None:
+            provider = self.auth.provider
+            try:
+                await provider.refresh()
+            except Exception as e:
+                self.logger.warning("Failed to prefetch Firebase public keys.", exc_info=e)
+            provider.start()
+
+        self.withdrawals.start()
+        self.outbox.start()
+
+        await asyncio.gather(
+            *[
+                timed(f"{self.warmup} DB connections to {e.url.host or e.url.database}", warm_up(e, self.warmup))
+                for e in self.engines if self.warmup > 0
+            ],
+            timed("Firebase public keys", keys()),
+            timed(f"storage {type(self.storage).__name__}", asyncio.to_thread(self.storage.prepare)),
+        )
+
+        self.logger.info(f"Resources are ready in {(time.perf_counter() - started) * 1000:.1f}ms.")
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait until all opened sessions are closed.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: Whether all sessions were closed in time.
+        """
+        deadline = time.monotonic() + timeout
+        while self._sessions and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return not self._sessions
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """
+        Release the resources held for the lifetime of the application.
+
+        In-flight sessions are given `timeout` seconds to finish before connection pools are disposed.
+
+        Args:
+            timeout (float): Maximum seconds to wait for in-flight sessions.
+        """
+        started = time.perf_counter()
+
+        if not await self.drain(timeout):
+            self.logger.warning(f"{self.in_flight} sessions are still open after {timeout}s. Closing resources.")
+
+        await self.auth.provider.stop()
+        await self.withdrawals.stop()
+        await self.outbox.stop()
+        try:
+            await self.last_login.stop()
+        except Exception as e:
+            self.logger.warning("Failed to write buffered last login times.", exc_info=e)
+
+        for e in self.engines:
+            await e.dispose()
+
+        try:
+            await self.storage.aclose()
+        except Exception as e:
+            self.logger.warning("Failed to close storage.", exc_info=e)
+
+        self.logger.info(f"Resources are closed in {(time.perf_counter() - started) * 1000:.1f}ms.")
+
+
+@dataclass(eq=False)
 class ResourceSession(Closeable):
     id: str
-    db: AsyncSession
+    sessionmaker: async_sessionmaker[AsyncSession]
     storage: Storage
     firebase: Union[FirebaseAuth, FirebaseAdmin]
     logger: logging.Logger
+    last_login: 'LastLoginBuffer'
+    identities: 'IdentityCache'
+    withdrawals: 'WithdrawalWorker'
+    outbox: 'OutboxWorker'
+    replica_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+    read_only: bool = False
+    #: Called with the session when it is closed.
+    released: Optional[Callable[['ResourceSession'], None]] = None
+    #: Value of `time.monotonic()` by which the session should finish, if limited.
+    deadline: Optional[float] = None
+
+    @property
+    def db(self) -> AsyncSession:
+        """
+        DB session of the primary, which is created on first access.
+
+        Once accessed, `read` also returns this session for the rest of the request, so that reads after a write
+        observe it.
+        """
+        if self._db is None:
+            self._db = self.sessionmaker()
+            event.listen(self._db.sync_session, 'after_begin', self._limit_transaction)
+            event.listen(self._db.sync_session, 'after_commit', self._after_commit)
+            event.listen(self._db.sync_session, 'after_rollback', self._after_rollback)
+        return self._db
+
+    @property
+    def read(self) -> AsyncSession:
+        """
+        DB session for queries which do not write.
+
+        A replica serves it in read-only requests and read-only services until the primary is used.
+        Otherwise, this is the session of the primary.
+        """
+        if self._db is not None or self.replica_sessionmaker is None or not (self.read_only or is_reading()):
+            return self.db
+        if self._replica is None:
+            self._replica = self.replica_sessionmaker()
+            event.listen(self._replica.sync_session, 'after_begin', self._limit_transaction)
+        return self._replica
 
     @property
     def tx(self) -> AsyncSession:
@@ -54,14 +262,159 @@ class ResourceSession(Closeable):
             self.db.sync_session.begin()
         return self.db
 
+    def limit(self, seconds: float) -> None:
+        """
+        Limit the time the session may take from now. An earlier deadline set before is kept.
+
+        Transactions begun afterwards are given the remaining time as `statement_timeout` on PostgreSQL,
+        and `bounded()` cancels awaitables which outlive it.
+
+        Args:
+            seconds (float): The time budget.
+        """
+        deadline = time.monotonic() + seconds
+        if self.deadline is None or deadline < self.deadline:
+            self.deadline = deadline
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left until the deadline, or None if the session is not limited.
+        """
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    async def bounded(self, aw: Awaitable[R]) -> R:
+        """
+        Await an operation such as a storage or Firebase call, cancelling it when the deadline passes.
+
+        Args:
+            aw (Awaitable[R]): The operation.
+
+        Returns:
+            R: The result of the operation.
+
+        Raises:
+            DeadlineExceeded: If the deadline passes before the operation completes.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return await aw
+        if remaining <= 0:
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise DeadlineExceeded(f"Deadline of session {self.id} has passed.")
+        try:
+            return await asyncio.wait_for(aw, remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline of session {self.id} has passed.") from None
+
+    def _limit_transaction(self, session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+        remaining = self.remaining()
+        if remaining is None:
+            return
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of session {self.id} has passed.")
+        if connection.dialect.name == 'postgresql':
+            # SET does not take bound parameters. The value is an integer computed here.
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}")
+
+    def _after_commit(self, session: Session) -> None:
+        committed, self._committed = self._committed, []
+        for callback in committed:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.warning("Exception occurred in a callback after commit.", exc_info=e)
+
+    def _after_rollback(self, session: Session) -> None:
+        self._committed = []
+
+    def on_commit(self, callback: Callable[[], Any]) -> None:
+        """
+        Register a function called after the current transaction of the session is committed,
+        whether by a service or when the session is finished.
+
+        Callbacks are not called when the transaction is rolled back.
+
+        Args:
+            callback (Callable[[], Any]): The function.
+        """
+        self._committed.append(callback)
+
+    async def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        """
+        Record a side effect executed by the outbox worker once the transaction of the session is committed.
+
+        The message is inserted in the transaction, so it is lost neither when the side effect fails
+        nor when the process stops, and is discarded when the session is rolled back.
+
+        Args:
+            topic (str): The topic, such as `smartparking.service.outbox.STORAGE_DELETE`.
+            payload (dict[str, Any]): The arguments of the handler of the topic, which must be serializable to JSON.
+        """
+        now = datetime.now()
+        await self.tx.execute(_publish, dict(b_topic=topic, b_payload=payload, b_now=now))
+        if self.outbox.notify not in self._committed:
+            self.on_commit(self.outbox.notify)
+
+    def loader(self, batch: Batch[K, V]) -> Loader[K, V]:
+        """
+        Retrieve the loader of the batch function for this session.
+
+        Keys loaded in the same iteration of the event loop are resolved by one call of the batch function
+        with `read`, and results are memoised until the session is closed. Calls of the batch functions of all
+        loaders of the session run one at a time, since `read` does not allow concurrent operations.
+
+        Args:
+            batch (Batch[K, V]): The batch function, which identifies the loader.
+
+        Returns:
+            Loader[K, V]: The loader.
+        """
+        loader = self._loaders.get(batch)
+        if loader is None:
+            loader = self._loaders[batch] = Loader(partial(self._load, batch))
+        return loader
+
+    async def _load(self, batch: Batch[K, V], keys: list[K]) -> Mapping[K, V]:
+        async with self._loading:
+            return await batch(self.read, keys)
+
     _status: bool = field(init=False)
+    _db: Optional[AsyncSession] = field(init=False)
+    _replica: Optional[AsyncSession] = field(init=False)
+    _loaders: dict[Callable, Loader] = field(init=False)
+    _loading: asyncio.Lock = field(init=False)
+    _committed: list[Callable[[], Any]] = field(init=False)
 
     def __post_init__(self):
         self._status = True
+        self._db = None
+        self._replica = None
+        self._loaders = {}
+        self._loading = asyncio.Lock()
+        self._committed = []
 
     def fail(self) -> None:
         self._status = False
 
+    async def finish(self, exc: Optional[Exception] = None) -> None:
+        """
+        Commit or roll back the transaction based on the status and close the DB sessions, keeping the session open.
+
+        DB sessions used afterwards are opened again and finished by `close()`.
+
+        Args:
+            exc (Optional[Exception]): The exception that occurred, if any.
+
+        Raises:
+            Exception: If the transaction fails to be committed. The DB sessions are closed nevertheless.
+        """
+        try:
+            await self._close(self._status and exc is None)
+        finally:
+            # Callbacks of a transaction which was not committed are discarded.
+            self._committed = []
+
     async def close(self, exc: Optional[Exception]) -> None:
         """
         Close the resource session, committing or rolling back the transaction based on the status.
@@ -69,21 +422,41 @@ class ResourceSession(Closeable):
         Args:
             exc (Optional[Exception]): The exception that occurred, if any.
         """
-        status = self._status and exc is None
+        try:
+            await self.finish(exc)
+        finally:
+            if self.released is not None:
+                self.released(self)
+
+    async def _close(self, status: bool) -> None:
+        self._loaders.clear()
+
+        # Close resources. Only the DB sessions require cleanup operations, and only if they were used.
+        replica, self._replica = self._replica, None
+        if replica is not None:
+            try:
+                await replica.close()
+            except Exception as e:
+                self.logger.warning("Exception occurred while closing replica session.", exc_info=e)
+
+        db, self._db = self._db, None
+        if db is None:
+            return
 
-        # Close resources. Only the DB session requires cleanup operations.
         try:
-            if self.db.in_transaction():
+            if db.in_transaction():
                 if status:
+                    # A failed commit propagates, so that the request is not reported as successful.
                     self.logger.debug(f"Committing transaction: {self.id}")
-                    await self.db.commit()
+                    await db.commit()
                 else:
                     self.logger.debug(f"Rolling back transaction: {self.id}")
-                    await self.db.rollback()
-        except Exception as e:
-            self.logger.warning("Exception occurred while closing transaction.", exc_info=e)
+                    try:
+                        await db.rollback()
+                    except Exception as e:
+                        self.logger.warning("Exception occurred while rolling back transaction.", exc_info=e)
         finally:
-            await self.db.close()
+            await db.close()
 
     async def __aenter__(self) -> Self:
         return self
@@ -104,93 +477,216 @@ class ResourceSession(Closeable):
 
 _context = ContextVar[ResourceSession]('_context')
 
+#: Inserts a message into the outbox. Takes `b_topic`, `b_payload` and `b_now`.
+_publish = insert(m.OutboxMessage).values(
+    topic=bindparam('b_topic'),
+    payload=bindparam('b_payload'),
+    available_at=bindparam('b_now'),
+    created_at=bindparam('b_now'),
+)
 
-async def configure(settings: ApplicationSettings, logger: logging.Logger) -> tuple[Resources, Callable]:
+
+class ResourceSessionMiddleware:
     """
-    Configure the application resources, including the database engine, storage, and Firebase services.
+    ASGI middleware opening a resource session for each HTTP request.
 
-    Args:
-        settings (ApplicationSettings): The application settings.
-        logger (logging.Logger): The logger instance.
+    The session is committed when the response status is below 400 and rolled back otherwise
+    or when the application raises. Response messages are passed through untouched, so streaming
+    responses keep streaming and no intermediate task is created.
 
-    Returns:
-        tuple[Resources, Callable]: A tuple containing the Resources instance and a session-calling function.
+    The transaction is finished before the response start is sent, so that a client receiving the response
+    observes the changes in its next request, whichever connection serves it. When the commit fails,
+    the exception is raised instead of sending the response start, so the client receives an error response.
     """
-    # Create the asynchronous database engine
-    engine = create_async_engine(
-        settings.db.dsn,
-        echo_pool=settings.db.echo_pool and "debug",
-    )
-    if settings.db.echo:
-        engine.echo = True
-
-    # Initialize storage based on the provided URL
-    import smartparking.ext.storage.local
-    import smartparking.ext.storage.s3
-    storage = Storage.of(settings.storage.url)
-    if storage is None:
-        raise ValueError(f"Invalid URL for storage: {settings.storage.url}")
-
-    # Initialize Firebase services
-    firebase = FirebaseAuth(settings.firebase) if isinstance(settings.firebase,
-                                                             FirebaseAuthSettings) else FirebaseAdmin(settings.firebase)
-
-    resources = Resources(
-        db=engine,
-        storage=storage,
-        firebase=firebase,
-        logger=logger,
-    )
-
-    async def call_session(next: Callable[[ResourceSession], Awaitable[Any]]) -> Callable[
-        [ResourceSession], Awaitable[Any]]:
-        """
-        Middleware to handle resource sessions within a context.
 
-        Args:
-            next (Callable[[ResourceSession], Awaitable[Any]]): The next callable in the middleware chain.
+    def __init__(self, app: Callable, resources: Resources, fail_status: int = 400) -> None:
+        self.app = app
+        self.resources = resources
+        #: Minimum response status which rolls back the transaction.
+        self.fail_status = fail_status
 
-        Returns:
-            Callable[[ResourceSession], Awaitable[Any]]: The wrapped callable.
-        """
-        session = resources.open()
+    async def __call__(self, scope: dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        session = self.resources.open(read_only=scope['method'] in SAFE_METHODS)
         token = _context.set(session)
+
+        async def observe(message: dict[str, Any]) -> None:
+            if message['type'] == 'http.response.start':
+                if message['status'] >= self.fail_status:
+                    session.fail()
+                await session.finish()
+            await send(message)
+
         async with session:
             try:
-                return await next(session)
+                await self.app(scope, receive, observe)
             except:
                 session.fail()
                 raise
             finally:
                 _context.reset(token)
 
-    return resources, call_session
+
+class BackgroundLoop:
+    """
+    Event loop running in a daemon thread, to which synchronous code submits coroutines.
+
+    Engines and their pools are bound to the loop their connections were opened on, so running every
+    coroutine of a batch job on this loop lets connections be reused across resource sessions
+    instead of being opened and discarded with a new loop each time.
+
+    Coroutines run in a copy of the context of the submitting thread, so the resource session entered
+    by `ContextualResources` is visible to services.
+    """
+
+    def __init__(self, name: str = 'resources-loop') -> None:
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> Self:
+        """
+        Starts the thread running the loop unless it is already running.
+        """
+        with self._lock:
+            if self.loop.is_closed():
+                raise RuntimeError(f"Event loop {self.name} is already stopped.")
+            if not self.running:
+                self._thread = threading.Thread(target=self.loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, coro: Coroutine[Any, Any, R]) -> Future[R]:
+        """
+        Schedules a coroutine on the loop, starting the loop if necessary.
+
+        Args:
+            coro (Coroutine[Any, Any, R]): The coroutine.
+
+        Returns:
+            Future[R]: The future of the result.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, R], timeout: Optional[float] = None) -> R:
+        """
+        Runs a coroutine on the loop and waits for its result.
+
+        Args:
+            coro (Coroutine[Any, Any, R]): The coroutine.
+            timeout (Optional[float]): Seconds to wait. The coroutine is cancelled when it elapses.
+
+        Returns:
+            R: The result of the coroutine.
+        """
+        if self.running and threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundLoop.run() cannot be called from its own event loop.")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """
+        Stops the loop, waits for the thread and closes the loop.
+
+        Release resources bound to the loop, such as engines, with `run()` beforehand.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                thread.join()
+            if not self.loop.is_closed():
+                self.loop.close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+_shared_loop: Optional[BackgroundLoop] = None
+_shared_loop_lock = threading.Lock()
+
+
+def shared_loop() -> BackgroundLoop:
+    """
+    Returns the background loop shared by synchronous `ContextualResources` given no event loop.
+
+    The loop lives until the process exits.
+    """
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = BackgroundLoop('shared-resources-loop')
+        return _shared_loop
 
 
 @dataclass
 class ContextualResources:
     """
     Context manager for handling resource sessions, supporting both synchronous and asynchronous contexts.
+
+    In synchronous contexts, coroutines are run by `run()` on a background loop, which is the shared one
+    unless another one is given, so that connections survive across sessions. Resources used in
+    synchronous contexts should be started on the same loop, e.g. `loop.run(resources.start())`.
     """
     cxt: ContextVar[ResourceSession]
     resources: Resources
-    event_loop: Optional[asyncio.AbstractEventLoop]
+    event_loop: Optional[Union[asyncio.AbstractEventLoop, BackgroundLoop]]
     token: Optional[Token] = field(default=None, init=False)
 
     @classmethod
-    def of(cls, resources: Resources, event_loop: Optional[asyncio.AbstractEventLoop] = None) -> 'ContextualResources':
+    def of(
+        cls,
+        resources: Resources,
+        event_loop: Optional[Union[asyncio.AbstractEventLoop, BackgroundLoop]] = None,
+    ) -> 'ContextualResources':
         """
         Factory method to create an instance of ContextualResources.
 
         Args:
             resources (Resources): The application resources.
-            event_loop (Optional[asyncio.AbstractEventLoop]): The event loop, if any.
+            event_loop (Optional[Union[asyncio.AbstractEventLoop, BackgroundLoop]]): The loop running coroutines
+                in synchronous contexts. The shared background loop is used if omitted.
 
         Returns:
             ContextualResources: The instantiated ContextualResources.
         """
         return cls(_context, resources, event_loop)
 
+    @property
+    def loop(self) -> Union[asyncio.AbstractEventLoop, BackgroundLoop]:
+        return self.event_loop or shared_loop()
+
+    def run(self, coro: Coroutine[Any, Any, R]) -> R:
+        """
+        Runs a coroutine, typically a service call, within the session in synchronous contexts.
+
+        Args:
+            coro (Coroutine[Any, Any, R]): The coroutine.
+
+        Returns:
+            R: The result of the coroutine.
+        """
+        loop = self.loop
+        if isinstance(loop, BackgroundLoop):
+            return loop.run(coro)
+        return loop.run_until_complete(coro)
+
     def __enter__(self) -> ResourceSession:
         session = self.resources.open()
         self.token = self.cxt.set(session)
@@ -199,13 +695,7 @@ class ContextualResources:
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         value = self.cxt.get()
         try:
-            async def close():
-                await value.close(exc_value)
-
-            if self.event_loop:
-                self.event_loop.run_until_complete(close())
-            else:
-                asyncio.run(close())
+            self.run(value.close(exc_value))
         finally:
             if self.token is not None:
                 self.cxt.reset(self.token)
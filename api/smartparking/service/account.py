@@ -1,24 +1,10 @@
-from typing import Any, Dict, cast
+from functools import partial
+from typing import Optional
 from uuid import uuid4
 
-from smartparking.ext.firebase.base import FirebaseAdmin
-from firebase_admin.auth import delete_user
-from sqlalchemy import cast as Cast
-from sqlalchemy import (
-    delete,
-    func,
-    insert,
-    literal_column,
-    not_,
-    or_,
-    select,
-    union_all,
-    update,
-)
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.types import Date, String
-
-from .commons import Errors, Maybe, c, datetime, m, r, service
+from .commons import Errors, Maybe, c, datetime, m, r, read_only, service
+from . import statements as st
+from .outbox import FIREBASE_DELETE_USER
 
 
 @service
@@ -33,30 +19,17 @@ async def signup(login_id: str, name: str, email: str) -> Maybe[c.Me]:
 
     Returns:
         Maybe[c.Me]: The signed-up user information along with total points.
+            Returns an error if the account is withdrawn and not purged yet.
     """
-    # Acquire a lock on the account row to prevent race conditions
+    # A single upsert backed by the unique index on login_id replaces the row lock.
+    # An existing account is left as is except for the login time.
     account = await r.tx.scalar(
-        select(m.Account).where(m.Account.login_id == login_id).with_for_update()
+        st.signup_me,
+        dict(b_id=str(uuid4()), b_login_id=login_id, b_name=name, b_email=email, b_now=datetime.now()),
+        execution_options={'populate_existing': True},
     )
 
-    now = datetime.now()
-
-    if account is None:
-
-        account = await r.tx.scalar(
-            insert(m.Account).returning(m.Account),
-            dict(
-                id=str(uuid4()),
-                login_id=login_id,
-                name=name,
-                email=email,
-                created_at=now,
-                modified_at=now,
-                last_login=now,
-            ),
-        )
-
-    return await r.tx.get(c.Me, account.id)
+    return account if account is not None else Errors.UNAUTHORIZED
 
 
 @service
@@ -70,50 +43,99 @@ async def login(login_id: str) -> Maybe[c.Me]:
     Returns:
         Maybe[c.Me]: The user information along with total points. Returns an error if unauthorized.
     """
-    # Retrieve the account based on login_id
-    account = await r.tx.scalar(select(m.Account).where(m.Account.login_id == login_id))
     now = datetime.now()
 
-    if account is None:
-        return Errors.UNAUTHORIZED
+    if r.last_login.enabled:
+        # The login time is written later in bulk, so that reading requests do not write.
+        account = await r.read.scalar(st.select_me, dict(b_login_id=login_id))
+        if account is None:
+            return Errors.UNAUTHORIZED
+
+        r.last_login.record(login_id, now)
+        return account
 
-    # Update the last_login timestamp
-    await r.tx.execute(
-        update(m.Account).where(m.Account.login_id == login_id).values(last_login=now)
+    # Update the last_login timestamp and retrieve the account in one statement
+    account = await r.tx.scalar(
+        st.login_me,
+        dict(b_login_id=login_id, b_now=now),
+        execution_options={'populate_existing': True},
     )
-    await r.tx.commit()
 
-    return await r.tx.get(c.Me, account.id)
+    return account if account is not None else Errors.UNAUTHORIZED
 
 
 @service
-async def withdraw(me: c.Me):
+@read_only
+async def find(id: str) -> Maybe[c.Me]:
     """
-    Delete user information and related data.
+    Retrieve an account by ID.
+
+    Lookups of accounts in the same iteration of the event loop are resolved by one query,
+    and results are memoised for the rest of the request.
 
     Args:
-        me (c.Me): The authenticated user.
+        id (str): The account ID.
+
+    Returns:
+        Maybe[c.Me]: The account. Returns an error if it does not exist.
     """
-    # Retrieve the resume item to get the photo path for deletion
-    resume = await r.tx.scalar(
-        select(m.ResumeItem).where(m.ResumeItem.account_id == me.id)
-    )
+    account = await r.loader(st.accounts_by_id).load(id)
+    return account if account is not None else Errors.DATA_NOT_FOUND
 
-    path = resume and resume.photo
 
-    # Delete the account from the database
-    await r.tx.execute(delete(m.Account).where(m.Account.id == me.id))
+@service
+@read_only
+async def find_all(ids: list[str]) -> list[Optional[c.Me]]:
+    """
+    Retrieve accounts by IDs with one query.
 
-    if path:
-        try:
-            # Attempt to delete the resume photo from storage
-            r.storage.delete(path)
-        except Exception as e:
-            r.logger.warning(f"Failed to delete resume photo at {path}", exc_info=e)
+    Args:
+        ids (list[str]): The account IDs.
 
-    try:
-        # Attempt to delete the Firebase user
-        firebase = cast(FirebaseAdmin, r.firebase).app
-        delete_user(me.login_id, app=firebase)
-    except Exception as e:
-        r.logger.warning(f"Failed to delete Firebase user {me.login_id}", exc_info=e)
+    Returns:
+        list[Optional[c.Me]]: The accounts in the order of the IDs, None for those which do not exist.
+    """
+    return await r.loader(st.accounts_by_id).load_many(ids)
+
+
+@service
+async def touch(login_id: str) -> None:
+    """
+    Record the login time of an account authorized without `login`.
+
+    Args:
+        login_id (str): The login ID.
+    """
+    now = datetime.now()
+
+    if r.last_login.enabled:
+        r.last_login.record(login_id, now)
+    else:
+        await r.tx.execute(st.touch_account, dict(b_login_id=login_id, b_now=now))
+
+
+@service
+async def withdraw(me: c.MeSnapshot):
+    """
+    Withdraw the account.
+
+    The account is hidden at once from this process, and from the others once their cached identities
+    expire, while the Firebase user is deleted later by the outbox worker, and related rows and files
+    by the withdrawal worker.
+
+    Args:
+        me (c.MeSnapshot): The authenticated user.
+    """
+    r.loader(st.accounts_by_id).clear(me.id)
+
+    now = datetime.now()
+    result = await r.tx.execute(st.withdraw_account, dict(b_id=me.id, b_now=now))
+    if result.rowcount == 0:
+        # Already withdrawn by a concurrent request.
+        return
+
+    await r.tx.execute(st.insert_withdrawal, dict(b_id=me.id, b_login_id=me.login_id, b_now=now))
+    await r.publish(FIREBASE_DELETE_USER, dict(login_id=me.login_id))
+    # Invalidated once committed, so that a concurrent request cannot cache the account again before then.
+    r.on_commit(partial(r.identities.invalidate, me.login_id))
+    r.on_commit(r.withdrawals.notify)
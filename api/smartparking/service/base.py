@@ -3,6 +3,7 @@ from functools import wraps
 import inspect
 from typing import Any, Optional, Callable, TypeVar, ParamSpec, Generic, Awaitable, Concatenate, cast, overload
 from smartparking.model.errors import Errorneous
+from smartparking.pool import reading
 
 
 R = TypeVar('R')
@@ -90,6 +91,17 @@ def service(f: Callable[P, Awaitable[R | Errorneous]]) -> Callable[P, Awaitable[
     return wrapper
 
 
+def read_only(f: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """
+    Declares that the service does not write, so that its queries through `r.read` may be served by a replica.
+    """
+    @wraps(f)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with reading():
+            return await f(*args, **kwargs)
+    return wrapper
+
+
 class ResultGuard:
     def __init__(self, result: Result) -> None:
         self.result = result
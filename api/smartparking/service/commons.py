@@ -7,4 +7,4 @@ from smartparking.resources import context as r
 import smartparking.model.db as m
 import smartparking.model.composite as c
 from smartparking.model.errors import Errors, Errorneous
-from .base import service, Maybe
\ No newline at end of file
+from .base import service, read_only, Maybe
\ No newline at end of file
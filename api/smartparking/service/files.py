@@ -0,0 +1,102 @@
+from typing import AsyncIterator, Optional
+
+from .commons import Errors, Maybe, r, service
+from .outbox import STORAGE_DELETE
+
+
+@service
+async def exists(path: str) -> bool:
+    """
+    Check whether a stored file exists.
+
+    Args:
+        path (str): The storage path.
+
+    Returns:
+        bool: Whether the file exists.
+    """
+    return await r.bounded(r.storage.aexists(path))
+
+
+@service
+async def read(path: str) -> Maybe[bytes]:
+    """
+    Read a stored file.
+
+    Args:
+        path (str): The storage path.
+
+    Returns:
+        Maybe[bytes]: The content. Returns an error if the file does not exist.
+    """
+    try:
+        return await r.bounded(r.storage.aread(path))
+    except FileNotFoundError:
+        return Errors.DATA_NOT_FOUND
+
+
+@service
+async def write(path: str, data: bytes, public: bool = False) -> int:
+    """
+    Store a file, replacing the existing one.
+
+    The file is written at once, so that it is in place when the transaction is committed.
+
+    Args:
+        path (str): The storage path.
+        data (bytes): The content.
+        public (bool): Whether the file is publicly readable, on storages supporting it.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    return await r.bounded(r.storage.awrite(path, data, public))
+
+
+@service
+async def size(path: str) -> Maybe[int]:
+    """
+    Retrieve the size of a stored file.
+
+    Args:
+        path (str): The storage path.
+
+    Returns:
+        Maybe[int]: The number of bytes. Returns an error if the file does not exist.
+    """
+    try:
+        return await r.bounded(r.storage.asize(path))
+    except FileNotFoundError:
+        return Errors.DATA_NOT_FOUND
+
+
+@service
+async def stream(path: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Read a stored file, or a range of it, in chunks.
+
+    The chunks are read while the caller consumes them, such as while a response is sent,
+    so they are not bounded by the deadline of the request. Check the file with `size` beforehand.
+
+    Args:
+        path (str): The storage path.
+        start (int): Offset of the first byte.
+        end (Optional[int]): Offset after the last byte. The end of the file if None.
+
+    Returns:
+        AsyncIterator[bytes]: The chunks.
+    """
+    return r.storage.astream(path, start, end)
+
+
+@service
+async def remove(path: str) -> None:
+    """
+    Delete a stored file once the transaction is committed.
+
+    The deletion is recorded in the outbox, so the file survives a rollback and is retried on failures.
+
+    Args:
+        path (str): The storage path.
+    """
+    await r.publish(STORAGE_DELETE, dict(path=path))
@@ -0,0 +1,280 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import random
+from typing import Any, Awaitable, Callable, Mapping, Optional, Union
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from smartparking.ext.firebase.base import FirebaseAdmin, FirebaseAuth
+from smartparking.ext.storage.base import Storage
+import smartparking.model.db as m
+
+
+#: Function executing a message of a topic with its payload. Raising makes the message retried.
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+#: Topic deleting the storage file at `path`.
+STORAGE_DELETE = 'storage.delete'
+#: Topic deleting the Firebase user of `login_id`.
+FIREBASE_DELETE_USER = 'firebase.delete_user'
+
+
+def handlers(
+    storage: Storage,
+    firebase: Union[FirebaseAuth, FirebaseAdmin],
+    logger: Optional[logging.Logger] = None,
+) -> dict[str, Handler]:
+    """
+    Creates the handlers of the topics published by services.
+
+    Args:
+        storage (Storage): The storage.
+        firebase (Union[FirebaseAuth, FirebaseAdmin]): The Firebase service.
+        logger (Optional[logging.Logger]): The logger.
+
+    Returns:
+        dict[str, Handler]: Handlers by topic.
+    """
+    logger = logger or logging.getLogger(__name__)
+
+    async def storage_delete(payload: dict[str, Any]) -> None:
+        try:
+            await storage.adelete(payload['path'])
+        except FileNotFoundError:
+            pass
+
+    async def firebase_delete_user(payload: dict[str, Any]) -> None:
+        if not isinstance(firebase, FirebaseAdmin):
+            logger.warning(f"Firebase user {payload['login_id']} is not deleted without the admin SDK.")
+            return
+
+        from firebase_admin.auth import UserNotFoundError, delete_user
+        try:
+            await asyncio.to_thread(delete_user, payload['login_id'], app=firebase.app)
+        except UserNotFoundError:
+            pass
+
+    return {
+        STORAGE_DELETE: storage_delete,
+        FIREBASE_DELETE_USER: firebase_delete_user,
+    }
+
+
+class OutboxWorker:
+    """
+    Background executor of side effects recorded in the `outbox` table.
+
+    Services insert messages in the transaction of the change causing them, with `ResourceSession.publish()`,
+    so a side effect is recorded if and only if the change is committed. The worker claims up to `batch_size`
+    messages with `FOR UPDATE SKIP LOCKED` and a lease of `lease` seconds, so that several processes share
+    the queue without executing a message twice, and executes up to `concurrency` of them at once.
+    Each execution holds a DB connection to delete or retry its message, so `concurrency` should stay below
+    the pool size to leave connections to requests.
+
+    A failed message is retried after an exponential backoff from `backoff` up to `max_backoff` seconds with jitter,
+    and is kept as failed after `max_attempts` attempts.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        handlers: Mapping[str, Handler],
+        interval: float = 1.0,
+        batch_size: int = 100,
+        concurrency: int = 10,
+        lease: float = 60.0,
+        max_attempts: int = 10,
+        backoff: float = 1.0,
+        max_backoff: float = 600.0,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.engine = engine
+        #: Handlers by topic.
+        self.handlers = dict(handlers)
+        #: Seconds between polls for messages. The worker is disabled when 0.
+        self.interval = interval
+        #: Maximum number of messages claimed at once.
+        self.batch_size = batch_size
+        #: Maximum number of messages executed at once.
+        self.concurrency = concurrency
+        #: Seconds claimed messages are reserved for this worker.
+        self.lease = lease
+        #: Number of attempts after which a message is given up.
+        self.max_attempts = max_attempts
+        #: Seconds before the first retry, doubled at each failure.
+        self.backoff = backoff
+        #: Maximum seconds between retries.
+        self.max_backoff = max_backoff
+        self.logger = logger or logging.getLogger(__name__)
+        #: Number of executed messages.
+        self.processed = 0
+        #: Number of failed attempts.
+        self.failures = 0
+        #: Number of messages given up.
+        self.dead = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts polling on the running event loop unless already started or disabled.
+        """
+        if self.enabled and not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def notify(self) -> None:
+        """
+        Wakes the worker up to execute messages committed just now.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """
+        Stops the worker. Messages being executed are claimed again after their lease.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def delay(self, attempts: int) -> float:
+        """
+        Seconds to wait before retrying a message which failed `attempts` times.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** max(attempts - 1, 0))
+        # Jitter spreads retries of messages which failed together, e.g. by an outage.
+        return delay * random.uniform(0.5, 1.0)
+
+    async def stats(self) -> dict[str, Any]:
+        """
+        Measures the queue along with the counters of this worker.
+
+        `depth` counts messages to be executed by topic and `lag_seconds` is the age of the oldest of them.
+        """
+        now = datetime.now()
+        pending = m.OutboxMessage.failed_at.is_(None)
+        async with self.engine.connect() as conn:
+            depth = {
+                topic: count for topic, count in await conn.execute(
+                    select(m.OutboxMessage.topic, func.count()).where(pending).group_by(m.OutboxMessage.topic)
+                )
+            }
+            oldest = await conn.scalar(select(func.min(m.OutboxMessage.created_at)).where(pending))
+            failed = await conn.scalar(select(func.count()).where(m.OutboxMessage.failed_at.is_not(None)))
+        return {
+            'depth': depth,
+            'lag_seconds': (now - oldest).total_seconds() if oldest is not None else 0.0,
+            'failed': failed,
+            'running': self.running,
+            'processed': self.processed,
+            'failures': self.failures,
+            'dead': self.dead,
+        }
+
+    async def process_pending(self) -> int:
+        """
+        Executes messages until none is left to claim.
+
+        Returns:
+            int: The number of executed messages.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def execute(message: m.OutboxMessage) -> bool:
+            async with semaphore:
+                return await self._execute(message)
+
+        processed = 0
+        while messages := await self._claim():
+            results = await asyncio.gather(*[execute(message) for message in messages])
+            processed += sum(results)
+        return processed
+
+    async def _claim(self) -> list[m.OutboxMessage]:
+        now = datetime.now()
+        candidates = select(m.OutboxMessage.id) \
+            .where(m.OutboxMessage.failed_at.is_(None)) \
+            .where(m.OutboxMessage.available_at <= now) \
+            .where((m.OutboxMessage.locked_until.is_(None)) | (m.OutboxMessage.locked_until < now)) \
+            .order_by(m.OutboxMessage.id) \
+            .limit(self.batch_size) \
+            .with_for_update(skip_locked=True)
+
+        async with self.engine.begin() as conn:
+            ids = list(await conn.scalars(candidates))
+            if not ids:
+                return []
+            table = m.OutboxMessage.__table__
+            rows = await conn.execute(
+                update(table)
+                .where(table.c.id.in_(ids))
+                .values(locked_until=now + timedelta(seconds=self.lease), attempts=table.c.attempts + 1)
+                .returning(*table.c)
+            )
+            return [m.OutboxMessage(**row._asdict()) for row in rows]
+
+    async def _execute(self, message: m.OutboxMessage) -> bool:
+        try:
+            handler = self.handlers.get(message.topic)
+            if handler is None:
+                raise LookupError(f"No handler for topic {message.topic}.")
+            await handler(message.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            self.logger.warning(f"Failed to execute outbox message {message.id} of {message.topic}.", exc_info=e)
+            await self._retry(message, e)
+            return False
+
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(m.OutboxMessage).where(m.OutboxMessage.id == message.id))
+        self.processed += 1
+        return True
+
+    async def _retry(self, message: m.OutboxMessage, error: Exception) -> None:
+        now = datetime.now()
+        values: dict[str, Any] = dict(locked_until=None, error=str(error)[:1000])
+        if message.attempts >= self.max_attempts:
+            self.dead += 1
+            values.update(failed_at=now)
+        else:
+            values.update(available_at=now + timedelta(seconds=self.delay(message.attempts)))
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(m.OutboxMessage).where(m.OutboxMessage.id == message.id).values(**values)
+                )
+        except Exception as e:
+            # The message is claimed again after its lease.
+            self.logger.warning(f"Failed to record the failure of outbox message {message.id}.", exc_info=e)
+
+    async def _run(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            try:
+                await self.process_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Failed to process outbox messages.", exc_info=e)
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
@@ -0,0 +1,68 @@
+"""
+Statements of hot service paths, built once at import.
+
+Values are given as bound parameters prefixed by `b_` on execution, so that each call neither constructs the statement
+nor computes a new cache key: SQLAlchemy finds the compiled form in the engine's compiled cache and
+asyncpg reuses the statement prepared on the connection.
+"""
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as upsert
+import smartparking.model.db as m
+import smartparking.model.composite as c
+from smartparking.loader import by_column
+
+
+#: Condition excluding withdrawn accounts, which remain until the withdrawal worker purges them.
+active = m.Account.deleted_at.is_(None)
+
+#: Selects an account by `login_id`. Takes `b_login_id`.
+select_me = select(c.Me).where(m.Account.login_id == bindparam('b_login_id'), active)
+
+#: Updates `last_login` of an account by `login_id` and returns it. Takes `b_login_id` and `b_now`.
+login_me = update(c.Me) \
+    .where(m.Account.login_id == bindparam('b_login_id'), active) \
+    .values(last_login=bindparam('b_now')) \
+    .returning(c.Me)
+
+#: Updates `last_login` of an account by `login_id`. Takes `b_login_id` and `b_now`.
+touch_account = update(m.Account) \
+    .where(m.Account.login_id == bindparam('b_login_id'), active) \
+    .values(last_login=bindparam('b_now'))
+
+#: Inserts an account, or updates `last_login` of the existing one, and returns it.
+#: Returns nothing for a withdrawn account whose purge is not completed yet.
+#: Takes `b_id`, `b_login_id`, `b_name`, `b_email` and `b_now`.
+signup_me = upsert(c.Me) \
+    .values(
+        id=bindparam('b_id'),
+        login_id=bindparam('b_login_id'),
+        name=bindparam('b_name'),
+        email=bindparam('b_email'),
+        created_at=bindparam('b_now'),
+        modified_at=bindparam('b_now'),
+        last_login=bindparam('b_now'),
+    ) \
+    .on_conflict_do_update(
+        index_elements=[m.Account.login_id],
+        set_=dict(last_login=bindparam('b_now')),
+        where=active,
+    ) \
+    .returning(c.Me)
+
+#: Marks an account as withdrawn by `id`. Takes `b_id` and `b_now`.
+withdraw_account = update(m.Account) \
+    .where(m.Account.id == bindparam('b_id'), active) \
+    .values(deleted_at=bindparam('b_now'), modified_at=bindparam('b_now'))
+
+#: Records a withdrawal to be processed by the worker. Takes `b_id`, `b_login_id` and `b_now`.
+#: The Firebase user is deleted through the outbox, so the purge starts from the rows.
+insert_withdrawal = insert(m.Withdrawal).values(
+    account_id=bindparam('b_id'),
+    login_id=bindparam('b_login_id'),
+    stage=m.WithdrawalStage.ROWS,
+    requested_at=bindparam('b_now'),
+    updated_at=bindparam('b_now'),
+)
+
+#: Batch function of `r.loader()` selecting accounts by `id`.
+accounts_by_id = by_column(m.Account.id, c.Me, active)
@@ -0,0 +1,261 @@
+import asyncio
+from datetime import datetime, timedelta
+from itertools import islice
+import logging
+from typing import Any, Optional
+from sqlalchemy import Column, Table, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from smartparking.ext.storage.base import Storage
+import smartparking.model.db as m
+
+
+def dependents() -> list[tuple[Table, Column]]:
+    """
+    Finds the tables referring to `account.id` and their referring columns, children of other tables first.
+
+    Returns:
+        list[tuple[Table, Column]]: Pairs of a table and its column referring to the account.
+    """
+    found = []
+    for table in reversed(m.Base.metadata.sorted_tables):
+        for fk in table.foreign_keys:
+            if fk.column is m.Account.__table__.c.id:
+                found.append((table, fk.parent))
+    return found
+
+
+class WithdrawalWorker:
+    """
+    Background purge of withdrawn accounts.
+
+    `withdraw` only marks the account as deleted and records a `Withdrawal`. This worker then deletes
+    the rows referring to the account in chunks of `chunk_size`, and the storage files under `m.storage_prefix()`
+    in batches of `storage_batch`, and finally the account row. The Firebase user is deleted by the outbox worker.
+    Each chunk is committed together with the progress, so that an interrupted purge resumes where it stopped.
+
+    Withdrawals are claimed with a lease of `lease` seconds, so several processes can run workers.
+    A withdrawal failing `max_attempts` times is kept as failed and left for an operator.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        storage: Storage,
+        interval: float = 5.0,
+        chunk_size: int = 1000,
+        storage_batch: int = 1000,
+        lease: float = 60.0,
+        max_attempts: int = 10,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.engine = engine
+        self.storage = storage
+        #: Seconds between polls for pending withdrawals. The worker is disabled when 0.
+        self.interval = interval
+        #: Maximum number of rows deleted by a statement.
+        self.chunk_size = chunk_size
+        #: Maximum number of storage files deleted per commit of the progress.
+        self.storage_batch = storage_batch
+        #: Seconds a claimed withdrawal is reserved for this worker without progress.
+        self.lease = lease
+        #: Number of attempts after which a withdrawal is no longer retried.
+        self.max_attempts = max_attempts
+        self.logger = logger or logging.getLogger(__name__)
+        #: Number of completed withdrawals.
+        self.completed = 0
+        #: Number of failed attempts.
+        self.failures = 0
+        #: Number of withdrawals given up after `max_attempts`.
+        self.dead = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts polling on the running event loop unless already started or disabled.
+        """
+        if self.enabled and not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def notify(self) -> None:
+        """
+        Wakes the worker up to process a withdrawal committed just now.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """
+        Stops the worker. A withdrawal being processed is resumed later from its last committed chunk.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def stats(self) -> dict[str, Any]:
+        """
+        Counts withdrawals by stage and failed ones along with the counters of this worker.
+        """
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(select(m.Withdrawal.stage, func.count()).group_by(m.Withdrawal.stage))
+            stages = {stage.value: count for stage, count in rows}
+            failed = await conn.scalar(select(func.count()).where(m.Withdrawal.failed_at.is_not(None)))
+        return {
+            'stages': stages,
+            'failed': failed,
+            'running': self.running,
+            'completed': self.completed,
+            'failures': self.failures,
+            'dead': self.dead,
+        }
+
+    async def process_pending(self) -> int:
+        """
+        Processes withdrawals until none is left to claim.
+
+        Returns:
+            int: The number of completed withdrawals.
+        """
+        completed = 0
+        while (withdrawal := await self._claim()) is not None:
+            try:
+                await self.process(withdrawal)
+                completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.logger.warning(f"Failed to purge account {withdrawal.account_id}.", exc_info=e)
+                await self._fail(withdrawal, e)
+        return completed
+
+    async def process(self, withdrawal: m.Withdrawal) -> None:
+        """
+        Runs the remaining stages of a claimed withdrawal.
+
+        Args:
+            withdrawal (m.Withdrawal): The withdrawal.
+        """
+        if withdrawal.stage is m.WithdrawalStage.ROWS:
+            for table, column in dependents():
+                await self._purge_rows(withdrawal, table, column)
+            await self._progress(withdrawal, stage=m.WithdrawalStage.STORAGE)
+
+        if withdrawal.stage is m.WithdrawalStage.STORAGE:
+            await self._purge_storage(withdrawal)
+            async with self.engine.begin() as conn:
+                await conn.execute(delete(m.Account).where(m.Account.id == withdrawal.account_id))
+                await self._progress(withdrawal, conn, stage=m.WithdrawalStage.DONE, completed_at=datetime.now())
+
+        self.completed += 1
+        self.logger.info(
+            f"Purged account {withdrawal.account_id}: "
+            f"rows={withdrawal.rows_deleted} objects={withdrawal.objects_deleted} attempts={withdrawal.attempts}"
+        )
+
+    async def _purge_rows(self, withdrawal: m.Withdrawal, table: Table, column: Column) -> None:
+        keys = list(table.primary_key.columns)
+        while True:
+            async with self.engine.begin() as conn:
+                if len(keys) == 1:
+                    chunk = select(keys[0]).where(column == withdrawal.account_id).limit(self.chunk_size)
+                    result = await conn.execute(delete(table).where(keys[0].in_(chunk.scalar_subquery())))
+                else:
+                    # Tables without a single-column key are deleted at once.
+                    result = await conn.execute(delete(table).where(column == withdrawal.account_id))
+                await self._progress(withdrawal, conn, rows_deleted=withdrawal.rows_deleted + result.rowcount)
+            if len(keys) != 1 or result.rowcount < self.chunk_size:
+                return
+
+    async def _purge_storage(self, withdrawal: m.Withdrawal) -> None:
+        prefix = m.storage_prefix(withdrawal.account_id)
+        while True:
+            # Listing again after each batch keeps memory bounded and skips files deleted before an interruption.
+            paths = await asyncio.to_thread(lambda: list(islice(self.storage.paths(prefix), self.storage_batch)))
+            if not paths:
+                return
+            errors = await self.storage.adelete_many(paths)
+            await self._progress(withdrawal, objects_deleted=withdrawal.objects_deleted + len(paths) - len(errors))
+            if errors:
+                path, error = next(iter(errors.items()))
+                raise IOError(f"Failed to delete {len(errors)} files such as {path}: {error}")
+
+    async def _claim(self) -> Optional[m.Withdrawal]:
+        now = datetime.now()
+        candidate = select(m.Withdrawal.account_id) \
+            .where(m.Withdrawal.stage != m.WithdrawalStage.DONE) \
+            .where(m.Withdrawal.failed_at.is_(None)) \
+            .where((m.Withdrawal.locked_until.is_(None)) | (m.Withdrawal.locked_until < now)) \
+            .order_by(m.Withdrawal.requested_at) \
+            .limit(1) \
+            .with_for_update(skip_locked=True)
+
+        async with self.engine.begin() as conn:
+            account_id = await conn.scalar(candidate)
+            if account_id is None:
+                return None
+            table = m.Withdrawal.__table__
+            row = (await conn.execute(
+                update(table)
+                .where(table.c.account_id == account_id)
+                .values(locked_until=now + timedelta(seconds=self.lease), attempts=table.c.attempts + 1)
+                .returning(*table.c)
+            )).one()
+        return m.Withdrawal(**row._asdict())
+
+    async def _progress(self, withdrawal: m.Withdrawal, conn: Any = None, **values: Any) -> None:
+        """
+        Records progress of the withdrawal and extends its lease, in the transaction of `conn` if given.
+        """
+        now = datetime.now()
+        values.update(updated_at=now, locked_until=now + timedelta(seconds=self.lease))
+        statement = update(m.Withdrawal).where(m.Withdrawal.account_id == withdrawal.account_id).values(**values)
+        if conn is None:
+            async with self.engine.begin() as conn:
+                await conn.execute(statement)
+        else:
+            await conn.execute(statement)
+        for k, v in values.items():
+            setattr(withdrawal, k, v)
+
+    async def _fail(self, withdrawal: m.Withdrawal, error: Exception) -> None:
+        values: dict[str, Any] = dict(error=str(error)[:1000])
+        if withdrawal.attempts >= self.max_attempts:
+            self.dead += 1
+            values.update(failed_at=datetime.now())
+            self.logger.error(f"Gave up purging account {withdrawal.account_id} after {withdrawal.attempts} attempts.")
+        try:
+            # Releases the lease after the retry interval rather than at once.
+            await self._progress(withdrawal, **values)
+        except Exception as e:
+            self.logger.warning(f"Failed to record the failure of withdrawal {withdrawal.account_id}.", exc_info=e)
+
+    async def _run(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            try:
+                await self.process_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Failed to process withdrawals.", exc_info=e)
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+import logging
+from typing import Optional
+from sqlalchemy import DateTime, String, bindparam, column, update, values
+from sqlalchemy.ext.asyncio import AsyncEngine
+import smartparking.model.db as m
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer of `account.last_login`.
+
+    Timestamps are recorded in memory and written in a single bulk `UPDATE ... FROM (VALUES ...)`
+    every `interval` seconds, when `threshold` accounts are pending, and on `stop()`.
+    Databases other than PostgreSQL, such as SQLite, are written by an executemany of single-row updates.
+    """
+
+    #: Maximum number of rows in a single UPDATE statement.
+    chunk_size = 5000
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval: float = 5.0,
+        threshold: int = 1000,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.engine = engine
+        #: Seconds between flushes. Buffering is disabled when 0.
+        self.interval = interval
+        #: Number of pending accounts which triggers a flush before the interval elapses.
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger(__name__)
+        self._pending: dict[str, datetime] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, login_id: str, at: datetime) -> None:
+        """
+        Records the login time of an account to be written later.
+
+        Args:
+            login_id (str): The login ID.
+            at (datetime): The login time.
+        """
+        current = self._pending.get(login_id)
+        if current is None or current < at:
+            self._pending[login_id] = at
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if len(self._pending) >= self.threshold and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Writes the pending timestamps.
+
+        Timestamps are put back into the buffer if writing fails, unless a newer one was recorded meanwhile.
+
+        Returns:
+            int: The number of written accounts.
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        rows = list(pending.items())
+        try:
+            async with self.engine.begin() as conn:
+                if conn.dialect.name == 'postgresql':
+                    for i in range(0, len(rows), self.chunk_size):
+                        await conn.execute(self._statement(rows[i:i + self.chunk_size]))
+                else:
+                    await conn.execute(self._portable_statement, [
+                        dict(b_login_id=login_id, b_last_login=at) for login_id, at in rows
+                    ])
+        except:
+            for login_id, at in rows:
+                current = self._pending.get(login_id)
+                if current is None or current < at:
+                    self._pending[login_id] = at
+            raise
+
+        self.logger.debug(f"Flushed last_login of {len(rows)} accounts.")
+        return len(rows)
+
+    async def stop(self) -> None:
+        """
+        Stops the background flush and writes the remaining timestamps.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    @staticmethod
+    def _statement(rows: list[tuple[str, datetime]]):
+        v = values(
+            column('login_id', String),
+            column('last_login', DateTime),
+            name='v',
+        ).data(rows)
+
+        return update(m.Account) \
+            .where(m.Account.login_id == v.c.login_id) \
+            .values(last_login=v.c.last_login)
+
+    #: Update of a single account executed for each pending timestamp.
+    _portable_statement = update(m.Account.__table__) \
+        .where(m.Account.__table__.c.login_id == bindparam('b_login_id')) \
+        .values(last_login=bindparam('b_last_login'))
+
+    async def _run(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Failed to flush last_login.", exc_info=e)
@@ -0,0 +1,162 @@
+"""
+Fixtures running the application on a SQLite database created from the models, with a local storage
+and ID tokens minted by a local issuer, so that tests need neither PostgreSQL nor Firebase.
+"""
+from datetime import datetime
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import insert
+from smartparking.bootstrap import create_resources
+from smartparking.config import ApplicationSettings, environment
+from smartparking.ext.firebase.local import LocalIssuer
+from smartparking.model.schema import create_schema
+import smartparking.model.db as m
+from smartparking.resources import ContextualResources, Resources
+
+PROJECT_ID = 'smartparking-test'
+
+#: Directory containing `config/`, which the application reads relative to the working directory.
+API_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='session')
+def issuer() -> LocalIssuer:
+    """
+    Issuer of ID tokens accepted by the application.
+    """
+    return LocalIssuer(PROJECT_ID)
+
+
+@pytest.fixture
+def dsn(tmp_path: Path) -> str:
+    return f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def settings(tmp_path: Path, dsn: str) -> ApplicationSettings:
+    """
+    Settings of a SQLite database and a local storage in the temporary directory of the test.
+
+    Background workers are disabled, so that tests run them explicitly.
+    """
+    return ApplicationSettings(
+        name='test',
+        version='0',
+        db=ApplicationSettings.DB(dsn=dsn, last_login_interval=0),
+        withdrawal=ApplicationSettings.Withdrawal(interval=0),
+        outbox=ApplicationSettings.Outbox(interval=0),
+        docs=ApplicationSettings.DocumentAuth(enabled=False, username='', password='', url_prefix=''),
+        storage={'url': f"file://{tmp_path / 'storage'}"},
+        firebase={'kind': 'auth', 'project_id': PROJECT_ID},
+    )
+
+
+@pytest_asyncio.fixture
+async def resources(settings: ApplicationSettings, issuer: LocalIssuer) -> AsyncIterator[Resources]:
+    """
+    Resources on an empty schema, trusting the keys of `issuer`.
+    """
+    resources = create_resources(settings, logging.getLogger('test'))
+    await create_schema(resources.db)
+    resources.auth.store.update(issuer.document(), 3600)
+    try:
+        yield resources
+    finally:
+        await resources.close(timeout=0)
+
+
+@pytest.fixture
+def add_accounts(resources: Resources) -> Callable[..., Awaitable[list[str]]]:
+    """
+    Function inserting `count` accounts whose IDs and login IDs are `{prefix}-{n}`, returning the IDs.
+    """
+    async def add_accounts(count: int, prefix: str = 'user') -> list[str]:
+        now = datetime.now()
+        rows = [
+            dict(id=f"{prefix}-{i}", login_id=f"{prefix}-{i}", name=f"User {i}", email=f"{prefix}-{i}@example.com",
+                 created_at=now, modified_at=now, last_login=now)
+            for i in range(count)
+        ]
+        async with resources.db.begin() as conn:
+            await conn.execute(insert(m.Account), rows)
+        return [row['id'] for row in rows]
+    return add_accounts
+
+
+@pytest.fixture
+def session(resources: Resources) -> ContextualResources:
+    """
+    Context manager entering a resource session in which services are called:
+
+        async with session:
+            await signup(...)
+    """
+    return ContextualResources.of(resources)
+
+
+@pytest.fixture
+def environ(monkeypatch: pytest.MonkeyPatch, settings: ApplicationSettings) -> Iterator[None]:
+    """
+    Configures `environment()` with the settings of the test through environment variables.
+    """
+    monkeypatch.chdir(API_ROOT)
+    for key, value in {
+        'NAME': settings.name,
+        'VERSION': settings.version,
+        'DB__DSN': settings.db.dsn,
+        'DB__LAST_LOGIN_INTERVAL': '0',
+        'WITHDRAWAL__INTERVAL': '0',
+        'OUTBOX__INTERVAL': '0',
+        'DOCS__ENABLED': 'false',
+        'DOCS__USERNAME': '',
+        'DOCS__PASSWORD': '',
+        'DOCS__URL_PREFIX': '',
+        'STATS__ENABLED': 'true',
+        'STORAGE__URL': settings.storage.url,
+        'FIREBASE__KIND': 'auth',
+        'FIREBASE__PROJECT_ID': PROJECT_ID,
+    }.items():
+        monkeypatch.setenv(key, value)
+    environment.cache_clear()
+    yield
+    environment.cache_clear()
+
+
+@pytest_asyncio.fixture
+async def app(environ: None, issuer: LocalIssuer) -> AsyncIterator[FastAPI]:
+    """
+    The application created by `create_app()` on an empty schema.
+
+    The lifespan is not run, so the Firebase keys are not fetched in the background.
+    """
+    from smartparking.main import create_app
+
+    app = create_app()
+    resources: Resources = app.state.resources
+    await create_schema(resources.db)
+    resources.auth.store.update(issuer.document(), 3600)
+    try:
+        yield app
+    finally:
+        await resources.close(timeout=0)
+
+
+@pytest_asyncio.fixture
+async def client(app: FastAPI) -> AsyncIterator[httpx.AsyncClient]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+@pytest.fixture
+def bearer(issuer: LocalIssuer) -> Callable[..., dict[str, str]]:
+    """
+    Function returning the Authorization header of a token of the `sub` with the given claims.
+    """
+    def bearer(sub: str, **claims: Any) -> dict[str, str]:
+        return {'Authorization': f"Bearer {issuer.mint(sub, **claims)}"}
+    return bearer
@@ -0,0 +1,114 @@
+from datetime import datetime
+from smartparking.api.shared.auth import ClaimsCache, IdentityCache, claims_cache
+import smartparking.model.composite as c
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_claims_expire_at_exp():
+    clock = Clock()
+    cache = ClaimsCache(clock=clock)
+    cache.put('token', {'sub': 'user', 'exp': 1010})
+
+    assert cache.get('token') == {'sub': 'user', 'exp': 1010}
+    clock.now = 1010
+    assert cache.get('token') is None
+    assert cache.stats() == {'size': 0, 'maxsize': 4096, 'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+
+def test_claims_without_valid_exp_are_not_cached():
+    cache = ClaimsCache(clock=Clock())
+    cache.put('expired', {'exp': 1000})
+    cache.put('missing', {'sub': 'user'})
+    cache.put('malformed', {'exp': '2000'})
+
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_claims_are_evicted():
+    cache = ClaimsCache(maxsize=2, clock=Clock())
+    cache.put('a', {'exp': 2000})
+    cache.put('b', {'exp': 2000})
+    cache.get('a')
+    cache.put('c', {'exp': 2000})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_disabled_when_maxsize_is_zero():
+    cache = ClaimsCache(maxsize=0, clock=Clock())
+    cache.put('token', {'exp': 2000})
+
+    assert cache.get('token') is None
+
+
+def test_cached_claims_are_copies():
+    cache = ClaimsCache(clock=Clock())
+    claims = {'sub': 'user', 'exp': 2000}
+    cache.put('token', claims)
+    claims['sub'] = 'changed'
+    cache.get('token')['sub'] = 'changed'
+
+    assert cache.get('token')['sub'] == 'user'
+
+
+async def test_requests_reuse_verified_claims(client, bearer):
+    claims_cache.clear()
+    headers = bearer('user-1', name='User', email='user@example.com')
+    hits = claims_cache.hits
+
+    assert (await client.post('/me', headers=headers)).status_code == 201
+    assert (await client.get('/me', headers=headers)).status_code == 200
+    assert claims_cache.hits == hits + 1
+
+    stats = (await client.get('/stats/auth')).json()
+    assert stats['claims']['hits'] == claims_cache.hits
+    assert stats['identities']['maxsize'] > 0
+
+
+def snapshot(login_id: str, name: str = "User") -> c.MeSnapshot:
+    now = datetime(2030, 1, 1)
+    return c.MeSnapshot(id=login_id, login_id=login_id, name=name, email='', created_at=now, modified_at=now, last_login=now)
+
+
+def test_identities_expire_after_ttl():
+    clock = Clock()
+    cache = IdentityCache(ttl=10, clock=clock)
+    me = cache.put(snapshot('user-1'))
+
+    clock.now += 9
+    assert cache.get('user-1') is me
+    clock.now += 1
+    assert cache.get('user-1') is None
+
+
+def test_identity_loaded_before_invalidation_is_not_stored():
+    cache = IdentityCache(clock=Clock())
+    since = cache.version
+    cache.invalidate('user-1')
+    cache.put(snapshot('user-1', "Stale"), since)
+    assert cache.get('user-1') is None
+
+    cache.put(snapshot('user-1', "Fresh"), cache.version)
+    assert cache.get('user-1').name == "Fresh"
+    cache.invalidate('user-1')
+    assert cache.get('user-1') is None
+
+
+async def test_withdrawn_identity_is_invalidated(app, client, bearer):
+    identities = app.state.resources.identities
+    headers = bearer('user-1', name='User', email='user@example.com')
+    assert (await client.post('/me', headers=headers)).status_code == 201
+    assert (await client.get('/me', headers=headers)).status_code == 200
+    assert identities.get('user-1') is not None
+
+    assert (await client.delete('/me', headers=headers)).status_code == 204
+    assert identities.get('user-1') is None
+    assert (await client.get('/me', headers=headers)).status_code == 401
@@ -0,0 +1,157 @@
+import asyncio
+import httpx
+import pytest
+from smartparking.ext.firebase.base import AsyncKeyProvider, FirebaseAuth, FirebaseAuthSettings, KeyStore, max_age
+from smartparking.ext.firebase.local import LocalIssuer
+
+PROJECT_ID = 'smartparking-test'
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('public, max-age=19766, must-revalidate, no-transform', 19766.0),
+    ('max-age = 60', 60.0),
+    ('no-cache', 0.0),
+    (None, 0.0),
+])
+def test_max_age(header, expected):
+    assert max_age(header) == expected
+
+
+def test_keys_are_looked_up_by_kid():
+    issuer = LocalIssuer(PROJECT_ID, keys=2)
+    store = KeyStore(clock=Clock())
+    store.update(issuer.document(), 3600)
+
+    for kid, key in issuer.keys.items():
+        assert store.get(kid).public_numbers() == key.public_key().public_numbers()
+    assert store.get('unknown') is None
+
+
+def test_unchanged_pems_are_not_parsed_again():
+    issuer = LocalIssuer(PROJECT_ID)
+    store = KeyStore(clock=Clock())
+    store.update(issuer.document(), 3600)
+    old = issuer.kid
+    key = store.get(old)
+
+    new = issuer.rotate()
+    store.update(issuer.document(), 3600)
+
+    assert store.get(old) is key
+    assert store.get(new) is not None
+
+    issuer.rotate(retain=False)
+    store.update(issuer.document(), 3600)
+    assert store.get(old) is None and store.get(new) is None
+
+
+def test_keys_expire_after_max_age():
+    clock = Clock()
+    store = KeyStore(clock=clock)
+    assert store.expired and store.age() == float('inf')
+
+    store.update({}, 60)
+    clock.now += 59
+    assert not store.expired and store.age() == 59
+    clock.now += 1
+    assert store.expired
+
+
+def test_verify_refetches_rotated_keys(monkeypatch):
+    issuer = LocalIssuer(PROJECT_ID)
+    clock = Clock()
+    auth = FirebaseAuth(FirebaseAuthSettings(kind='auth', project_id=PROJECT_ID))
+    auth.store = KeyStore(clock=clock)
+    fetches = []
+
+    def keys():
+        fetches.append(clock.now)
+        return issuer.document(), 3600
+    monkeypatch.setattr(auth, 'keys', keys)
+
+    assert auth.verify(issuer.mint('user-1'))['sub'] == 'user-1'
+    assert auth.verify(issuer.mint('user-1'))['sub'] == 'user-1'
+    assert len(fetches) == 1
+
+    # An unknown kid is refetched at most once per refetch interval.
+    issuer.rotate()
+    clock.now += 1
+    with pytest.raises(ValueError):
+        auth.verify(issuer.mint('user-1'))
+    clock.now += auth.refetch_interval
+    assert auth.verify(issuer.mint('user-1'))['sub'] == 'user-1'
+    assert len(fetches) == 2
+
+    # The keys are refetched once their max-age has passed.
+    clock.now += 3600
+    auth.verify(issuer.mint('user-1'))
+    assert len(fetches) == 3
+
+
+class Switch(httpx.AsyncBaseTransport):
+    """
+    Transport to the issuer which fails with 503 while `down`.
+    """
+    def __init__(self, issuer: LocalIssuer) -> None:
+        self.issuer = httpx.ASGITransport(app=issuer)
+        self.down = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            return httpx.Response(503)
+        return await self.issuer.handle_async_request(request)
+
+
+async def test_expired_keys_are_served_for_the_grace_only():
+    issuer = LocalIssuer(PROJECT_ID, max_age=3600)
+    clock = Clock()
+    transport = Switch(issuer)
+    provider = AsyncKeyProvider(KeyStore(clock=clock), 'http://certs/', grace=300, transport=transport)
+    try:
+        assert await provider.get(issuer.kid) is not None
+        transport.down = True
+
+        clock.now += 3600 + 299
+        assert await provider.get(issuer.kid) is not None
+
+        clock.now += 1
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.get(issuer.kid)
+
+        transport.down = False
+        assert await provider.get(issuer.kid) is not None
+        assert issuer.requests == 2
+    finally:
+        await provider.stop()
+
+
+async def test_background_refresh_follows_the_clock_of_the_store():
+    issuer = LocalIssuer(PROJECT_ID, max_age=3600)
+    clock = Clock()
+    store = KeyStore(clock=clock)
+    store.update(issuer.document(), 3600)
+    provider = AsyncKeyProvider(store, 'http://certs/', margin=60, retry=0.01, transport=httpx.ASGITransport(app=issuer))
+    try:
+        provider.start()
+        await asyncio.sleep(0.05)
+        assert issuer.requests == 0
+
+        # Within the margin before expiry by the clock of the store, the keys are refreshed at once.
+        clock.now += 3600 - 60
+        await provider.stop()
+        provider.start()
+        for _ in range(100):
+            if issuer.requests:
+                break
+            await asyncio.sleep(0.01)
+        assert issuer.requests >= 1 and store.remaining() == 3600
+    finally:
+        await provider.stop()
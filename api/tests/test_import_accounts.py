@@ -0,0 +1,55 @@
+from contextlib import asynccontextmanager
+import pytest
+from smartparking.command import import_accounts
+from smartparking.command.import_accounts import AccountImporter
+
+
+class FakeConnection:
+    """
+    asyncpg connection recording copied rows and answering the merge with fixed counters.
+    """
+    def __init__(self, counters):
+        self.counters = counters
+        self.copied = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query):
+        pass
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copied.append(list(records))
+
+    async def fetchrow(self, query):
+        return self.counters
+
+
+async def test_conflicts_are_counted():
+    connection = FakeConnection((1, 0, 2))
+    importer = AccountImporter(connection, batch_size=3)
+
+    report = await importer.run([{'login_id': f"user-{i}", 'id': 'same'} for i in range(3)] + [{'name': "no login"}])
+
+    assert [len(rows) for rows in connection.copied] == [3]
+    assert (report.read, report.inserted, report.conflicted, report.rejected) == (4, 1, 2, 1)
+    assert "conflicted=2" in str(report)
+
+
+def test_merge_statement_skips_taken_ids():
+    statement = AccountImporter(None).merge_statement
+
+    assert "a.id = l.id AND a.login_id <> l.login_id" in statement
+    assert "o.id = l.id AND o.login_id <> l.login_id" in statement
+
+
+def test_dsn_does_not_load_environment(monkeypatch, tmp_path):
+    def environment():
+        raise AssertionError("The environment must not be loaded.")
+    monkeypatch.setattr(import_accounts, 'environment', environment)
+    source = tmp_path / "accounts.csv"
+    source.write_text("login_id\nuser-0\n")
+
+    with pytest.raises(ValueError, match="asyncpg"):
+        import_accounts.main([str(source), '--dsn', f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"])
@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Mapping
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from smartparking.loader import Loader
+from smartparking.resources import context as r
+import smartparking.model.db as m
+import smartparking.service.account as account
+import smartparking.service.statements as st
+
+
+class Tracker:
+    """
+    Wraps batch functions to record their calls and how many of them run at once.
+    """
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+        self.calls: list[list[Any]] = []
+
+    def wrap(self, batch):
+        async def tracked(session: AsyncSession, keys: list[Any]) -> Mapping[Any, Any]:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.calls.append(keys)
+            try:
+                # Yield so that another call could start meanwhile if it was allowed to.
+                await asyncio.sleep(0.01)
+                return await batch(session, keys)
+            finally:
+                self.running -= 1
+        return tracked
+
+
+async def names(session: AsyncSession, ids: list[str]) -> Mapping[str, str]:
+    rows = await session.execute(select(m.Account.id, m.Account.name).where(m.Account.id.in_(ids)))
+    return dict(rows.tuples().all())
+
+
+async def test_find_all_beyond_max_batch(session, add_accounts):
+    ids = await add_accounts(2500)
+
+    async with session:
+        accounts = (await account.find_all([*ids, 'missing'])).get()
+        loader = r.loader(st.accounts_by_id)
+
+    assert [a.id for a in accounts[:-1]] == ids
+    assert accounts[-1] is None
+    assert loader.calls == 3
+
+
+async def test_chunks_and_loaders_run_one_at_a_time(session, add_accounts):
+    ids = await add_accounts(2100)
+    tracker = Tracker()
+    by_id = tracker.wrap(st.accounts_by_id)
+    by_name = tracker.wrap(names)
+
+    async with session:
+        accounts, named = await asyncio.gather(
+            r.loader(by_id).load_many(ids),
+            r.loader(by_name).load_many(ids[:10]),
+        )
+
+    assert [a.id for a in accounts] == ids
+    assert named == [f"User {i}" for i in range(10)]
+    assert sorted(len(keys) for keys in tracker.calls) == [10, 100, 1000, 1000]
+    assert tracker.max_running == 1
+
+
+async def test_keys_of_the_same_tick_share_a_call_and_are_memoised():
+    calls = []
+
+    async def batch(keys):
+        calls.append(keys)
+        return {k: k * 2 for k in keys if k != 3}
+
+    loader = Loader(batch)
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3)) == [2, 4, 2, None]
+    assert await loader.load(2) == 4
+    assert calls == [[1, 2, 3]]
+
+
+async def test_failed_keys_are_retried():
+    attempts = []
+
+    async def batch(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("unavailable")
+        return {k: str(k) for k in keys}
+
+    loader = Loader(batch)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    assert await loader.load(1) == '1'
+    assert attempts == [[1], [1]]
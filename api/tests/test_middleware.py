@@ -0,0 +1,51 @@
+from datetime import datetime
+import httpx
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+import smartparking.model.db as m
+from smartparking.resources import ResourceSessionMiddleware, context as r
+
+
+async def signup(request: Request) -> PlainTextResponse:
+    now = datetime.now()
+    await r.tx.execute(insert(m.Account).values(
+        id='user', login_id='user', name="User", email='user@example.com',
+        created_at=now, modified_at=now, last_login=now,
+    ))
+    return PlainTextResponse("created", status_code=201)
+
+
+@pytest.fixture
+def client(resources):
+    app = Starlette(routes=[Route('/', signup, methods=['POST'])])
+    app.add_middleware(ResourceSessionMiddleware, resources=resources)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url='http://test')
+
+
+async def count(resources) -> int:
+    async with resources.db.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(m.Account))).scalar_one()
+
+
+async def test_commits_before_response(resources, client):
+    async with client:
+        response = await client.post('/')
+    assert response.status_code == 201
+    assert await count(resources) == 1
+
+
+async def test_failed_commit_is_not_reported_as_success(resources, client, monkeypatch):
+    async def commit(self):
+        raise ConnectionError("database is down")
+    monkeypatch.setattr(AsyncSession, 'commit', commit)
+
+    async with client:
+        response = await client.post('/')
+    assert response.status_code == 500
+    assert await count(resources) == 0
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, update
+import smartparking.model.db as m
+from smartparking.resources import Resources, context as r
+import smartparking.service.outbox as outbox
+from smartparking.service.outbox import OutboxWorker
+
+
+async def messages(resources: Resources) -> list[m.OutboxMessage]:
+    async with resources.db.connect() as conn:
+        return list(await conn.execute(select(m.OutboxMessage).order_by(m.OutboxMessage.id)))
+
+
+async def make_available(resources: Resources) -> None:
+    """
+    Ends the backoff of messages as if the retry delay passed.
+    """
+    async with resources.db.begin() as conn:
+        await conn.execute(update(m.OutboxMessage).values(available_at=datetime.now() - timedelta(seconds=1)))
+
+
+def test_backoff_doubles_up_to_the_maximum(monkeypatch):
+    monkeypatch.setattr(outbox.random, 'uniform', lambda low, high: high)
+    worker = OutboxWorker(None, {}, backoff=1.0, max_backoff=10.0)
+
+    assert [worker.delay(attempts) for attempts in range(1, 7)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+
+
+def test_backoff_is_jittered():
+    worker = OutboxWorker(None, {}, backoff=4.0)
+
+    assert all(2.0 <= worker.delay(1) <= 4.0 for _ in range(100))
+
+
+async def test_messages_are_published_on_commit_only(resources, session):
+    async with session:
+        await r.publish('test', dict(n=1))
+    with pytest.raises(RuntimeError):
+        async with session:
+            await r.publish('test', dict(n=2))
+            raise RuntimeError()
+
+    assert [message.payload for message in await messages(resources)] == [dict(n=1)]
+
+
+async def test_callbacks_follow_each_transaction(resources, session):
+    called = []
+    async with session:
+        await r.publish('test', dict(n=1))
+        r.on_commit(lambda: called.append(1))
+        await r.db.commit()
+        assert called == [1]
+
+        await r.publish('test', dict(n=2))
+        r.on_commit(lambda: called.append(2))
+        await r.db.rollback()
+
+        await r.publish('test', dict(n=3))
+        r.on_commit(lambda: called.append(3))
+
+    assert called == [1, 3]
+    assert [message.payload for message in await messages(resources)] == [dict(n=1), dict(n=3)]
+
+
+async def test_executed_messages_are_deleted(resources, session):
+    executed = []
+
+    async def handler(payload):
+        executed.append(payload)
+    worker = resources.outbox
+    worker.handlers = {'test': handler}
+    async with session:
+        await r.publish('test', dict(n=1))
+        await r.publish('test', dict(n=2))
+
+    assert await worker.process_pending() == 2
+    assert executed == [dict(n=1), dict(n=2)]
+    assert await messages(resources) == []
+
+
+async def test_executions_are_bounded_by_concurrency(resources, session):
+    running = []
+    peak = 0
+
+    async def handler(payload):
+        nonlocal peak
+        running.append(payload)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(payload)
+    worker = resources.outbox
+    worker.handlers = {'test': handler}
+    worker.concurrency = 2
+    async with session:
+        for n in range(6):
+            await r.publish('test', dict(n=n))
+
+    assert await worker.process_pending() == 6
+    assert peak == 2
+
+
+async def test_failed_message_is_retried_until_max_attempts(resources, session):
+    attempts = []
+
+    async def handler(payload):
+        attempts.append(datetime.now())
+        raise IOError("unavailable")
+    worker = resources.outbox
+    worker.handlers = {'test': handler}
+    worker.max_attempts = 3
+    worker.backoff = 60.0
+    async with session:
+        await r.publish('test', dict(n=1))
+
+    assert await worker.process_pending() == 0
+    [message] = await messages(resources)
+    assert (message.attempts, message.error, message.failed_at, message.locked_until) == (1, "unavailable", None, None)
+    # Released after the backoff rather than at once.
+    assert message.available_at >= attempts[0] + timedelta(seconds=30)
+    assert await worker.process_pending() == 0 and len(attempts) == 1
+
+    for _ in range(3):
+        await make_available(resources)
+        await worker.process_pending()
+
+    [message] = await messages(resources)
+    assert len(attempts) == 3
+    assert message.attempts == 3 and message.failed_at is not None
+
+    stats = await worker.stats()
+    assert (stats['depth'], stats['failed'], stats['failures'], stats['dead']) == ({}, 1, 3, 1)
+
+
+async def test_message_without_handler_fails(resources, session):
+    async with session:
+        await r.publish('unknown', {})
+
+    assert await resources.outbox.process_pending() == 0
+    [message] = await messages(resources)
+    assert message.error == "No handler for topic unknown."
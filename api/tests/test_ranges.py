@@ -0,0 +1,52 @@
+import pytest
+from smartparking.api.shared.ranges import ByteRange, RangeNotSatisfiable, parse_range
+from smartparking.model.db import storage_prefix
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('bytes=0-9', ByteRange(0, 10)),
+    ('bytes=90-', ByteRange(90, 100)),
+    ('bytes=90-200', ByteRange(90, 100)),
+    ('bytes=-10', ByteRange(90, 100)),
+    ('bytes=-200', ByteRange(0, 100)),
+    ('bytes=0-0', ByteRange(0, 1)),
+    ('BYTES = 5-6', ByteRange(5, 7)),
+    # Served whole.
+    ('bytes=0-1,5-6', None),
+    ('items=0-1', None),
+    ('bytes=a-b', None),
+    ('bytes=10', None),
+    ('bytes=10-5', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize('header', ['bytes=100-', 'bytes=150-200', 'bytes=-0'])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiable) as e:
+        parse_range(header, 100)
+    assert e.value.content_range == "bytes */100"
+
+
+async def test_download_ranges(app, client, bearer):
+    headers = bearer('user-1', name='User', email='user@example.com')
+    me = (await client.post('/me', headers=headers)).json()
+    data = bytes(range(256)) * 4
+    app.state.resources.storage.write(storage_prefix(me['id']) + 'docs/data.bin', data)
+
+    whole = await client.get('/files/docs/data.bin', headers=headers)
+    assert whole.status_code == 200 and whole.content == data
+    assert whole.headers['accept-ranges'] == 'bytes'
+
+    partial = await client.get('/files/docs/data.bin', headers={**headers, 'Range': 'bytes=1000-'})
+    assert partial.status_code == 206 and partial.content == data[1000:]
+    assert partial.headers['content-range'] == "bytes 1000-1023/1024"
+    assert partial.headers['content-length'] == '24'
+
+    beyond = await client.get('/files/docs/data.bin', headers={**headers, 'Range': 'bytes=1024-'})
+    assert beyond.status_code == 416
+    assert beyond.headers['content-range'] == "bytes */1024"
+
+    assert (await client.get('/files/docs/missing.bin', headers=headers)).status_code == 404
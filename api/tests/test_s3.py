@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import pytest
+from smartparking.ext.storage.base import Storage
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from smartparking.ext.storage.s3 import MIN_PART_SIZE  # noqa: E402
+
+BUCKET = 'smartparking-test'
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """
+    S3 storage on a bucket mocked by moto.
+    """
+    for key in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN', 'AWS_PROFILE'):
+        monkeypatch.delenv(key, raising=False)
+    with moto.mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=BUCKET)
+        storage = Storage.of(
+            f"s3://us-east-1/{BUCKET}?access_key=test&secret=test&concurrency=4&part_size={MIN_PART_SIZE}"
+        )
+        yield storage
+        storage.close()
+
+
+def test_failed_multipart_upload_cancels_parts_quietly(s3, caplog):
+    # A single thread keeps parts queued, so that they are cancelled once the first one fails.
+    s3._executor = ThreadPoolExecutor(1)
+    queued = threading.Event()
+
+    def upload_part(PartNumber, **kwargs):
+        # The first part fails once all the parts allowed in flight are queued, and the others wait.
+        queued.wait(5) if PartNumber == 1 else time.sleep(0.5)
+        raise IOError("connection reset")
+    s3.client.upload_part = upload_part
+    aborted = []
+    s3.client.abort_multipart_upload = lambda **kwargs: aborted.append(kwargs['UploadId'])
+
+    def parts():
+        for i in range(6):
+            if i == s3.concurrency:
+                queued.set()
+            yield b'x' * MIN_PART_SIZE
+
+    with caplog.at_level(logging.ERROR, logger='concurrent.futures'):
+        with pytest.raises(IOError, match="connection reset"):
+            s3.write_stream('big.bin', parts())
+
+    assert len(aborted) == 1
+    assert not [record for record in caplog.records if record.name == 'concurrent.futures']
+
+
+def test_delete_many_in_batches(s3):
+    keys = [f"accounts/a/{i}.txt" for i in range(2500)]
+    for key in keys[:10]:
+        s3.write(key, b'data')
+    s3.urlize(keys[0])
+    requests = []
+    delete_objects = s3.client.delete_objects
+
+    def recorded(**kwargs):
+        requests.append(len(kwargs['Delete']['Objects']))
+        return delete_objects(**kwargs)
+    s3.client.delete_objects = recorded
+
+    # Duplicates are deleted once and missing keys count as deleted.
+    assert s3.delete_many(keys + keys[:5]) == {}
+    assert requests == [1000, 1000, 500]
+    assert list(s3.paths("accounts/")) == []
+    # The URL of a deleted object is signed again.
+    s3.urlize(keys[0])
+    assert (s3.urls.hits, s3.urls.misses) == (0, 2)
+
+
+def test_delete_many_reports_failed_batches(s3):
+    from botocore.exceptions import ClientError
+
+    def failing(**kwargs):
+        if kwargs['Delete']['Objects'][0]['Key'] == '1000':
+            raise ClientError({'Error': {'Code': 'SlowDown', 'Message': "Reduce your request rate."}}, 'DeleteObjects')
+        return {'Errors': [{'Key': '0', 'Code': 'AccessDenied', 'Message': "Access Denied"}]}
+    s3.client.delete_objects = failing
+
+    errors = s3.delete_many([str(i) for i in range(1500)])
+
+    assert len(errors) == 501
+    assert errors['0'] == "AccessDenied: Access Denied"
+    assert "SlowDown" in errors['1000'] and "SlowDown" in errors['1499']
+
+
+async def test_adelete_many_runs_in_a_thread(s3):
+    s3.write('a.txt', b'data')
+
+    assert await s3.adelete_many(['a.txt', 'b.txt']) == {}
+    assert not s3.exists('a.txt')
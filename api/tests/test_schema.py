@@ -0,0 +1,49 @@
+from sqlalchemy import inspect
+from smartparking.model.schema import create_schema, drop_schema
+import smartparking.model.db as m
+import smartparking.service.account as account
+
+
+async def test_create_schema_creates_every_table(resources):
+    async with resources.db.connect() as conn:
+        tables = await conn.run_sync(lambda c: set(inspect(c).get_table_names()))
+    assert set(m.Base.metadata.tables) <= tables
+
+
+async def test_create_schema_drop_recreates_empty_tables(resources, session):
+    async with session:
+        assert (await account.signup('user-1', 'User', 'user@example.com')).get()
+
+    await create_schema(resources.db, drop=True)
+
+    async with session:
+        assert not await account.login('user-1')
+
+    await drop_schema(resources.db)
+    async with resources.db.connect() as conn:
+        assert await conn.run_sync(lambda c: inspect(c).get_table_names()) == []
+
+
+async def test_signup_then_login(session):
+    async with session:
+        me = (await account.signup('user-1', 'User', 'user@example.com')).get()
+
+    async with session:
+        again = (await account.signup('user-1', 'Other', 'other@example.com')).get()
+        logged_in = (await account.login('user-1')).get()
+
+    assert again.id == me.id and again.name == 'User'
+    assert logged_in.id == me.id
+
+
+async def test_signed_up_account_is_visible_to_the_next_request(client, bearer):
+    headers = bearer('user-1', name='User', email='user@example.com')
+
+    assert (await client.get('/me', headers=headers)).status_code == 401
+
+    created = await client.post('/me', headers=headers)
+    assert created.status_code == 201
+
+    response = await client.get('/me', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['id'] == created.json()['id']
@@ -0,0 +1,106 @@
+from smartparking.ext.storage.s3 import PresignedUrlCache
+from smartparking.resources import context as r
+import smartparking.service.files as fs
+
+
+class Signer:
+    """
+    Signs numbered URLs, standing for the presigned URLs of S3.
+    """
+    def __init__(self) -> None:
+        self.signed = 0
+
+    def __call__(self) -> str:
+        self.signed += 1
+        return f"https://example.com/{self.signed}"
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_public_write_on_local_storage(session):
+    async with session:
+        assert (await fs.write('docs/a.txt', b'hello', public=True)).get() == 5
+        assert (await fs.read('docs/a.txt')).get() == b'hello'
+
+        async def chunks():
+            yield b'wor'
+            yield b'ld'
+        assert await r.storage.awrite_stream('docs/b.txt', chunks(), public=True) == 5
+        assert (await fs.read('docs/b.txt')).get() == b'world'
+
+
+def test_presigned_urls_are_reused_until_half_of_their_lifetime():
+    clock = Clock()
+    cache = PresignedUrlCache(min_remaining=0.5, clock=clock)
+    sign = Signer()
+
+    url = cache.get('bucket', 'a', 3600, sign)
+    clock.now += 1799
+    assert cache.get('bucket', 'a', 3600, sign) == url
+    clock.now += 1
+    assert cache.get('bucket', 'a', 3600, sign) != url
+    assert (sign.signed, cache.hits, cache.misses) == (2, 1, 2)
+
+
+def test_presigned_urls_depend_on_parameters():
+    cache = PresignedUrlCache(clock=Clock())
+    sign = Signer()
+
+    urls = {
+        cache.get('bucket', 'a', 3600, sign),
+        cache.get('bucket', 'a', 600, sign),
+        cache.get('bucket', 'a', 3600, sign, ResponseContentType='text/plain'),
+        cache.get('bucket', 'b', 3600, sign),
+        cache.get('other', 'a', 3600, sign),
+    }
+    assert len(urls) == sign.signed == 5
+
+
+def test_presigned_urls_are_evicted_when_written():
+    cache = PresignedUrlCache(clock=Clock())
+    sign = Signer()
+
+    url = cache.get('bucket', 'a', 3600, sign)
+    cache.get('bucket', 'b', 3600, sign)
+    cache.evict('bucket', 'a')
+
+    assert cache.get('bucket', 'a', 3600, sign) != url
+    assert cache.get('bucket', 'b', 3600, sign) == "https://example.com/2"
+
+
+def test_url_signed_while_written_is_not_kept():
+    cache = PresignedUrlCache(clock=Clock())
+
+    def sign() -> str:
+        cache.evict('bucket', 'a')
+        return "https://example.com/old"
+    cache.get('bucket', 'a', 3600, sign)
+
+    assert cache.get('bucket', 'a', 3600, Signer()) == "https://example.com/1"
+
+
+def test_least_recently_used_objects_are_evicted():
+    cache = PresignedUrlCache(size=2, clock=Clock())
+    sign = Signer()
+    a = cache.get('bucket', 'a', 3600, sign)
+    cache.get('bucket', 'b', 3600, sign)
+    cache.get('bucket', 'a', 3600, sign)
+    cache.get('bucket', 'c', 3600, sign)
+
+    assert cache.get('bucket', 'a', 3600, sign) == a
+    assert cache.get('bucket', 'b', 3600, sign) == "https://example.com/4"
+
+
+def test_presigned_url_cache_disabled():
+    sign = Signer()
+    cache = PresignedUrlCache(size=0, clock=Clock())
+    cache.get('bucket', 'a', 3600, sign)
+    cache.get('bucket', 'a', 3600, sign)
+
+    assert sign.signed == 2
@@ -0,0 +1,110 @@
+from datetime import datetime
+from sqlalchemy import select, update
+import smartparking.model.db as m
+from smartparking.resources import Resources
+from smartparking.service.outbox import FIREBASE_DELETE_USER
+import smartparking.service.statements as st
+
+
+async def request_withdrawal(resources: Resources, account_id: str) -> None:
+    now = datetime.now()
+    async with resources.db.begin() as conn:
+        await conn.execute(st.withdraw_account, dict(b_id=account_id, b_now=now))
+        await conn.execute(st.insert_withdrawal, dict(b_id=account_id, b_login_id=account_id, b_now=now))
+
+
+async def release(resources: Resources) -> None:
+    """
+    Expires the leases as if the retry interval passed.
+    """
+    async with resources.db.begin() as conn:
+        await conn.execute(update(m.Withdrawal).values(locked_until=None))
+
+
+async def withdrawal(resources: Resources, account_id: str) -> m.Withdrawal:
+    async with resources.db.connect() as conn:
+        return (await conn.execute(select(m.Withdrawal).where(m.Withdrawal.account_id == account_id))).one()
+
+
+async def test_gives_up_after_max_attempts(resources, add_accounts, monkeypatch):
+    [account_id] = await add_accounts(1)
+    await request_withdrawal(resources, account_id)
+    worker = resources.withdrawals
+    worker.max_attempts = 2
+
+    async def broken(withdrawal):
+        raise IOError("storage is down")
+    monkeypatch.setattr(worker, '_purge_storage', broken)
+
+    assert await worker.process_pending() == 0
+    row = await withdrawal(resources, account_id)
+    assert (row.stage, row.attempts, row.error, row.failed_at) == (m.WithdrawalStage.STORAGE, 1, "storage is down", None)
+
+    await release(resources)
+    assert await worker.process_pending() == 0
+    row = await withdrawal(resources, account_id)
+    assert row.attempts == 2 and row.failed_at is not None
+
+    await release(resources)
+    assert await worker.process_pending() == 0
+    assert (await withdrawal(resources, account_id)).attempts == 2
+
+    stats = await worker.stats()
+    assert (stats['failed'], stats['failures'], stats['dead']) == (1, 2, 1)
+
+
+async def test_withdrawn_account_is_purged(app, client, bearer):
+    resources: Resources = app.state.resources
+    headers = bearer('user-1', name='User', email='user@example.com')
+    me = (await client.post('/me', headers=headers)).json()
+    for i in range(5):
+        resources.storage.write(f"{m.storage_prefix(me['id'])}docs/{i}.txt", b'data')
+    resources.storage.write("accounts/other/docs/0.txt", b'data')
+    worker = resources.withdrawals
+    worker.storage_batch = 2
+
+    assert (await client.delete('/me', headers=headers)).status_code == 204
+    assert (await client.get('/me', headers=headers)).status_code == 401
+    async with resources.db.connect() as conn:
+        assert list(await conn.scalars(select(m.OutboxMessage.topic))) == [FIREBASE_DELETE_USER]
+    row = await withdrawal(resources, me['id'])
+    assert (row.stage, row.login_id) == (m.WithdrawalStage.ROWS, 'user-1')
+
+    assert await worker.process_pending() == 1
+    row = await withdrawal(resources, me['id'])
+    assert (row.stage, row.objects_deleted, row.attempts) == (m.WithdrawalStage.DONE, 5, 1)
+    assert row.completed_at is not None
+    assert list(resources.storage.paths("accounts/")) == ["accounts/other/docs/0.txt"]
+    async with resources.db.connect() as conn:
+        assert await conn.scalar(select(m.Account.id).where(m.Account.id == me['id'])) is None
+
+    stats = await worker.stats()
+    assert (stats['stages'], stats['completed'], stats['failed']) == ({'done': 1}, 1, 0)
+
+
+async def test_interrupted_purge_resumes(resources, add_accounts, monkeypatch):
+    [account_id] = await add_accounts(1)
+    for i in range(5):
+        resources.storage.write(f"{m.storage_prefix(account_id)}{i}.txt", b'data')
+    await request_withdrawal(resources, account_id)
+    worker = resources.withdrawals
+    worker.storage_batch = 2
+    delete_many = resources.storage.adelete_many
+    calls = []
+
+    async def interrupted(paths):
+        calls.append(paths)
+        if len(calls) == 2:
+            raise ConnectionError("interrupted")
+        return await delete_many(paths)
+    monkeypatch.setattr(resources.storage, 'adelete_many', interrupted)
+
+    assert await worker.process_pending() == 0
+    row = await withdrawal(resources, account_id)
+    assert (row.stage, row.objects_deleted) == (m.WithdrawalStage.STORAGE, 2)
+
+    await release(resources)
+    assert await worker.process_pending() == 1
+    row = await withdrawal(resources, account_id)
+    assert (row.stage, row.objects_deleted, row.attempts, row.error) == (m.WithdrawalStage.DONE, 5, 2, "interrupted")
+    assert list(resources.storage.paths(m.storage_prefix(account_id))) == []
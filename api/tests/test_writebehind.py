@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+import smartparking.model.db as m
+from smartparking.service.writebehind import LastLoginBuffer
+
+
+class BrokenEngine:
+    """
+    Engine whose transactions fail, calling `meanwhile` first as if a request ran during the write.
+    """
+    def __init__(self, meanwhile=lambda: None) -> None:
+        self.meanwhile = meanwhile
+
+    def begin(self):
+        self.meanwhile()
+        raise ConnectionError("database is down")
+
+
+async def test_flush_writes_latest_login(resources, add_accounts):
+    ids = await add_accounts(2)
+    buffer = LastLoginBuffer(resources.db, interval=3600)
+    at = datetime(2030, 1, 1)
+    buffer.record(ids[0], at)
+    buffer.record(ids[0], at - timedelta(hours=1))
+    buffer.record(ids[1], at + timedelta(hours=1))
+
+    assert buffer.pending == 2
+    assert await buffer.flush() == 2
+    await buffer.stop()
+
+    async with resources.db.connect() as conn:
+        rows = dict((await conn.execute(select(m.Account.id, m.Account.last_login))).tuples().all())
+    assert rows == {ids[0]: at, ids[1]: at + timedelta(hours=1)}
+
+
+async def test_failed_flush_requeues_timestamps():
+    at = datetime(2030, 1, 1)
+    buffer = LastLoginBuffer(BrokenEngine(), interval=3600)
+    buffer.record('a', at)
+    buffer.record('b', at)
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+    assert buffer._pending == {'a': at, 'b': at}
+
+    # Logins recorded during the failed write are newer and are kept.
+    buffer.engine = BrokenEngine(lambda: buffer.record('a', at + timedelta(seconds=1)))
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+    assert buffer._pending == {'a': at + timedelta(seconds=1), 'b': at}
+
+    buffer._pending.clear()
+    await buffer.stop()
@@ -0,0 +1,17 @@
+-- Unique index on account.login_id, required by the INSERT ... ON CONFLICT (login_id)
+-- of the sign-up statement and of the account import command.
+--
+-- The index cannot be built while duplicates exist. List them first:
+--
+--     SELECT login_id, array_agg(id ORDER BY created_at) AS ids
+--     FROM account GROUP BY login_id HAVING count(*) > 1;
+--
+-- and keep one account of each login ID, e.g. the oldest one after moving the data of the others to it:
+--
+--     DELETE FROM account a USING account b
+--     WHERE a.login_id = b.login_id AND (a.created_at, a.id) > (b.created_at, b.id);
+--
+-- CONCURRENTLY keeps the table writable while the index is built; it cannot run in a transaction block.
+-- If it fails, drop the invalid index left behind before running it again.
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_account_login_id ON account (login_id);
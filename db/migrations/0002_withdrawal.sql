@@ -0,0 +1,28 @@
+-- Withdrawal of accounts: the account is marked as deleted at once and purged later by the withdrawal worker,
+-- which records its progress in `withdrawal`.
+--
+-- Adding a nullable column without a default only changes the catalog, so it does not rewrite `account`.
+
+BEGIN;
+
+ALTER TABLE account ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITHOUT TIME ZONE;
+
+CREATE TABLE IF NOT EXISTS withdrawal (
+    account_id VARCHAR NOT NULL,
+    login_id VARCHAR NOT NULL,
+    stage VARCHAR(16) NOT NULL,
+    rows_deleted INTEGER NOT NULL DEFAULT 0,
+    objects_deleted INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error VARCHAR,
+    locked_until TIMESTAMP WITHOUT TIME ZONE,
+    requested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITHOUT TIME ZONE,
+    failed_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (account_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_withdrawal_stage ON withdrawal (stage);
+
+COMMIT;
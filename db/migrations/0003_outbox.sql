@@ -0,0 +1,30 @@
+-- Outbox of side effects recorded in the transaction of the change causing them and executed by the outbox worker.
+--
+-- Withdrawals used to delete the Firebase user in their first stage, which is now done through the outbox.
+-- Withdrawals left in that stage are moved to the next one, with their Firebase deletion published here.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL NOT NULL,
+    topic VARCHAR NOT NULL,
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    locked_until TIMESTAMP WITHOUT TIME ZONE,
+    error VARCHAR,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    failed_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_outbox_topic ON outbox (topic);
+CREATE INDEX IF NOT EXISTS ix_outbox_available_at ON outbox (available_at);
+
+INSERT INTO outbox (topic, payload, available_at, created_at)
+SELECT 'firebase.delete_user', jsonb_build_object('login_id', login_id), localtimestamp, localtimestamp
+FROM withdrawal WHERE stage = 'firebase';
+
+UPDATE withdrawal SET stage = 'rows', updated_at = localtimestamp WHERE stage = 'firebase';
+
+COMMIT;
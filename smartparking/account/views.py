@@ -1,7 +1,11 @@
+import functools
 import hashlib
 import qrcode
 import json
 import requests
+import threading
+import time
+from collections import OrderedDict
 from io import BytesIO
 from datetime import timedelta
 from django.utils import timezone
@@ -67,7 +71,13 @@ def get_s3_resource():
     )
 
 
+#: Maximum number of keys deleted by a DeleteObjects request.
+S3_DELETE_BATCH_SIZE = 1000
+
+
+@functools.lru_cache(maxsize=None)
 def get_s3_client():
+    # Clients are thread-safe, so a single one is shared by all requests along with its connection pool.
     return boto3.client(
         "s3",
         endpoint_url=settings.MINIO_ENDPOINT_PUBLIC if settings.ENVIRONMENT == "dev" else None,
@@ -307,6 +317,7 @@ def profile(request):
                     f"users/{filename}",
                     ExtraArgs={'ContentType': request.headers['Content-Type']}
                 )
+                evict_presigned_urls(settings.BUCKET_NAME, f"users/{filename}")
                 account.picture_key = f"users/{filename}"
 
             if username:
@@ -329,17 +340,38 @@ def profile(request):
     return render(request, 'webapp/accounts/profile.html')
 
 
-def s3_delete(file_key):
-    try:
-        s3 = get_s3_client()
+def s3_delete_many(file_keys):
+    """
+    Deletes the given keys from the bucket by DeleteObjects requests of up to 1000 keys each.
 
-        s3.delete_object(Bucket=settings.BUCKET_NAME, Key=file_key)
+    Returns a dict of error messages by the keys which could not be deleted, empty on success.
+    """
+    keys = list(dict.fromkeys(file_keys))
+    errors = {}
+    s3 = get_s3_client()
 
-        return True
+    for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+        try:
+            response = s3.delete_objects(
+                Bucket=settings.BUCKET_NAME,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+            )
+            for error in response.get('Errors', []):
+                errors[error['Key']] = f"{error.get('Code')}: {error.get('Message')}"
+        except Exception as e:
+            logger.error(e)
+            errors.update({key: str(e) for key in batch})
+        finally:
+            evict_presigned_urls(settings.BUCKET_NAME, *batch)
 
-    except Exception as e:
-        logger.error(e)
-        return False
+    for key, error in errors.items():
+        logger.error(f"Failed to delete {key}: {error}")
+    return errors
+
+
+def s3_delete(file_key):
+    return not s3_delete_many([file_key])
 
 
 def s3_save_file(file, file_name, file_extension):
@@ -351,6 +383,7 @@ def s3_save_file(file, file_name, file_extension):
         f"qrcodes/{file_name}.{file_extension}",
         ExtraArgs={'ContentType': "image/png"}
     )
+    evict_presigned_urls(settings.BUCKET_NAME, f"qrcodes/{file_name}.{file_extension}")
     return f"qrcodes/{file_name}.{file_extension}"
 
 
@@ -399,7 +432,35 @@ def is_ajax(request):
     return request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest'
 
 
+# Presigned URLs by (bucket, key), each holding (url, expires_at) by expiration, least recently used first.
+_presigned_urls = OrderedDict()
+_presigned_urls_lock = threading.Lock()
+
+
+def evict_presigned_urls(bucket_name, *object_keys):
+    """
+    Forgets the presigned URLs of objects which have been overwritten or deleted.
+    """
+    with _presigned_urls_lock:
+        for object_key in object_keys:
+            _presigned_urls.pop((bucket_name, object_key), None)
+
+
 def get_presigned_url(bucket_name, object_key, expiration=600):
+    """
+    Returns a presigned URL of the object, reusing the one signed before while more than
+    PRESIGNED_URL_MIN_REMAINING of its lifetime remains, so that browsers can cache the object.
+    """
+    now = time.time()
+    entry_key = (bucket_name, object_key)
+
+    with _presigned_urls_lock:
+        urls = _presigned_urls.get(entry_key)
+        if urls is not None:
+            _presigned_urls.move_to_end(entry_key)
+            url, expires_at = urls.get(expiration, (None, 0))
+            if expires_at - now > expiration * settings.PRESIGNED_URL_MIN_REMAINING:
+                return url
 
     s3 = get_s3_client()
 
@@ -408,6 +469,12 @@ def get_presigned_url(bucket_name, object_key, expiration=600):
         Params={'Bucket': bucket_name, 'Key': object_key},
         ExpiresIn=expiration
     )
+
+    with _presigned_urls_lock:
+        _presigned_urls.setdefault(entry_key, {})[expiration] = (url, now + expiration)
+        _presigned_urls.move_to_end(entry_key)
+        while len(_presigned_urls) > settings.PRESIGNED_URL_CACHE_SIZE:
+            _presigned_urls.popitem(last=False)
     return url
 
 
@@ -438,10 +505,6 @@ def get_qrcode(request):
                     }
 
                     try:
-                        if user_qrcode.key_image:
-                            s3 = get_s3_client()
-                            s3.delete_object(Bucket=settings.BUCKET_NAME, Key=user_qrcode.key_image)
-
                         content = str(encrypt_data(str(data), key))
                         file_name, s3_path = qrcode_generate(content)
 
@@ -242,6 +242,11 @@ EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 QRCODE_SECRET_KEY = os.environ.get("QRCODE_SECRET_KEY")
 QRCODE_HASH = os.environ.get("QRCODE_HASH")
 
+# Presigned URLs are reused while more than this fraction of their lifetime remains.
+PRESIGNED_URL_MIN_REMAINING = float(os.environ.get("PRESIGNED_URL_MIN_REMAINING", 0.5))
+# Maximum number of objects whose presigned URLs are kept.
+PRESIGNED_URL_CACHE_SIZE = int(os.environ.get("PRESIGNED_URL_CACHE_SIZE", 10000))
+
 #payos
 PAYOS_CLIENT_ID = os.environ.get("PAYOS_CLIENT_ID")
 PAYOS_API_KEY = os.environ.get("PAYOS_API_KEY")